@@ -6,13 +6,16 @@ from .assets import (
     metrica_factor_crec_7d,
     resumen_validaciones,
     reporte_excel_covid,
-    check_fechas_validas,
-    check_columnas_clave_no_nulas,
-    check_unicidad_location_date,
-    check_population_positiva,
-    check_new_cases_no_negativos,
-    check_incidencia_rango_valido
+    checks_entrada,
+    check_incidencia_rango_valido,
+    check_incidencia_consistente,
+    check_factor_crec_consistente,
 )
+from .cache import SnapshotsOWID
+from .incremental import EstadoIncremental
+from .io_manager import ColumnarIOManager
+from .motor import MotorCalculo
+from .jobs import covid_diario, covid_diario_schedule
 
 # Definir todos los assets y checks
 all_assets = [
@@ -25,16 +28,22 @@ all_assets = [
 ]
 
 all_checks = [
-    check_fechas_validas,
-    check_columnas_clave_no_nulas,
-    check_unicidad_location_date,
-    check_population_positiva,
-    check_new_cases_no_negativos,
-    check_incidencia_rango_valido
+    checks_entrada,
+    check_incidencia_rango_valido,
+    check_incidencia_consistente,
+    check_factor_crec_consistente,
 ]
 
 # Crear las definiciones de Dagster
 defs = Definitions(
     assets=all_assets,
-    asset_checks=all_checks
+    asset_checks=all_checks,
+    jobs=[covid_diario],
+    schedules=[covid_diario_schedule],
+    resources={
+        "owid": SnapshotsOWID(),
+        "io_manager": ColumnarIOManager(),
+        "motor": MotorCalculo(),
+        "estado": EstadoIncremental(),
+    }
 )
\ No newline at end of file
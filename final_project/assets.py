@@ -1,309 +1,328 @@
+from functools import partial
+from typing import List, Optional
+
 import pandas as pd
-import requests
-from io import StringIO
-from dagster import asset, AssetCheckResult, asset_check
-import numpy as np
+from dagster import (
+    asset, AssetCheckResult, asset_check, AssetExecutionContext, AssetIn, Config,
+    AssetCheckExecutionContext, AssetCheckSpec, multi_asset_check, BackfillPolicy,
+    DailyPartitionsDefinition, TimeWindowPartitionMapping, AllPartitionMapping,
+)
+
+from .cache import SnapshotsOWID
+from .incremental import EstadoIncremental, EstadoRodante, comparar_con_recalculo, lista_paises
+from .instrumentacion import instrumentar
+from .reporte import escribir_reporte
+from .validaciones import REGLAS_ENTRADA, resultado_validaciones, tabla_resumen
+from .metricas import PAISES_INTERES, VENTANAS_FACTOR_CREC, VENTANA_MAXIMA
+from .motor import MotorCalculo
 
 # PASO 2: LECTURA DE DATOS DESDE URL + CHEQUEOS DE ENTRADA
 
 @asset(description="Datos raw de COVID-19 desde URL canónica de OWID")
-def leer_datos() -> pd.DataFrame:
-
-    url = "https://catalog.ourworldindata.org/garden/covid/latest/compact/compact.csv"
-    
-    response = requests.get(url)
-    if response.status_code != 200:
-        raise Exception(f"Error al descargar datos: {response.status_code}")
-    
-    df = pd.read_csv(StringIO(response.text))
-    
-    # Renombrar country a location según las instrucciones
-    if 'country' in df.columns:
-        df = df.rename(columns={'country': 'location'})
-    
-    return df
-
-# CHEQUEOS DE ENTRADA (segun instrucciones exactas)
-
-@asset_check(asset=leer_datos)
-def check_fechas_validas(leer_datos: pd.DataFrame) -> AssetCheckResult:
+@instrumentar
+def leer_datos(owid: SnapshotsOWID) -> pd.DataFrame:
     """
-        max(date) ≤ hoy (no fechas futuras)
+        Snapshot Parquet vigente de OWID (GET condicional; ante 304 no se re-descarga ni re-parsea).
+        Columnas: location, date, new_cases, people_vaccinated, population
     """
-    if 'date' not in leer_datos.columns:
-        return AssetCheckResult(passed=False, description="Columna 'date' no encontrada")
-    
-    leer_datos['date'] = pd.to_datetime(leer_datos['date'])
-    today = pd.Timestamp.now()
-    
-    fechas_futuras = leer_datos[leer_datos['date'] > today]
-    filas_afectadas = len(fechas_futuras)
-    
-    passed = filas_afectadas == 0
-    
-    return AssetCheckResult(
-        passed=passed,
-        description=f"Verificación fechas no futuras. Filas afectadas: {filas_afectadas}",
-        metadata={"filas_afectadas": filas_afectadas}
-    )
+    return owid.cargar()
+
+# CHEQUEOS DE ENTRADA (segun instrucciones exactas)
 
-@asset_check(asset=leer_datos)
-def check_columnas_clave_no_nulas(leer_datos: pd.DataFrame) -> AssetCheckResult:
+@multi_asset_check(
+    specs=[AssetCheckSpec(nombre, asset=leer_datos) for nombre in REGLAS_ENTRADA],
+    description="Chequeos de entrada evaluados en una sola pasada (validaciones.py)",
+)
+@instrumentar
+def checks_entrada(context: AssetCheckExecutionContext, leer_datos: pd.DataFrame):
     """
-        Columnas clave no nulas: location, date, population
+        - max(date) ≤ hoy (no fechas futuras)
+        - Columnas clave no nulas: location, date, population
+        - Unicidad de (location, date)
+        - population > 0
+        - new_cases ≥ 0 (permitir negativos pero documentarlos)
     """
-    columnas_clave = ['location', 'date', 'population']
-    columnas_faltantes = [col for col in columnas_clave if col not in leer_datos.columns]
-    
-    if columnas_faltantes:
-        return AssetCheckResult(
-            passed=False,
-            description=f"Columnas faltantes: {columnas_faltantes}",
-            metadata={"columnas_faltantes": columnas_faltantes}
+    resultados = resultado_validaciones(context, leer_datos)
+    for nombre in REGLAS_ENTRADA:
+        regla = resultados[nombre]
+        yield AssetCheckResult(
+            check_name=nombre,
+            passed=regla.passed,
+            description=regla.descripcion,
+            metadata={"filas_afectadas": regla.filas_afectadas, **regla.metadata},
         )
-    
-    # Verificar que no sean valores nulos
-    filas_nulas = 0
-    for col in columnas_clave:
-        if leer_datos[col].isna().all():
-            filas_nulas += len(leer_datos)
-    
-    passed = filas_nulas == 0
-    
-    return AssetCheckResult(
-        passed=passed,
-        description=f"Columnas clave verificadas. Filas con nulos: {filas_nulas}",
-        metadata={"filas_afectadas": filas_nulas, "columnas_verificadas": columnas_clave}
-    )
 
-@asset_check(asset=leer_datos)
-def check_unicidad_location_date(leer_datos: pd.DataFrame) -> AssetCheckResult:
+# TABLA DE RESUMEN DE VALIDACIONES (memoria)
+
+@asset(description="Tabla resumen validaciones: nombre_regla, estado, filas_afectadas, notas")
+@instrumentar
+def resumen_validaciones(context: AssetExecutionContext, leer_datos: pd.DataFrame) -> pd.DataFrame:
     """
-    Unicidad de (location, date)
+    Generar tabla de resumen con nombre_regla, estado, filas_afectadas, notas
+    Reutiliza el resultado de los chequeos de entrada de la misma materialización
     """
-    if not {'location', 'date'}.issubset(leer_datos.columns):
-        return AssetCheckResult(passed=False, description="Columnas location o date no encontradas")
-    
-    total_filas = len(leer_datos)
-    filas_unicas = len(leer_datos.drop_duplicates(subset=['location', 'date']))
-    duplicados = total_filas - filas_unicas
-    
-    passed = duplicados == 0
-    
-    return AssetCheckResult(
-        passed=passed,
-        description=f"Verificación unicidad (location,date). Duplicados: {duplicados}",
-        metadata={"filas_afectadas": duplicados}
-    )
+    return tabla_resumen(resultado_validaciones(context, leer_datos))
+
+# PASO 3: PROCESAMIENTO DE DATOS
 
-@asset_check(asset=leer_datos)
-def check_population_positiva(leer_datos: pd.DataFrame) -> AssetCheckResult:
+# Particiones diarias por fecha de reporte: cada ejecucion diaria solo materializa
+# los dias nuevos y los backfills recorren rangos de particiones
+particiones_diarias = DailyPartitionsDefinition(start_date="2020-01-01")
+
+# Dias previos de contexto: 6 para el promedio movil de 7 dias y 2n-1 para dos
+# ventanas adyacentes de n dias (n hasta VENTANA_MAXIMA). Las ventanas son por filas
+# validas de datos_procesados: si un pais tiene huecos en esos dias, las filas que
+# faltan se completan desde el snapshot (_completar_contexto)
+CONTEXTO_INCIDENCIA_7D = 6
+CONTEXTO_FACTOR_CREC = 2 * VENTANA_MAXIMA - 1
+
+
+def _ventana_particion(context: AssetExecutionContext) -> tuple:
     """
-        population > 0
+        Rango [inicio, fin) de fechas de la(s) particion(es) en ejecucion.
     """
-    if 'population' not in leer_datos.columns:
-        return AssetCheckResult(passed=False, description="Columna 'population' no encontrada")
-    
-    poblacion_invalida = leer_datos[(leer_datos['population'] <= 0) | (leer_datos['population'].isna())]
-    filas_afectadas = len(poblacion_invalida)
-    
-    passed = filas_afectadas == 0
-    
-    return AssetCheckResult(
-        passed=passed,
-        description=f"Verificación population > 0. Filas afectadas: {filas_afectadas}",
-        metadata={"filas_afectadas": filas_afectadas}
-    )
+    ventana = context.partition_time_window
+    inicio = pd.Timestamp(ventana.start).tz_localize(None)
+    fin = pd.Timestamp(ventana.end).tz_localize(None)
+    return inicio, fin
 
-@asset_check(asset=leer_datos)
-def check_new_cases_no_negativos(leer_datos: pd.DataFrame) -> AssetCheckResult:
+
+def _unir_particiones(datos) -> pd.DataFrame:
     """
-        new_cases ≥ 0 (permitir negativos pero documentarlos)
+        ColumnarIOManager ya entrega las particiones unidas; los IO managers de Dagster
+        por defecto entregan un dict {particion: DataFrame}.
     """
-    if 'new_cases' not in leer_datos.columns:
-        return AssetCheckResult(passed=False, description="Columna 'new_cases' no encontrada")
-    
-    casos_negativos = leer_datos[leer_datos['new_cases'] < 0]
-    filas_afectadas = len(casos_negativos)
-    
-    # Permitir negativos pero documentados (PASSED con advertencia)
-    return AssetCheckResult(
-        passed=True,
-        description=f"Casos negativos documentados (correcciones admin): {filas_afectadas}",
-        metadata={
-            "filas_afectadas": filas_afectadas,
-            "nota": "Valores negativos permitidos - correcciones administrativas"
-        }
+    if not isinstance(datos, dict):
+        return datos
+    partes = [df for _, df in sorted(datos.items()) if not df.empty]
+    if not partes:
+        return pd.DataFrame()
+    return pd.concat(partes, ignore_index=True)
+
+
+def _contexto(dias: int, columnas: List[str]) -> AssetIn:
+    return AssetIn(
+        partition_mapping=TimeWindowPartitionMapping(
+            start_offset=-dias, allow_nonexistent_upstream_partitions=True
+        ),
+        metadata={"allow_missing_partitions": True, "columnas": columnas},
     )
 
-# TABLA DE RESUMEN DE VALIDACIONES (memoria)
 
-@asset(description="Tabla resumen validaciones: nombre_regla, estado, filas_afectadas, notas")
-def resumen_validaciones(leer_datos: pd.DataFrame) -> pd.DataFrame:
+class PaisesConfig(Config):
     """
-    Generar tabla de resumen con nombre_regla, estado, filas_afectadas, notas
+        paises: lista de países (location) a procesar en la ejecución
+        todos: procesar todas las locaciones del snapshot (ignora paises)
     """
-    # Ejecutar validaciones manualmente para generar resumen
-    df = leer_datos.copy()
-    
-    # Check 1: Fechas validas
-    df['date'] = pd.to_datetime(df['date'], errors='coerce')
-    fechas_futuras = len(df[df['date'] > pd.Timestamp.now()])
-    
-    # Check 2: Columnas clave
-    columnas_clave = ['location', 'date', 'population']
-    columnas_faltantes = len([col for col in columnas_clave if col not in df.columns])
-    
-    # Check 3: Unicidad
-    duplicados = len(df) - len(df.drop_duplicates(subset=['location', 'date']))
-    
-    # Check 4: Population > 0
-    poblacion_invalida = len(df[(df['population'] <= 0) | (df['population'].isna())])
-    
-    # Check 5: New cases negativos
-    casos_negativos = len(df[df['new_cases'] < 0]) if 'new_cases' in df.columns else 0
-    
-    resumen = [
-        {
-            'nombre_regla': 'check_fechas_validas',
-            'estado': 'PASSED' if fechas_futuras == 0 else 'FAILED',
-            'filas_afectadas': fechas_futuras,
-            'notas': 'Verificación de fechas no futuras'
-        },
-        {
-            'nombre_regla': 'check_columnas_clave_no_nulas',
-            'estado': 'PASSED' if columnas_faltantes == 0 else 'FAILED',
-            'filas_afectadas': columnas_faltantes,
-            'notas': 'Columnas: location, date, population'
-        },
-        {
-            'nombre_regla': 'check_unicidad_location_date',
-            'estado': 'PASSED' if duplicados == 0 else 'FAILED',
-            'filas_afectadas': duplicados,
-            'notas': 'Unicidad de (location, date)'
-        },
-        {
-            'nombre_regla': 'check_population_positiva',
-            'estado': 'PASSED' if poblacion_invalida == 0 else 'FAILED',
-            'filas_afectadas': poblacion_invalida,
-            'notas': 'Validación population > 0'
-        },
-        {
-            'nombre_regla': 'check_new_cases_no_negativos',
-            'estado': 'PASSED',  # Siempre PASSED (documentados pero permitimos)
-            'filas_afectadas': casos_negativos,
-            'notas': 'Casos negativos permitidos (correcciones admin)'
-        }
-    ]
-    
-    return pd.DataFrame(resumen)
+    paises: List[str] = list(PAISES_INTERES)
+    todos: bool = False
 
-# PASO 3: PROCESAMIENTO DE DATOS
 
-@asset(description="Datos procesados y filtrados para Ecuador y Finlandia")
-def datos_procesados(leer_datos: pd.DataFrame) -> pd.DataFrame:
+@asset(
+    description="Datos procesados y filtrados para los países configurados (Ecuador y Finlandia por defecto)",
+    partitions_def=particiones_diarias,
+    backfill_policy=BackfillPolicy.single_run(),
+    metadata={"columna_particion": "date"},
+    deps=[leer_datos],
+)
+@instrumentar
+def datos_procesados(
+    context: AssetExecutionContext, config: PaisesConfig, owid: SnapshotsOWID, motor: MotorCalculo
+) -> pd.DataFrame:
     """
+    - Filtrar a los países configurados y a las fechas de la partición (en el scan del snapshot)
+    - Seleccionar columnas esenciales: location, date, new_cases, people_vaccinated, population
     - Eliminar filas con valores nulos en new_cases O people_vaccinated
     - Eliminar duplicados si existen
-    - Filtrar a Ecuador y país comparativo (Finlandia)
-    - Seleccionar columnas esenciales: location, date, new_cases, people_vaccinated, population
     """
-    df = leer_datos.copy()
-    df['date'] = pd.to_datetime(df['date'])
-    
-    # Eliminar filas con valores nulos en new_cases O people_vaccinated (segun instrucciones)
-    df = df.dropna(subset=['new_cases', 'people_vaccinated'], how='any')
-    
-    # Eliminar duplicados
-    df = df.drop_duplicates(subset=['location', 'date'])
-    
-    # Filtrar por paises de interes
-    paises_interes = ['Ecuador', 'Finland']
-    df = df[df['location'].isin(paises_interes)]
-    
-    # Seleccionar columnas esenciales
-    columnas_esenciales = ['location', 'date', 'new_cases', 'people_vaccinated', 'population']
-    columnas_disponibles = [col for col in columnas_esenciales if col in df.columns]
-    df = df[columnas_disponibles]
-    
-    # Ordenar por fecha
-    df = df.sort_values(['location', 'date'])
-    
-    return df
+    inicio, fin = _ventana_particion(context)
+    return motor.procesar(owid, None if config.todos else config.paises, inicio, fin)
 
 # PASO 4: CALCULO DE METRICAS
 
-@asset(description="Metrica A: Incidencia acumulada a 7 días por 100 mil habitantes")
-def metrica_incidencia_7d(datos_procesados: pd.DataFrame) -> pd.DataFrame:
+def _dias_sin_materializar(context: AssetExecutionContext, inicio: pd.Timestamp, dias: int) -> List[pd.Timestamp]:
+    """
+        Días de contexto [inicio - dias, inicio) cuya partición de datos_procesados no
+        está materializada (allow_missing_partitions los omite al cargar).
+    """
+    materializadas = context.instance.get_materialized_partitions(context.asset_key_for_input("datos_procesados"))
+    primero = max(inicio - pd.Timedelta(days=dias), particiones_diarias.start.replace(tzinfo=None))
+    return [dia for dia in pd.date_range(primero, inicio, inclusive='left')
+            if dia.strftime(particiones_diarias.fmt) not in materializadas]
+
+
+def _concatenar(datos: pd.DataFrame, partes: List[pd.DataFrame]) -> pd.DataFrame:
+    combinado = pd.concat([df.astype({'location': object}) for df in [*partes, datos]], ignore_index=True)
+    if isinstance(datos['location'].dtype, pd.CategoricalDtype):
+        combinado['location'] = pd.Categorical(combinado['location'], categories=sorted(combinado['location'].unique()))
+    combinado = combinado.astype(datos.dtypes.drop('location').to_dict())
+    return combinado.sort_values(['location', 'date'], kind='stable', ignore_index=True)
+
+
+def _completar_contexto(
+    datos: pd.DataFrame, inicio: pd.Timestamp, filas_contexto: int, leer,
+    huecos: Optional[List[pd.Timestamp]] = None,
+) -> pd.DataFrame:
+    """
+        Completa filas_contexto filas anteriores a inicio para los países de [inicio, ...).
+        Los huecos (días de contexto sin partición materializada) se leen primero, para
+        que las ventanas no salten por encima de ellos. Los países que aun así tienen menos
+        filas (p. ej. ausentes de particiones materializadas con otra config) se leen de
+        nuevo del snapshot desde inicio hacia atrás, duplicando el rango hasta completar o
+        llegar al inicio de las particiones. leer(paises, inicio, fin) devuelve datos_procesados.
+    """
+    if datos.empty or not filas_contexto:
+        return datos
+    paises = sorted(datos.loc[datos['date'] >= inicio, 'location'].astype(object).unique())
+    if huecos and paises:
+        extra = leer(paises, min(huecos), max(huecos) + pd.Timedelta(days=1))
+        extra = extra.loc[extra['date'].isin(huecos), datos.columns]
+        if not extra.empty:
+            datos = _concatenar(datos, [extra])
+
+    previas = datos.loc[datos['date'] < inicio, 'location'].astype(object).value_counts()
+    faltan = {p: filas_contexto for p in paises if previas.get(p, 0) < filas_contexto}
+    if faltan:
+        # Sus filas de contexto cargadas pueden no ser contiguas: se reemplazan por las del snapshot
+        datos = datos[(datos['date'] >= inicio) | ~datos['location'].astype(object).isin(list(faltan))]
+
+    partes = []
+    desde, paso = inicio, pd.Timedelta(days=4 * filas_contexto)
+    while faltan and desde is not None:
+        antes = desde - paso
+        if antes <= particiones_diarias.start.replace(tzinfo=None):
+            antes = None
+        extra = leer(sorted(faltan), antes, desde)
+        if not extra.empty:
+            partes.append(extra[datos.columns])
+            for p, n in extra['location'].astype(object).value_counts().items():
+                faltan[p] -= n
+            faltan = {p: n for p, n in faltan.items() if n > 0}
+        desde, paso = antes, 2 * paso
+    return _concatenar(datos, partes) if partes else datos
+
+
+def _calcular_metrica(
+    nombre: str,
+    estado: EstadoIncremental,
+    funcion,
+    datos_procesados,
+    inicio: pd.Timestamp,
+    fin: pd.Timestamp,
+    columna_fecha: str,
+    filas_contexto: int,
+    leer,
+    huecos: Optional[List[pd.Timestamp]] = None,
+    config: Optional[dict] = None,
+) -> pd.DataFrame:
+    """
+        Filas de la metrica para [inicio, fin). Con estado incremental activo, al dia
+        hasta inicio y con los mismos países y config solo se pliegan las filas nuevas;
+        si no, se recalcula con los días de contexto (huecos leídos del snapshot y
+        completados hasta filas_contexto filas por país) y, si está activo, se vuelve a
+        sembrar el estado hasta fin.
+    """
+    datos = _unir_particiones(datos_procesados)
+    paises = lista_paises(datos)
+    previo = estado.cargar(nombre)
+    if previo is not None and previo.continua(inicio, filas_contexto, paises, config):
+        nuevos = datos[(datos['date'] >= inicio) & (datos['date'] < fin)] if not datos.empty else datos
+        resultado = previo.avanzar(nuevos, funcion, columna_fecha, hasta=fin)
+        previo.paises = paises
+        estado.guardar(nombre, previo)
+        return resultado
+
+    datos = _completar_contexto(datos, inicio, filas_contexto, leer, huecos)
+    if estado.activo:
+        historia = datos[datos['date'] < fin] if not datos.empty else datos
+        estado.guardar(nombre, EstadoRodante.desde_historia(historia, filas_contexto, fin, paises, config))
+    resultado = funcion(datos)
+    if resultado.empty:
+        return resultado
+    return resultado[(resultado[columna_fecha] >= inicio) & (resultado[columna_fecha] < fin)]
+
+
+@asset(
+    description="Metrica A: Incidencia acumulada a 7 días por 100 mil habitantes",
+    partitions_def=particiones_diarias,
+    backfill_policy=BackfillPolicy.single_run(),
+    metadata={"columna_particion": "fecha"},
+    ins={"datos_procesados": _contexto(
+        CONTEXTO_INCIDENCIA_7D, ['location', 'date', 'new_cases', 'population']
+    )},
+)
+@instrumentar
+def metrica_incidencia_7d(
+    context: AssetExecutionContext,
+    owid: SnapshotsOWID,
+    motor: MotorCalculo,
+    estado: EstadoIncremental,
+    datos_procesados,
+) -> pd.DataFrame:
     """
     1. incidencia_diaria = (new_cases / population) * 100000
     2. incidencia_7d = promedio móvil de 7 días de incidencia_diaria
+    Lee la partición más 6 días previos de contexto, completados desde el snapshot si no
+    suman 6 filas por país (o pliega la partición sobre el estado incremental)
     """
-    if datos_procesados.empty or 'new_cases' not in datos_procesados.columns:
-        return pd.DataFrame()
-    
-    df = datos_procesados.copy()
-    
-    # Calcular incidencia diaria por 100k habitantes
-    df['incidencia_diaria'] = (df['new_cases'] / df['population']) * 100000
-    
-    # Calcular promedio movil de 7 días por país
-    df['incidencia_7d'] = df.groupby('location')['incidencia_diaria'].transform(
-        lambda x: x.rolling(window=7, min_periods=1).mean()
+    inicio, fin = _ventana_particion(context)
+    return _calcular_metrica(
+        "metrica_incidencia_7d", estado, motor.incidencia_7d, datos_procesados,
+        inicio, fin, 'fecha', CONTEXTO_INCIDENCIA_7D, partial(motor.procesar, owid),
+        _dias_sin_materializar(context, inicio, CONTEXTO_INCIDENCIA_7D),
     )
-    
-    # Formatear segun ejemplo en instrucciones
-    resultado = df[['date', 'location', 'incidencia_7d']].rename(columns={
-        'date': 'fecha',
-        'location': 'pais'
-    })
-    
-    return resultado
 
-@asset(description="Métrica B: Factor de crecimiento semanal")
-def metrica_factor_crec_7d(datos_procesados: pd.DataFrame) -> pd.DataFrame:
+class FactorCrecConfig(Config):
+    """
+        ventanas: largos de ventana (días) a calcular en una sola pasada, p. ej. [7, 14, 28]
+    """
+    ventanas: List[int] = list(VENTANAS_FACTOR_CREC)
+
+
+@asset(
+    description="Métrica B: Factor de crecimiento semanal",
+    partitions_def=particiones_diarias,
+    backfill_policy=BackfillPolicy.single_run(),
+    metadata={"columna_particion": "semana_fin"},
+    ins={"datos_procesados": _contexto(CONTEXTO_FACTOR_CREC, ['location', 'date', 'new_cases'])},
+)
+@instrumentar
+def metrica_factor_crec_7d(
+    context: AssetExecutionContext,
+    config: FactorCrecConfig,
+    owid: SnapshotsOWID,
+    motor: MotorCalculo,
+    estado: EstadoIncremental,
+    datos_procesados,
+) -> pd.DataFrame:
     """
         1. casos_semana_actual = suma(new_cases de los últimos 7 días)
         2. casos_semana_prev = suma(new_cases de los 7 días previos)
         3. factor_crec_7d = casos_semana_actual / casos_semana_prev
+        Ventanas adicionales (14, 28...) agregan columnas casos_{n}d / factor_crec_{n}d
+        Lee la partición más 2n-1 días previos de contexto para la ventana más larga admitida,
+        completados desde el snapshot si no suman 2n-1 filas por país (o pliega la partición
+        sobre el estado incremental, que guarda 2n-1 filas por país)
     """
-    if datos_procesados.empty or 'new_cases' not in datos_procesados.columns:
-        return pd.DataFrame()
-    
-    df = datos_procesados.copy()
-    
-    resultados = []
-    
-    for pais in df['location'].unique():
-        df_pais = df[df['location'] == pais].sort_values('date')
-        
-        for i in range(7, len(df_pais)):
-            # Semana actual (ultimo 7 días)
-            casos_semana_actual = df_pais.iloc[i-6:i+1]['new_cases'].sum()
-            
-            # Semana anterior (7 diás previos)
-            if i >= 13:
-                casos_semana_prev = df_pais.iloc[i-13:i-6]['new_cases'].sum()
-                
-                # Calcular factor de crecimiento
-                factor_crec = casos_semana_actual / casos_semana_prev if casos_semana_prev > 0 else np.inf
-                
-                resultados.append({
-                    'semana_fin': df_pais.iloc[i]['date'],
-                    'pais': pais,
-                    'casos_semana': casos_semana_actual,
-                    'factor_crec_7d': factor_crec
-                })
-    
-    return pd.DataFrame(resultados)
+    if any(n < 1 or n > VENTANA_MAXIMA for n in config.ventanas):
+        raise ValueError(f"ventanas deben estar entre 1 y {VENTANA_MAXIMA}: {config.ventanas}")
+
+    inicio, fin = _ventana_particion(context)
+    return _calcular_metrica(
+        "metrica_factor_crec_7d", estado, partial(motor.factor_crec, ventanas=config.ventanas),
+        datos_procesados, inicio, fin, 'semana_fin', 2 * max(config.ventanas) - 1, partial(motor.procesar, owid),
+        _dias_sin_materializar(context, inicio, CONTEXTO_FACTOR_CREC), {"ventanas": sorted(config.ventanas)},
+    )
 
 # PASO 5: CHEQUEOS DE SALIDA
 
-@asset_check(asset=metrica_incidencia_7d)
-def check_incidencia_rango_valido(metrica_incidencia_7d: pd.DataFrame) -> AssetCheckResult:
+@asset_check(asset=metrica_incidencia_7d, partitions_def=particiones_diarias)
+@instrumentar
+def check_incidencia_rango_valido(metrica_incidencia_7d) -> AssetCheckResult:
     """
     Validar que incidencia_7d: 0 ≤ valor ≤ 2000
     """
+    metrica_incidencia_7d = _unir_particiones(metrica_incidencia_7d)
     if metrica_incidencia_7d.empty or 'incidencia_7d' not in metrica_incidencia_7d.columns:
         return AssetCheckResult(passed=False, description="DataFrame vacío o columna faltante")
     
@@ -324,13 +343,103 @@ def check_incidencia_rango_valido(metrica_incidencia_7d: pd.DataFrame) -> AssetC
         }
     )
 
+# CONSISTENCIA DEL CÁLCULO INCREMENTAL CONTRA UN RECÁLCULO COMPLETO
+
+def _historia_completa(columnas: List[str]) -> dict:
+    return {"datos_procesados": AssetIn(
+        partition_mapping=AllPartitionMapping(),
+        metadata={"allow_missing_partitions": True, "columnas": columnas},
+    )}
+
+
+def _resultado_consistencia(
+    context: AssetCheckExecutionContext, metrica, recalculo: pd.DataFrame, columna_fecha: str
+) -> AssetCheckResult:
+    ventana = context.op_execution_context.partition_time_window
+    inicio = pd.Timestamp(ventana.start).tz_localize(None)
+    fin = pd.Timestamp(ventana.end).tz_localize(None)
+    if not recalculo.empty:
+        recalculo = recalculo[(recalculo[columna_fecha] >= inicio) & (recalculo[columna_fecha] < fin)]
+    resumen = comparar_con_recalculo(_unir_particiones(metrica), recalculo, [columna_fecha, 'pais'])
+    return AssetCheckResult(
+        passed=resumen["consistente"],
+        description=(
+            f"Comparación con recálculo sobre toda la historia: {resumen['filas_faltantes']} faltantes, "
+            f"{resumen['filas_sobrantes']} sobrantes, {resumen['filas_distintas']} distintas"
+        ),
+        metadata=resumen,
+    )
+
+
+def _ventanas_factor(metrica: pd.DataFrame) -> List[int]:
+    # Las ventanas materializadas se deducen de las columnas (casos_semana = 7 días)
+    ventanas = [int(col[len('casos_'):-1]) for col in metrica.columns if col.startswith('casos_') and col.endswith('d')]
+    return ventanas + [7] * ('casos_semana' in metrica.columns)
+
+
+@asset_check(
+    asset=metrica_incidencia_7d,
+    partitions_def=particiones_diarias,
+    additional_ins=_historia_completa(['location', 'date', 'new_cases', 'population']),
+    description="Incidencia materializada igual a recalcularla sobre toda la historia de datos_procesados",
+)
+@instrumentar
+def check_incidencia_consistente(
+    context: AssetCheckExecutionContext, motor: MotorCalculo, metrica_incidencia_7d, datos_procesados
+) -> AssetCheckResult:
+    """
+    Detecta deriva del estado incremental o de las particiones frente al recálculo completo
+    """
+    recalculo = motor.incidencia_7d(_unir_particiones(datos_procesados))
+    return _resultado_consistencia(context, metrica_incidencia_7d, recalculo, 'fecha')
+
+
+@asset_check(
+    asset=metrica_factor_crec_7d,
+    partitions_def=particiones_diarias,
+    additional_ins=_historia_completa(['location', 'date', 'new_cases']),
+    description="Factor de crecimiento materializado igual a recalcularlo sobre toda la historia de datos_procesados",
+)
+@instrumentar
+def check_factor_crec_consistente(
+    context: AssetCheckExecutionContext, motor: MotorCalculo, metrica_factor_crec_7d, datos_procesados
+) -> AssetCheckResult:
+    """
+    Mismas ventanas que las columnas materializadas
+    """
+    metrica = _unir_particiones(metrica_factor_crec_7d)
+    ventanas = _ventanas_factor(metrica) or list(VENTANAS_FACTOR_CREC)
+    recalculo = motor.factor_crec(_unir_particiones(datos_procesados), ventanas=ventanas)
+    return _resultado_consistencia(context, metrica, recalculo, 'semana_fin')
+
 # PASO 6: EXPORTACIÓN DE RESULTADOS
 
-@asset(description="Reporte final en formato Excel con todas las hojas requeridas")
+class ReporteConfig(Config):
+    """
+        - ruta_salida: ruta del Excel (se crean los directorios que falten)
+        - motor: 'auto' (xlsxwriter si está instalado), 'xlsxwriter' u 'openpyxl'
+        - formatos_extra: copias por hoja junto al Excel, p. ej. ["parquet", "csv"]
+    """
+    ruta_salida: str = "reporte_covid_pipeline.xlsx"
+    motor: str = "auto"
+    formatos_extra: List[str] = []
+
+
+@asset(
+    description="Reporte final en formato Excel con todas las hojas requeridas",
+    ins={
+        "datos_procesados": AssetIn(metadata={"allow_missing_partitions": True}),
+        "metrica_incidencia_7d": AssetIn(metadata={"allow_missing_partitions": True}),
+        "metrica_factor_crec_7d": AssetIn(metadata={"allow_missing_partitions": True}),
+    },
+)
+@instrumentar
 def reporte_excel_covid(
-    datos_procesados: pd.DataFrame,
-    metrica_incidencia_7d: pd.DataFrame,
-    metrica_factor_crec_7d: pd.DataFrame,
+    context: AssetExecutionContext,
+    config: ReporteConfig,
+    datos_procesados,
+    metrica_incidencia_7d,
+    metrica_factor_crec_7d,
     resumen_validaciones: pd.DataFrame
 ) -> str:
     """
@@ -338,20 +447,14 @@ def reporte_excel_covid(
         - Hoja métrica 1 (incidencia)
         - Hoja métrica 2 (factor crecimiento)
         - Hoja resumen validaciones
+        Une todas las particiones materializadas
     """
-    filename = "reporte_covid_pipeline.xlsx"
-    
-    with pd.ExcelWriter(filename, engine='openpyxl') as writer:
-        # Hoja 1: Datos procesados
-        datos_procesados.to_excel(writer, sheet_name='Datos_Procesados', index=False)
-        
-        # Hoja 2: Métrica incidencia
-        metrica_incidencia_7d.to_excel(writer, sheet_name='Incidencia_7d', index=False)
-        
-        # Hoja 3: Métrica factor crecimiento
-        metrica_factor_crec_7d.to_excel(writer, sheet_name='Factor_Crec_7d', index=False)
-        
-        # Hoja 4: Resumen de validaciones
-        resumen_validaciones.to_excel(writer, sheet_name='Resumen_Validaciones', index=False)
-    
-    return filename
\ No newline at end of file
+    hojas = {
+        'Datos_Procesados': _unir_particiones(datos_procesados),
+        'Incidencia_7d': _unir_particiones(metrica_incidencia_7d),
+        'Factor_Crec_7d': _unir_particiones(metrica_factor_crec_7d),
+        'Resumen_Validaciones': resumen_validaciones,
+    }
+    rutas = escribir_reporte(hojas, config.ruta_salida, config.motor, config.formatos_extra)
+    context.add_output_metadata({"archivos": [str(r) for r in rutas]})
+    return config.ruta_salida
@@ -0,0 +1,214 @@
+"""
+    Benchmark del pipeline COVID sobre datos sinteticos (sintetico.py) a varias escalas.
+
+    Mide tiempo y memoria pico de la funcion de cada asset y check, y guarda el
+    resultado en JSON junto con el commit para comparar ejecuciones. leer_datos se
+    mide en frio (CSV -> snapshot Parquet, con la cache vacia) y leer_datos_cache
+    con el snapshot ya registrado (respuesta 304):
+
+        python -m final_project.benchmark --escalas 1 10 100 --motores pandas duckdb
+        python -m final_project.benchmark --escalas 1 --comparar benchmark-<commit>.json
+
+    segundos: minimo de las repeticiones. memoria_pico_mb: pico de asignaciones de
+    Python/NumPy/pandas durante el paso (tracemalloc, en una corrida aparte para no
+    distorsionar el tiempo); Arrow y DuckDB asignan fuera de ese contador.
+"""
+import argparse
+import gc
+import json
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import duckdb
+import pandas as pd
+
+from .assets import check_incidencia_rango_valido
+from .cache import SnapshotsOWID
+from .metricas import PAISES_INTERES
+from .motor import MOTORES, MotorCalculo
+from .reporte import escribir_reporte
+from .sintetico import escribir_csv_owid, generar_owid
+from .validaciones import evaluar_reglas, tabla_resumen
+
+ESCALAS = [1, 10, 100]
+
+
+def _commit() -> Optional[str]:
+    try:
+        salida = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent,
+        )
+        return salida.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def medir(fn: Callable, repeticiones: int = 3) -> tuple:
+    """
+        (resultado, segundos, memoria_pico_mb) de llamar fn sin argumentos.
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        gc.collect()
+        inicio = time.perf_counter()
+        resultado = fn()
+        tiempos.append(time.perf_counter() - inicio)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return resultado, min(tiempos), pico / 2**20
+
+
+def ejecutar_escala(
+    escala: int,
+    motores: List[str],
+    directorio: Path,
+    repeticiones: int = 3,
+    todos_los_paises: bool = True,
+    procesos: int = 1,
+) -> List[dict]:
+    """
+        Corre todos los pasos del pipeline para una escala; los pasos que no dependen
+        del motor (ingesta y validaciones de entrada) se miden una sola vez.
+    """
+    datos = generar_owid(escala)
+    csv = escribir_csv_owid(datos, directorio / f"owid-x{escala}.csv")
+    owid = SnapshotsOWID(directorio=str(directorio / f"snapshots-x{escala}"), offline=True)
+    paises = None if todos_los_paises else list(PAISES_INTERES)
+    filas = []
+
+    def registrar(paso, motor, fn):
+        resultado, segundos, memoria = medir(fn, repeticiones)
+        filas.append({
+            'escala': escala,
+            'filas_entrada': len(datos),
+            'motor': motor,
+            'paso': paso,
+            'segundos': round(segundos, 6),
+            'memoria_pico_mb': round(memoria, 3),
+            'filas_salida': len(resultado) if isinstance(resultado, pd.DataFrame) else None,
+        })
+        return resultado
+
+    def ingesta_en_frio():
+        # Cache de snapshots vacia en cada repeticion: mide el parseo del CSV y la escritura
+        # del Parquet, no la lectura de un snapshot que dejo la repeticion anterior
+        with tempfile.TemporaryDirectory(prefix="snapshots-", dir=directorio) as tmp:
+            frio = SnapshotsOWID(directorio=tmp, offline=True)
+            frio.importar(csv)
+            return frio.cargar()
+
+    registrar('leer_datos', None, ingesta_en_frio)
+    owid.importar(csv)
+    leer_datos = registrar('leer_datos_cache', None, owid.cargar)
+    resultados = registrar('checks_entrada', None, lambda: evaluar_reglas(leer_datos))
+    resumen = registrar('resumen_validaciones', None, lambda: tabla_resumen(resultados))
+
+    for nombre in motores:
+        motor = MotorCalculo(motor=nombre, procesos=procesos)
+        procesados = registrar('datos_procesados', nombre, lambda: motor.procesar(owid, paises))
+        incidencia = registrar('metrica_incidencia_7d', nombre, lambda: motor.incidencia_7d(procesados))
+        factor = registrar('metrica_factor_crec_7d', nombre, lambda: motor.factor_crec(procesados))
+        registrar('check_incidencia_rango_valido', nombre, lambda: check_incidencia_rango_valido(incidencia))
+        hojas = {
+            'Datos_Procesados': procesados,
+            'Incidencia_7d': incidencia,
+            'Factor_Crec_7d': factor,
+            'Resumen_Validaciones': resumen,
+        }
+        ruta = directorio / f"reporte-x{escala}-{nombre}.xlsx"
+        registrar('reporte_excel_covid', nombre, lambda: escribir_reporte(hojas, ruta))
+    return filas
+
+
+def ejecutar(
+    escalas: List[int] = ESCALAS,
+    motores: List[str] = ["pandas"],
+    repeticiones: int = 3,
+    todos_los_paises: bool = True,
+    procesos: int = 1,
+) -> dict:
+    """
+        Resultado completo del benchmark (metadatos del entorno + una fila por paso).
+    """
+    resultados = []
+    with tempfile.TemporaryDirectory(prefix="benchmark-covid-") as tmp:
+        for escala in escalas:
+            resultados.extend(ejecutar_escala(
+                escala, motores, Path(tmp), repeticiones, todos_los_paises, procesos,
+            ))
+    return {
+        'commit': _commit(),
+        'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'entorno': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'duckdb': duckdb.__version__,
+            'plataforma': platform.platform(),
+        },
+        'parametros': {
+            'escalas': list(escalas),
+            'motores': list(motores),
+            'repeticiones': repeticiones,
+            'todos_los_paises': todos_los_paises,
+            'procesos': procesos,
+        },
+        'resultados': resultados,
+    }
+
+
+def comparar(actual: dict, base: dict) -> pd.DataFrame:
+    """
+        Tiempos y memoria de actual frente a base por (escala, motor, paso); razon > 1 = más lento.
+    """
+    claves = ['escala', 'motor', 'paso']
+    columnas = claves + ['segundos', 'memoria_pico_mb']
+    tabla = pd.DataFrame(actual['resultados'])[columnas].merge(
+        pd.DataFrame(base['resultados'])[columnas], on=claves, suffixes=('', '_base'),
+    )
+    tabla['razon_tiempo'] = tabla['segundos'] / tabla['segundos_base']
+    tabla['razon_memoria'] = tabla['memoria_pico_mb'] / tabla['memoria_pico_mb_base']
+    return tabla
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline COVID sobre datos sintéticos")
+    parser.add_argument("--escalas", type=int, nargs="+", default=ESCALAS)
+    parser.add_argument("--motores", nargs="+", choices=MOTORES, default=["pandas"])
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--solo-paises-interes", action="store_true",
+                        help="procesar solo PAISES_INTERES en vez de todos los países generados")
+    parser.add_argument("--procesos", type=int, default=1,
+                        help="procesos para las métricas (0 = todos los núcleos disponibles)")
+    parser.add_argument("--salida", default=None, help="JSON de salida (por defecto benchmark-<commit>.json)")
+    parser.add_argument("--comparar", default=None, help="JSON de una ejecución anterior")
+    args = parser.parse_args(argv)
+
+    resultado = ejecutar(args.escalas, args.motores, args.repeticiones, not args.solo_paises_interes, args.procesos)
+    salida = Path(args.salida or f"benchmark-{resultado['commit'] or 'local'}.json")
+    salida.write_text(json.dumps(resultado, indent=2), encoding='utf-8')
+
+    tabla = pd.DataFrame(resultado['resultados']).fillna({'motor': '-'})
+    print(tabla[['escala', 'motor', 'paso', 'segundos', 'memoria_pico_mb']].to_string(index=False))
+    print(f"Resultados guardados en {salida}")
+
+    if args.comparar:
+        base = json.loads(Path(args.comparar).read_text(encoding='utf-8'))
+        print(f"\nComparación contra {base.get('commit')} ({args.comparar}):")
+        print(comparar(resultado, base).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
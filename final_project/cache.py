@@ -0,0 +1,207 @@
+"""
+    Cache local de snapshots de OWID con GET condicional.
+
+    Cada descarga se guarda como Parquet con nombre = sha256 del CSV original
+    (direccionamiento por contenido). Las siguientes ejecuciones envian
+    If-None-Match / If-Modified-Since y, ante un 304, reutilizan el ultimo
+    snapshot sin volver a parsear el CSV.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+import pyarrow.parquet as pq
+import requests
+from dagster import ConfigurableResource, get_dagster_logger
+
+from .esquema import VERSION_ESQUEMA, a_pandas
+from .ingesta import TAMANO_BLOQUE_DESCARGA, URL_OWID, guardar_respuesta, leer_tabla_csv
+
+INDICE = "indice.json"
+
+# Grupos de filas chicos: las estadisticas min/max por grupo permiten saltar bloques
+# completos al filtrar por location/date (el CSV de OWID viene ordenado por pais y fecha)
+FILAS_POR_GRUPO = 64_000
+
+
+def _ahora() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class SnapshotsOWID(ConfigurableResource):
+    """
+        Fuente OWID con cache de snapshots en disco.
+
+        - offline: nunca toca la red, usa el ultimo snapshot disponible
+        - max_snapshots: cuantos snapshots conservar (el actual nunca se borra)
+        - max_edad_dias: borrar snapshots no usados en mas de N dias
+    """
+    directorio: str = "data/owid_snapshots"
+    url: str = URL_OWID
+    offline: bool = False
+    max_snapshots: int = 3
+    max_edad_dias: Optional[int] = None
+    timeout: float = 60
+
+    @property
+    def _dir(self) -> Path:
+        return Path(self.directorio)
+
+    def _leer_indice(self) -> dict:
+        ruta = self._dir / INDICE
+        if not ruta.exists():
+            return {"actual": None, "etag": None, "last_modified": None, "snapshots": {}}
+        return json.loads(ruta.read_text(encoding='utf-8'))
+
+    def _guardar_indice(self, indice: dict) -> None:
+        # Escritura atomica: un proceso concurrente nunca ve un indice a medias
+        tmp = self._dir / f"{INDICE}.tmp"
+        tmp.write_text(json.dumps(indice, indent=2), encoding='utf-8')
+        os.replace(tmp, self._dir / INDICE)
+
+    def ruta_snapshot(self, sha: str) -> Path:
+        # La version del esquema va en el nombre: un snapshot con otro esquema no se reutiliza
+        return self._dir / f"{sha}-v{VERSION_ESQUEMA}.parquet"
+
+    def snapshot_actual(self) -> Optional[Path]:
+        """
+            Ruta del ultimo snapshot valido o None si no existe ninguno.
+        """
+        sha = self._leer_indice()["actual"]
+        if sha is None or not self.ruta_snapshot(sha).exists():
+            return None
+        return self.ruta_snapshot(sha)
+
+    def obtener(self) -> Path:
+        """
+            Devuelve la ruta del snapshot Parquet vigente, descargando solo si upstream cambio.
+        """
+        self._dir.mkdir(parents=True, exist_ok=True)
+        log = get_dagster_logger()
+        indice = self._leer_indice()
+        actual = self.snapshot_actual()
+
+        if self.offline:
+            if actual is None:
+                raise Exception(f"Modo offline sin snapshot disponible en {self._dir}")
+            return self._usar(indice, indice["actual"])
+
+        headers = {}
+        if actual is not None:
+            if indice.get("etag"):
+                headers["If-None-Match"] = indice["etag"]
+            if indice.get("last_modified"):
+                headers["If-Modified-Since"] = indice["last_modified"]
+
+        try:
+            response = requests.get(self.url, headers=headers, stream=True, timeout=self.timeout)
+        except requests.RequestException as e:
+            # Fallback: sin red se reutiliza el ultimo snapshot si existe
+            if actual is None:
+                raise
+            log.warning(f"Sin acceso a {self.url} ({e}); se reutiliza el snapshot {indice['actual']}")
+            return self._usar(indice, indice["actual"])
+
+        with response:
+            if response.status_code == 304 and actual is not None:
+                log.info(f"OWID sin cambios (304); snapshot {indice['actual']}")
+                return self._usar(indice, indice["actual"])
+            if response.status_code != 200:
+                raise Exception(f"Error al descargar datos: {response.status_code}")
+
+            ruta_csv = self._dir / f"descarga-{os.getpid()}.csv.tmp"
+            try:
+                sha = guardar_respuesta(response, ruta_csv)
+                destino = self.ruta_snapshot(sha)
+                if destino.exists():
+                    # Mismo contenido con otros encabezados: no hace falta parsear
+                    log.info(f"Contenido ya cacheado; snapshot {sha}")
+                else:
+                    self._materializar(ruta_csv, destino)
+            finally:
+                ruta_csv.unlink(missing_ok=True)
+
+            indice["etag"] = response.headers.get("ETag")
+            indice["last_modified"] = response.headers.get("Last-Modified")
+
+        return self._usar(indice, sha)
+
+    def importar(self, ruta_csv) -> Path:
+        """
+            Registra un CSV local con el formato de OWID como snapshot vigente, sin
+            tocar la red (datos sinteticos, benchmarks o copias descargadas a mano).
+        """
+        self._dir.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        with open(ruta_csv, 'rb') as f:
+            for bloque in iter(lambda: f.read(TAMANO_BLOQUE_DESCARGA), b''):
+                digest.update(bloque)
+        sha = digest.hexdigest()
+        destino = self.ruta_snapshot(sha)
+        if not destino.exists():
+            self._materializar(Path(ruta_csv), destino)
+        indice = self._leer_indice()
+        indice["etag"] = indice["last_modified"] = None
+        return self._usar(indice, sha)
+
+    def _materializar(self, ruta_csv: Path, destino: Path) -> None:
+        tmp = destino.with_suffix(".parquet.tmp")
+        pq.write_table(leer_tabla_csv(ruta_csv), tmp, row_group_size=FILAS_POR_GRUPO)
+        os.replace(tmp, destino)
+
+    def cargar(self) -> pd.DataFrame:
+        return a_pandas(pq.read_table(self.obtener()))
+
+    def escanear(self, columnas: Optional[list] = None, filtros: Optional[list] = None) -> pd.DataFrame:
+        """
+            Lee el snapshot vigente sin tocar la red, empujando proyeccion (columnas) y
+            predicados (filtros en formato pyarrow, p. ej. [('location', 'in', [...])]) al scan.
+        """
+        ruta = self.snapshot_actual()
+        if ruta is None:
+            raise Exception(f"No hay snapshot de OWID en {self._dir}; materializar leer_datos primero")
+        return a_pandas(pq.read_table(ruta, columns=columnas, filters=filtros))
+
+    def _usar(self, indice: dict, sha: str) -> Path:
+        indice["actual"] = sha
+        indice["snapshots"].setdefault(sha, {"creado": _ahora().isoformat()})
+        indice["snapshots"][sha]["ultimo_uso"] = _ahora().isoformat()
+        self._desalojar(indice)
+        self._guardar_indice(indice)
+        return self.ruta_snapshot(sha)
+
+    def _desalojar(self, indice: dict) -> None:
+        """
+            Politica de retencion: por antiguedad de uso y por cantidad maxima.
+        """
+        actual = indice["actual"]
+        otros = sorted(
+            (sha for sha in indice["snapshots"] if sha != actual),
+            key=lambda sha: indice["snapshots"][sha]["ultimo_uso"],
+            reverse=True,
+        )
+        borrar = otros[max(self.max_snapshots - 1, 0):]
+        if self.max_edad_dias is not None:
+            limite = _ahora() - timedelta(days=self.max_edad_dias)
+            borrar += [
+                sha for sha in otros
+                if sha not in borrar
+                and datetime.fromisoformat(indice["snapshots"][sha]["ultimo_uso"]) < limite
+            ]
+        for sha in borrar:
+            self._borrar_archivos(sha)
+            del indice["snapshots"][sha]
+        # Los que se conservan solo valen con el esquema actual: sus archivos de otras
+        # versiones de esquema ya no se reutilizan
+        for sha in indice["snapshots"]:
+            self._borrar_archivos(sha, conservar=self.ruta_snapshot(sha))
+
+    def _borrar_archivos(self, sha: str, conservar: Optional[Path] = None) -> None:
+        # Todas las versiones de esquema del snapshot (el indice guarda solo el sha)
+        for ruta in self._dir.glob(f"{sha}-v*.parquet"):
+            if ruta != conservar:
+                ruta.unlink(missing_ok=True)
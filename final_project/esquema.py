@@ -0,0 +1,86 @@
+"""
+    Esquema compacto de las columnas de OWID, aplicado una sola vez en la ingesta.
+
+    - location: diccionario (categorical en pandas) con categorias ordenadas, asi el
+      orden por location es el mismo que con texto
+    - date: una sola conversion con formato explicito a date32 (datetime64 en pandas);
+      las fechas que no respetan el formato quedan nulas
+    - numericas: float32 cuando la columna completa se representa sin perdida, si no float64
+
+    El snapshot Parquet guarda la tabla ya tipada: los assets posteriores confian en
+    estos tipos y no vuelven a parsear fechas ni a convertir texto.
+"""
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+FORMATO_FECHA = '%Y-%m-%d'
+COLUMNAS_NUMERICAS = ['new_cases', 'people_vaccinated', 'population']
+
+# Cambia cuando cambia el formato del snapshot: los snapshots viejos no se reutilizan
+VERSION_ESQUEMA = 2
+
+
+def _location(columna: pa.ChunkedArray) -> pa.ChunkedArray:
+    if pa.types.is_dictionary(columna.type):
+        columna = columna.cast(columna.type.value_type)
+    categorias = pc.unique(columna).drop_null()
+    categorias = pc.take(categorias, pc.sort_indices(categorias))
+    # Indices del menor ancho posible: pandas usa el mismo ancho para los codigos
+    tipo_indices = next(t for t in (pa.int8(), pa.int16(), pa.int32()) if len(categorias) < 2 ** (t.bit_width - 1))
+    indices = pc.index_in(columna, value_set=categorias).cast(tipo_indices)
+    return pa.chunked_array([
+        pa.DictionaryArray.from_arrays(bloque, categorias) for bloque in indices.chunks
+    ], type=pa.dictionary(tipo_indices, categorias.type))
+
+
+def _fecha(columna: pa.ChunkedArray) -> pa.ChunkedArray:
+    if pa.types.is_date32(columna.type):
+        return columna
+    if pa.types.is_timestamp(columna.type) or pa.types.is_date(columna.type):
+        return columna.cast(pa.date32())
+    fechas = pc.strptime(columna, format=FORMATO_FECHA, unit='s', error_is_null=True)
+    return fechas.cast(pa.date32())
+
+
+def _numerica(columna: pa.ChunkedArray) -> pa.ChunkedArray:
+    columna = columna.cast(pa.float64())
+    reducida = columna.cast(pa.float32(), safe=False)
+    # Sin perdida: ida y vuelta a float64 igual en todos los valores no nulos
+    iguales = pc.or_(pc.equal(reducida.cast(pa.float64()), columna), pc.is_nan(columna))
+    exacta = pc.all(iguales).as_py()
+    return reducida if exacta in (True, None) else columna
+
+
+def aplicar_esquema(tabla: pa.Table, reducir_numericas: bool = True) -> pa.Table:
+    """
+        Devuelve tabla con location, date y las columnas numericas en sus tipos compactos.
+        reducir_numericas=False conserva los tipos numericos de entrada (p. ej. un
+        subconjunto de un snapshot ya tipado).
+    """
+    conversiones = {'location': _location, 'date': _fecha}
+    if reducir_numericas:
+        conversiones.update({col: _numerica for col in COLUMNAS_NUMERICAS})
+    for nombre, convertir in conversiones.items():
+        if nombre in tabla.column_names:
+            i = tabla.column_names.index(nombre)
+            tabla = tabla.set_column(i, nombre, convertir(tabla.column(i)))
+    # La metadata de pandas describe los tipos anteriores y to_pandas los restauraria
+    return tabla.replace_schema_metadata(None)
+
+
+def a_pandas(tabla: pa.Table) -> pd.DataFrame:
+    """
+        Conversion a pandas de una tabla con el esquema: diccionario -> categorical y
+        date32 -> datetime64 (no objetos date).
+    """
+    return tabla.to_pandas(split_blocks=True, self_destruct=True, date_as_object=False)
+
+
+def parsear_fechas(fechas: pd.Series) -> pd.Series:
+    """
+        Fechas como datetime64; solo convierte si la serie no viene ya tipada.
+    """
+    if pd.api.types.is_datetime64_any_dtype(fechas):
+        return fechas
+    return pd.to_datetime(fechas, format=FORMATO_FECHA, errors='coerce')
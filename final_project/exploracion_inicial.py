@@ -1,84 +1,367 @@
+"""
+    Exploración inicial de OWID en una sola pasada por bloques.
+
+    El CSV se lee en bloques de filas_por_bloque (memoria acotada por el bloque, no
+    por el archivo) y cada bloque aporta estadísticas combinables por (location,
+    columna): filas, nulos, mínimo/máximo, rango de fechas con dato y un sketch KMV
+    (k valores de hash mínimos) para estimar valores distintos. Con procesos > 1 el
+    archivo se divide en rangos de bytes alineados a fin de línea y cada proceso
+    perfila su rango (el CSV de OWID no tiene saltos de línea dentro de campos).
+
+    tabla_perfilado.csv conserva su forma (una fila de resumen para los países de
+    interés); el perfil completo por país y columna se escribe aparte con --detalle.
+"""
+import argparse
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
 import pandas as pd
 
-def crear_tabla_perfilado():
+PAISES_INTERES = ['Ecuador', 'Finland']
+COLUMNA_PAIS = 'country'
+COLUMNA_FECHA = 'date'
+FILAS_POR_BLOQUE = 100_000
+# Valores por sketch: error relativo de la estimación ~ 1/sqrt(k - 2) (~9%)
+K_DISTINTOS = 128
+TODAS = '(todas)'
+
+_CLAVES = ['location', 'columna']
+COLUMNAS_PERFIL = [
+    'location', 'columna', 'tipo', 'filas', 'nulos', 'porcentaje_nulos',
+    'minimo', 'maximo', 'distintos_estimados', 'fecha_min', 'fecha_max',
+]
+
+
+class _Segmento(io.RawIOBase):
+    """
+        Vista de solo lectura de los bytes [inicio, fin) de un archivo.
+    """
+
+    def __init__(self, ruta: str, inicio: int, fin: int):
+        self._archivo = open(ruta, 'rb')
+        self._archivo.seek(inicio)
+        self._restante = fin - inicio
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, destino) -> int:
+        n = min(len(destino), self._restante)
+        if n <= 0:
+            return 0
+        leidos = self._archivo.readinto(memoryview(destino)[:n])
+        self._restante -= leidos
+        return leidos
+
+    def close(self) -> None:
+        self._archivo.close()
+        super().close()
+
+
+def _rangos_bytes(ruta: str, partes: int) -> tuple:
+    """
+        Encabezado y rangos [inicio, fin) del cuerpo del CSV que empiezan en inicio de línea.
+    """
+    tamano = os.path.getsize(ruta)
+    with open(ruta, 'rb') as f:
+        encabezado = f.readline()
+        cortes = [f.tell()]
+        for i in range(1, partes):
+            f.seek(max(cortes[-1], cortes[0] + (tamano - cortes[0]) * i // partes))
+            f.readline()
+            cortes.append(min(f.tell(), tamano))
+    cortes.append(tamano)
+    rangos = [(a, b) for a, b in zip(cortes, cortes[1:]) if b > a]
+    return encabezado.decode('utf-8').strip().split(','), rangos
+
+
+def _hashes(valores: pd.Series) -> np.ndarray:
+    # Numéricos como float64: el mismo valor hashea igual aunque un bloque lo lea como int
+    if pd.api.types.is_numeric_dtype(valores) and not pd.api.types.is_bool_dtype(valores):
+        valores = valores.astype('float64')
+    return pd.util.hash_pandas_object(valores, index=False).to_numpy()
+
+
+def _recortar_sketch(sketch: pd.DataFrame, k: int) -> pd.DataFrame:
+    """
+        Los k hashes distintos más chicos de cada (location, columna).
+    """
+    if sketch.empty:
+        return sketch
+    codigo_loc, _ = pd.factorize(sketch['location'])
+    codigo_col, columnas = pd.factorize(sketch['columna'])
+    grupo = codigo_loc.astype('int64') * len(columnas) + codigo_col
+    hashes = sketch['hash'].to_numpy()
+    orden = np.lexsort((hashes, grupo))
+    grupo, hashes = grupo[orden], hashes[orden]
+    distinto = np.ones(len(orden), dtype=bool)
+    distinto[1:] = (grupo[1:] != grupo[:-1]) | (hashes[1:] != hashes[:-1])
+    orden, grupo = orden[distinto], grupo[distinto]
+    # Posición de cada hash dentro de su grupo (ya ordenado por hash)
+    inicio = np.flatnonzero(np.r_[True, grupo[1:] != grupo[:-1]])
+    posicion = np.arange(len(grupo)) - np.repeat(inicio, np.diff(np.r_[inicio, len(grupo)]))
+    return sketch.iloc[orden[posicion < k]].reset_index(drop=True)
+
+
+def _perfilar_bloque(df: pd.DataFrame, paises: Optional[List[str]], k: int) -> dict:
+    """
+        Estadísticas combinables de un bloque (ver _combinar).
+    """
+    filas_totales = len(df)
+    if paises is not None:
+        df = df[df[COLUMNA_PAIS].isin(paises)]
+    ubicacion = df[COLUMNA_PAIS].astype(object)
+    fechas = pd.to_datetime(df[COLUMNA_FECHA], format='%Y-%m-%d', errors='coerce')
+    columnas = list(df.columns)
+    grupos = ubicacion.rename('location')
+
+    presentes = df[columnas].notna()
+    estadisticas = pd.DataFrame({
+        'filas': presentes.groupby(grupos, sort=False).size().repeat(len(columnas)).to_numpy(),
+    }, index=pd.MultiIndex.from_product(
+        [presentes.groupby(grupos, sort=False).size().index, columnas], names=_CLAVES,
+    ))
+    estadisticas['nulos'] = (~presentes).groupby(grupos, sort=False).sum().stack()
+    numericas = df[columnas].select_dtypes('number')
+    estadisticas['minimo'] = numericas.groupby(grupos, sort=False).min().stack()
+    estadisticas['maximo'] = numericas.groupby(grupos, sort=False).max().stack()
+    con_fecha = pd.DataFrame({c: fechas.where(presentes[c]) for c in columnas})
+    estadisticas['fecha_min'] = con_fecha.groupby(grupos, sort=False).min().stack()
+    estadisticas['fecha_max'] = con_fecha.groupby(grupos, sort=False).max().stack()
+
+    sketches = []
+    for columna in columnas:
+        valores = df[columna]
+        mascara = presentes[columna].to_numpy()
+        sketches.append(pd.DataFrame({
+            'location': ubicacion.to_numpy()[mascara],
+            'columna': columna,
+            'hash': _hashes(valores[mascara]),
+        }))
+    sketch = pd.concat(sketches, ignore_index=True) if sketches else pd.DataFrame(columns=[*_CLAVES, 'hash'])
+
+    return {
+        'filas_totales': filas_totales,
+        'tipos': {c: {str(df[c].dtype)} for c in df.columns},
+        'estadisticas': estadisticas.reset_index(),
+        'sketch': _recortar_sketch(sketch, k),
+    }
+
+
+def _combinar(partes: List[dict], k: int) -> dict:
+    """
+        Une estadísticas de bloques: suma filas/nulos, mínimo de mínimos, máximo de
+        máximos y los k hashes mínimos de la unión de sketches.
+    """
+    partes = [p for p in partes if p is not None]
+    tipos = {}
+    for parte in partes:
+        for columna, vistos in parte['tipos'].items():
+            tipos.setdefault(columna, set()).update(vistos)
+    estadisticas = pd.concat([p['estadisticas'] for p in partes], ignore_index=True)
+    estadisticas = estadisticas.groupby(_CLAVES, sort=False).agg({
+        'filas': 'sum', 'nulos': 'sum', 'minimo': 'min', 'maximo': 'max', 'fecha_min': 'min', 'fecha_max': 'max',
+    }).reset_index()
+    return {
+        'filas_totales': sum(p['filas_totales'] for p in partes),
+        'tipos': tipos,
+        'estadisticas': estadisticas,
+        'sketch': _recortar_sketch(pd.concat([p['sketch'] for p in partes], ignore_index=True), k),
+    }
+
+
+def _leer_bloques(fuente, filas_por_bloque: int, **opciones):
+    return pd.read_csv(fuente, chunksize=filas_por_bloque, low_memory=False, **opciones)
+
+
+def _perfilar_rango(ruta: str, columnas: List[str], inicio: int, fin: int,
+                    paises: Optional[List[str]], filas_por_bloque: int, k: int) -> Optional[dict]:
+    """
+        Worker: perfila los bytes [inicio, fin) del cuerpo del CSV.
+    """
+    acumulado = None
+    with io.BufferedReader(_Segmento(ruta, inicio, fin)) as segmento:
+        for bloque in _leer_bloques(segmento, filas_por_bloque, header=None, names=columnas):
+            acumulado = _combinar([acumulado, _perfilar_bloque(bloque, paises, k)], k)
+    return acumulado
+
+
+def perfilar_csv(
+    ruta_csv: str,
+    paises: Optional[List[str]] = None,
+    filas_por_bloque: int = FILAS_POR_BLOQUE,
+    procesos: int = 1,
+    k: int = K_DISTINTOS,
+) -> pd.DataFrame:
+    """
+        Perfil por (location, columna) de todo el CSV (o de los países indicados),
+        más filas location='(todas)' con el agregado de cada columna. Columnas:
+        location, columna, tipo, filas, nulos, porcentaje_nulos, minimo, maximo,
+        distintos_estimados, fecha_min, fecha_max. El atributo attrs['filas_totales']
+        cuenta todas las filas del archivo.
+    """
+    ruta_csv = str(ruta_csv)
+    if procesos > 1:
+        columnas, rangos = _rangos_bytes(ruta_csv, procesos)
+        tareas = [(ruta_csv, columnas, a, b, paises, filas_por_bloque, k) for a, b in rangos]
+        with ProcessPoolExecutor(max_workers=max(len(tareas), 1)) as pool:
+            partes = list(pool.map(_perfilar_rango, *zip(*tareas))) if tareas else []
+    else:
+        columnas = list(pd.read_csv(ruta_csv, nrows=0).columns)
+        acumulado = None
+        for bloque in _leer_bloques(ruta_csv, filas_por_bloque):
+            acumulado = _combinar([acumulado, _perfilar_bloque(bloque, paises, k)], k)
+        partes = [acumulado]
+
+    partes = [p for p in partes if p is not None]
+    if not partes:
+        perfil = pd.DataFrame(columns=COLUMNAS_PERFIL)
+        perfil.attrs.update(filas_totales=0, columnas=columnas)
+        return perfil
+    total = _combinar(partes, k)
+    return _tabla_perfil(total, columnas, k)
+
+
+def _tipo(vistos: set) -> str:
+    tipos = [np.dtype(t) for t in vistos if t not in ('str', 'object', 'string')]
+    if len(tipos) < len(vistos) or not tipos:
+        return 'str'
+    return np.result_type(*tipos).name
+
+
+def _estimar_distintos(hashes: pd.Series, k: int) -> int:
+    # KMV: con menos de k hashes la cuenta es exacta; si no, (k - 1) / h_k normalizado
+    if len(hashes) < k:
+        return len(hashes)
+    return int(round((k - 1) / (float(hashes.max()) / 2.0 ** 64)))
+
+
+def _tabla_perfil(total: dict, columnas: List[str], k: int) -> pd.DataFrame:
+    estadisticas = total['estadisticas']
+    # Agregado de todas las locaciones: mismas reglas de combinación
+    todas = estadisticas.groupby('columna', sort=False).agg({
+        'filas': 'sum', 'nulos': 'sum', 'minimo': 'min', 'maximo': 'max', 'fecha_min': 'min', 'fecha_max': 'max',
+    }).reset_index().assign(location=TODAS)
+    sketch = total['sketch']
+    sketch_todas = _recortar_sketch(sketch.assign(location=TODAS), k)
+
+    perfil = pd.concat([todas, estadisticas], ignore_index=True)
+    distintos = pd.concat([sketch_todas, sketch]).groupby(_CLAVES, sort=False)['hash'].agg(
+        lambda h: _estimar_distintos(h, k)
+    ).rename('distintos_estimados')
+    perfil = perfil.merge(distintos.reset_index(), on=_CLAVES, how='left')
+    perfil['distintos_estimados'] = perfil['distintos_estimados'].fillna(0).astype('int64')
+    perfil['tipo'] = perfil['columna'].map({c: _tipo(v) for c, v in total['tipos'].items()})
+    perfil['porcentaje_nulos'] = (perfil['nulos'] / perfil['filas'] * 100).round(1)
+    for col in ('fecha_min', 'fecha_max'):
+        perfil[col] = pd.to_datetime(perfil[col]).dt.strftime('%Y-%m-%d')
+
+    # Orden estable: agregado primero, luego locaciones alfabéticas; columnas en orden del archivo
+    orden_columnas = {c: i for i, c in enumerate(columnas)}
+    perfil = perfil.assign(
+        _todas=perfil['location'] != TODAS, _col=perfil['columna'].map(orden_columnas),
+    ).sort_values(['_todas', 'location', '_col'], kind='stable').drop(columns=['_todas', '_col'])
+    perfil = perfil[COLUMNAS_PERFIL].reset_index(drop=True)
+    perfil.attrs.update(filas_totales=total['filas_totales'], columnas=columnas)
+    return perfil
+
+
+def resumen_perfilado(perfil: pd.DataFrame, paises: List[str] = PAISES_INTERES) -> dict:
+    """
+        Fila de tabla_perfilado.csv (misma forma que el script original) a partir del
+        perfil por país: registros por país, rango de fechas, mínimo/máximo de new_cases
+        y porcentaje de faltantes de new_cases y people_vaccinated en los países.
+    """
+    seleccion = perfil[perfil['location'].isin(paises)]
+
+    def columna(nombre):
+        return seleccion[seleccion['columna'] == nombre]
+
+    def faltantes(nombre):
+        filas = columna(nombre)
+        return round(filas['nulos'].sum() / filas['filas'].sum() * 100, 1) if filas['filas'].sum() else float('nan')
+
+    fechas = columna(COLUMNA_FECHA)
+    resumen = {
+        'total_filas_dataset': perfil.attrs['filas_totales'],
+        'total_columnas': len(perfil.attrs['columnas']),
+        'paises_analizados': ', '.join(paises),
+    }
+    for pais in paises:
+        resumen[f'registros_{pais.lower()}'] = int(fechas.loc[fechas['location'] == pais, 'filas'].sum())
+    resumen.update({
+        'fecha_inicio': fechas['fecha_min'].min(),
+        'fecha_fin': fechas['fecha_max'].max(),
+        'new_cases_minimo': columna('new_cases')['minimo'].min(),
+        'new_cases_maximo': columna('new_cases')['maximo'].max(),
+        'porcentaje_missing_new_cases': faltantes('new_cases'),
+        'porcentaje_missing_people_vaccinated': faltantes('people_vaccinated'),
+        'columnas_principales': 'country,date,new_cases,people_vaccinated,population',
+    })
+    return resumen
+
+
+def crear_tabla_perfilado(
+    ruta_csv: str = 'data/compact.csv',
+    ruta_salida: str = 'tabla_perfilado.csv',
+    paises: List[str] = PAISES_INTERES,
+    todos_los_paises: bool = False,
+    ruta_detalle: Optional[str] = None,
+    filas_por_bloque: int = FILAS_POR_BLOQUE,
+    procesos: int = 1,
+):
     """
     Script de exploración inicial según las instrucciones del proyecto
-    Genera tabla_perfilado.csv requerida
+    Genera tabla_perfilado.csv requerida (y opcionalmente el perfil por país y columna)
     """
     print("=== EXPLORACIÓN INICIAL DE DATOS COVID-19 ===")
-    
-    # Leer el archivo
-    df = pd.read_csv('data/compact.csv')
-    print(f"Datos cargados: {df.shape[0]} filas, {df.shape[1]} columnas")
-    
-    # Filtrar por Ecuador y país comparativo (Finland)
-    paises_interes = ['Ecuador', 'Finland']
-    df_filtrado = df[df['country'].isin(paises_interes)]
-    
-    print(f"Datos filtrados para Ecuador y Finland: {len(df_filtrado)} registros")
-    
-    # Analisis basico requerido
-    
-    # 1. Columnas y tipos de datos
-    columnas_tipos = df_filtrado.dtypes.to_dict()
+
+    perfil = perfilar_csv(
+        ruta_csv, paises=None if todos_los_paises else paises,
+        filas_por_bloque=filas_por_bloque, procesos=procesos,
+    )
+    print(f"Datos perfilados: {perfil.attrs['filas_totales']} filas, {len(perfil.attrs['columnas'])} columnas")
+
+    todas = perfil[perfil['location'] == TODAS].set_index('columna')
     print("\n1. Columnas y tipos de datos:")
-    for col, tipo in list(columnas_tipos.items())[:10]:  # Mostrar primeras 10
+    for col, tipo in list(todas['tipo'].items())[:10]:  # Mostrar primeras 10
         print(f"   {col}: {tipo}")
-    
-    # 2. Mínimo y máximo de new_cases
-    new_cases_min = df_filtrado['new_cases'].min()
-    new_cases_max = df_filtrado['new_cases'].max()
-    print(f"\n2. Rango new_cases: {new_cases_min} a {new_cases_max}")
-    
-    # 3. Porcentaje de valores faltantes
-    missing_new_cases = (df_filtrado['new_cases'].isna().sum() / len(df_filtrado)) * 100
-    missing_vaccinated = (df_filtrado['people_vaccinated'].isna().sum() / len(df_filtrado)) * 100
-    
+
+    perfilado = resumen_perfilado(perfil, paises)
+    print(f"\n2. Rango new_cases: {perfilado['new_cases_minimo']} a {perfilado['new_cases_maximo']}")
     print(f"\n3. Valores faltantes:")
-    print(f"   new_cases: {missing_new_cases:.1f}%")
-    print(f"   people_vaccinated: {missing_vaccinated:.1f}%")
-    
-    # 4. Rango de fechas
-    fecha_min = df_filtrado['date'].min()
-    fecha_max = df_filtrado['date'].max()
-    print(f"\n4. Rango de fechas: {fecha_min} a {fecha_max}")
-    
-    # Información adicional útil
-    registros_ecuador = len(df_filtrado[df_filtrado['country'] == 'Ecuador'])
-    registros_finland = len(df_filtrado[df_filtrado['country'] == 'Finland'])
-    
-    # Crear tabla de perfilado como diccionario
-    perfilado = {
-        'total_filas_dataset': len(df),
-        'total_columnas': len(df.columns),
-        'paises_analizados': 'Ecuador, Finland',
-        'registros_ecuador': registros_ecuador,
-        'registros_finland': registros_finland,
-        'fecha_inicio': fecha_min,
-        'fecha_fin': fecha_max,
-        'new_cases_minimo': new_cases_min,
-        'new_cases_maximo': new_cases_max,
-        'porcentaje_missing_new_cases': round(missing_new_cases, 1),
-        'porcentaje_missing_people_vaccinated': round(missing_vaccinated, 1),
-        'columnas_principales': 'country,date,new_cases,people_vaccinated,population'
-    }
-    
-    # Convertir a DataFrame y guardar
-    df_perfilado = pd.DataFrame([perfilado])
-    df_perfilado.to_csv('tabla_perfilado.csv', index=False)
-    
+    print(f"   new_cases: {perfilado['porcentaje_missing_new_cases']:.1f}%")
+    print(f"   people_vaccinated: {perfilado['porcentaje_missing_people_vaccinated']:.1f}%")
+    print(f"\n4. Rango de fechas: {perfilado['fecha_inicio']} a {perfilado['fecha_fin']}")
+
+    pd.DataFrame([perfilado]).to_csv(ruta_salida, index=False)
+
     print(f"\n=== RESUMEN DEL PERFILADO ===")
     for key, value in perfilado.items():
         print(f"{key}: {value}")
-    
-    print(f"\n✅ Tabla de perfilado guardada como 'tabla_perfilado.csv'")
-    
-    # Mostrar muestra de datos para verificación
-    print(f"\n=== MUESTRA DE DATOS (Ecuador) ===")
-    ecuador_sample = df_filtrado[df_filtrado['country'] == 'Ecuador'][['date', 'new_cases', 'people_vaccinated', 'population']].head(5)
-    print(ecuador_sample)
-    
+
+    print(f"\n✅ Tabla de perfilado guardada como '{ruta_salida}'")
+
+    if ruta_detalle:
+        perfil.to_csv(ruta_detalle, index=False)
+        print(f"✅ Perfil por país y columna ({len(perfil)} filas) guardado como '{ruta_detalle}'")
+
     return perfilado
 
+
 if __name__ == "__main__":
-    crear_tabla_perfilado()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Perfilado de OWID en una pasada por bloques")
+    parser.add_argument("--csv", default='data/compact.csv')
+    parser.add_argument("--salida", default='tabla_perfilado.csv')
+    parser.add_argument("--paises", nargs="+", default=PAISES_INTERES)
+    parser.add_argument("--todos", action="store_true", help="perfilar todas las locaciones (el resumen sigue usando --paises)")
+    parser.add_argument("--detalle", default=None, help="CSV con el perfil por país y columna")
+    parser.add_argument("--filas-por-bloque", type=int, default=FILAS_POR_BLOQUE)
+    parser.add_argument("--procesos", type=int, default=1)
+    args = parser.parse_args()
+    crear_tabla_perfilado(
+        args.csv, args.salida, args.paises, args.todos, args.detalle, args.filas_por_bloque, args.procesos,
+    )
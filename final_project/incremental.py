@@ -0,0 +1,267 @@
+"""
+    Estado rodante por pais para actualizar las metricas de 7 dias sin recalcular
+    toda la historia.
+
+    El estado guarda, para cada location, las ultimas filas de datos_procesados que
+    necesita la ventana mas larga (6 para la incidencia, 2n-1 para el factor) y la
+    fecha hasta la que se plegaron datos. Los dias nuevos se pliegan calculando la
+    metrica solo sobre esas filas mas las nuevas: el costo depende del numero de
+    paises, no de la historia. Las sumas de ventana se recalculan sobre esas pocas
+    filas en cada pliegue, asi el error de punto flotante no se acumula entre
+    actualizaciones.
+
+    comparar_con_recalculo contrasta lo acumulado con un recalculo completo.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from dagster import ConfigurableResource
+
+COLUMNAS_ESTADO = ['location', 'date', 'new_cases', 'population']
+CLAVE_METADATA = b"estado_rodante"
+
+# Diferencia relativa admitida frente al recalculo completo: pandas acumula el
+# promedio movil desde el inicio de la serie y el estado desde su primera fila
+TOLERANCIA_RELATIVA = 1e-9
+
+
+class EstadoRodante:
+    """
+        - ventana: ultimas filas_contexto + 1 filas por location (columnas COLUMNAS_ESTADO)
+        - filas_contexto: filas previas que necesita la metrica para una fila nueva
+        - hasta: fecha (exclusiva) hasta la que se plegaron datos
+        - paises: locations de los datos con que se sembro o plego el estado
+        - config: parametros de la metrica (p. ej. ventanas) con que se construyo
+    """
+
+    def __init__(
+        self,
+        ventana: pd.DataFrame,
+        filas_contexto: int,
+        hasta: Optional[pd.Timestamp],
+        paises: Optional[List[str]] = None,
+        config: Optional[dict] = None,
+    ):
+        self.ventana = ventana
+        self.filas_contexto = filas_contexto
+        self.hasta = hasta
+        self.paises = paises
+        self.config = config
+
+    @classmethod
+    def desde_historia(
+        cls,
+        datos_procesados: pd.DataFrame,
+        filas_contexto: int,
+        hasta: Optional[pd.Timestamp] = None,
+        paises: Optional[List[str]] = None,
+        config: Optional[dict] = None,
+    ) -> "EstadoRodante":
+        """
+            Estado inicial a partir de datos_procesados (ordenado por location y fecha).
+            paises por defecto son las locations de datos_procesados.
+        """
+        if paises is None:
+            paises = lista_paises(datos_procesados)
+        estado = cls(pd.DataFrame(columns=COLUMNAS_ESTADO), filas_contexto, None, sorted(paises), config)
+        estado.ventana = estado._recortar(_columnas_estado(datos_procesados))
+        if hasta is None and not datos_procesados.empty:
+            hasta = datos_procesados['date'].max() + pd.Timedelta(days=1)
+        estado.hasta = hasta
+        return estado
+
+    def continua(
+        self, inicio: pd.Timestamp, filas_contexto: int, paises: List[str], config: Optional[dict] = None
+    ) -> bool:
+        """
+            True si los datos desde inicio se pueden plegar sobre este estado: mismo
+            punto de corte, mismas filas de contexto, mismos paises y misma config. Un
+            pais nuevo no tiene historia en el estado y sus primeras ventanas saldrian mal.
+        """
+        return (
+            self.hasta is not None and self.hasta == inicio and self.filas_contexto == filas_contexto
+            and self.paises == sorted(paises) and self.config == config
+        )
+
+    def _recortar(self, datos: pd.DataFrame) -> pd.DataFrame:
+        # La fila actual mas filas_contexto previas: lo que necesita la proxima fila nueva
+        return datos.groupby('location', observed=True, sort=False).tail(self.filas_contexto + 1)
+
+    def _ultimas_fechas(self) -> pd.Series:
+        if self.ventana.empty:
+            return pd.Series(dtype='datetime64[ns]')
+        ultima = self.ventana.groupby('location', observed=True)['date'].max()
+        ultima.index = ultima.index.astype(object)
+        return ultima
+
+    def avanzar(
+        self,
+        nuevos: pd.DataFrame,
+        funcion: Callable[[pd.DataFrame], pd.DataFrame],
+        columna_fecha: str,
+        hasta: Optional[pd.Timestamp] = None,
+    ) -> pd.DataFrame:
+        """
+            Pliega las filas nuevas (fechas posteriores a las del estado de cada
+            location) y devuelve solo las filas nuevas de la metrica, en el mismo orden
+            que un recalculo completo.
+        """
+        if hasta is not None:
+            self.hasta = hasta
+        elif not nuevos.empty:
+            self.hasta = max(self.hasta or pd.Timestamp.min, nuevos['date'].max() + pd.Timedelta(days=1))
+        if nuevos.empty:
+            return pd.DataFrame()
+
+        nuevos = _columnas_estado(nuevos)
+        ultima = self._ultimas_fechas()
+        previa = ultima.reindex(nuevos['location'].astype(object)).to_numpy()
+        if (nuevos['date'].to_numpy() <= previa).any():
+            raise ValueError("Fechas ya plegadas en el estado: se requiere un recálculo completo")
+
+        combinado = _concatenar(self.ventana, nuevos).sort_values(['location', 'date'], kind='stable')
+        resultado = funcion(combinado)
+        self.ventana = self._recortar(combinado)
+        if resultado.empty:
+            return resultado
+
+        # Solo las fechas posteriores a lo que ya tenia el estado para cada pais
+        limite = ultima.reindex(resultado['pais'].astype(object)).fillna(pd.Timestamp.min).to_numpy()
+        return resultado[resultado[columna_fecha].to_numpy() > limite].reset_index(drop=True)
+
+    def guardar(self, ruta: Path) -> None:
+        """
+            Parquet con la ventana; filas_contexto, hasta, paises y config van en la
+            metadata del esquema.
+        """
+        tabla = pa.Table.from_pandas(self.ventana.astype({'location': object}), preserve_index=False)
+        datos = {
+            "filas_contexto": self.filas_contexto,
+            "hasta": None if self.hasta is None else self.hasta.isoformat(),
+            "paises": self.paises,
+            "config": self.config,
+        }
+        tabla = tabla.replace_schema_metadata({**(tabla.schema.metadata or {}), CLAVE_METADATA: json.dumps(datos)})
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        tmp = ruta.with_suffix(ruta.suffix + ".tmp")
+        pq.write_table(tabla, tmp)
+        os.replace(tmp, ruta)
+
+    @classmethod
+    def cargar(cls, ruta: Path) -> Optional["EstadoRodante"]:
+        if not ruta.exists():
+            return None
+        tabla = pq.read_table(ruta)
+        datos = json.loads(tabla.schema.metadata[CLAVE_METADATA])
+        hasta = None if datos["hasta"] is None else pd.Timestamp(datos["hasta"])
+        # Estados guardados antes de registrar paises no continuan: se vuelven a sembrar
+        return cls(
+            tabla.to_pandas(date_as_object=False), datos["filas_contexto"], hasta,
+            datos.get("paises"), datos.get("config"),
+        )
+
+
+def lista_paises(datos: pd.DataFrame) -> List[str]:
+    """
+        Locations presentes en datos, ordenadas.
+    """
+    if datos.empty:
+        return []
+    return sorted(datos['location'].dropna().astype(object).unique())
+
+
+def _columnas_estado(datos: pd.DataFrame) -> pd.DataFrame:
+    if datos.empty:
+        return pd.DataFrame(columns=COLUMNAS_ESTADO)
+    return datos[[col for col in COLUMNAS_ESTADO if col in datos.columns]]
+
+
+def _concatenar(ventana: pd.DataFrame, nuevos: pd.DataFrame) -> pd.DataFrame:
+    """
+        Une estado y filas nuevas conservando location como categorical si las
+        nuevas lo son (categorias ordenadas, como el esquema de ingesta).
+    """
+    if ventana.empty:
+        return nuevos
+    categorical = isinstance(nuevos['location'].dtype, pd.CategoricalDtype)
+    combinado = pd.concat(
+        [ventana.astype({'location': object}), nuevos.astype({'location': object})], ignore_index=True
+    )
+    if categorical:
+        categorias = sorted(combinado['location'].dropna().unique())
+        combinado['location'] = pd.Categorical(combinado['location'], categories=categorias)
+    return combinado.astype(nuevos.dtypes.drop('location').to_dict())
+
+
+class EstadoIncremental(ConfigurableResource):
+    """
+        Estados rodantes de las metricas en disco (un Parquet por metrica).
+
+        - activo: plegar cada particion nueva sobre el estado en vez de recalcular
+          con los dias de contexto; sin estado previo o fuera de orden (backfill de
+          fechas ya plegadas) se recalcula y se vuelve a sembrar el estado
+    """
+    directorio: str = "data/estado_metricas"
+    activo: bool = False
+
+    def _ruta(self, nombre: str) -> Path:
+        return Path(self.directorio) / f"{nombre}.parquet"
+
+    def cargar(self, nombre: str) -> Optional[EstadoRodante]:
+        return EstadoRodante.cargar(self._ruta(nombre)) if self.activo else None
+
+    def guardar(self, nombre: str, estado: EstadoRodante) -> None:
+        if self.activo:
+            estado.guardar(self._ruta(nombre))
+
+
+def comparar_con_recalculo(
+    acumulado: pd.DataFrame, recalculo: pd.DataFrame, claves: List[str], tolerancia: float = TOLERANCIA_RELATIVA
+) -> dict:
+    """
+        Filas faltantes/sobrantes por claves y maxima diferencia relativa en las
+        columnas numericas comunes (inf == inf, NaN == NaN).
+    """
+    if acumulado.empty or recalculo.empty:
+        return {
+            "filas_faltantes": len(recalculo), "filas_sobrantes": len(acumulado),
+            "filas_distintas": 0, "max_diferencia_relativa": 0.0,
+            "consistente": len(acumulado) == len(recalculo),
+        }
+
+    def normalizar(df):
+        return df.astype({c: object for c in claves if isinstance(df[c].dtype, pd.CategoricalDtype)})
+
+    unido = normalizar(acumulado).merge(
+        normalizar(recalculo), on=claves, how='outer', suffixes=('', '_recalculo'), indicator=True,
+    )
+    faltantes = int((unido['_merge'] == 'right_only').sum())
+    sobrantes = int((unido['_merge'] == 'left_only').sum())
+    comunes = unido[unido['_merge'] == 'both']
+
+    distintas = np.zeros(len(comunes), dtype=bool)
+    maxima = 0.0
+    for col in [c for c in acumulado.columns if c not in claves and f"{c}_recalculo" in unido.columns]:
+        a = comunes[col].to_numpy(dtype='float64')
+        b = comunes[f"{col}_recalculo"].to_numpy(dtype='float64')
+        iguales = (a == b) | (np.isnan(a) & np.isnan(b))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            relativa = np.where(iguales, 0.0, np.abs(a - b) / np.maximum(np.abs(b), np.finfo('float64').tiny))
+        relativa = np.nan_to_num(relativa, nan=np.inf)
+        distintas |= relativa > tolerancia
+        if len(relativa):
+            maxima = max(maxima, float(relativa.max()))
+
+    return {
+        "filas_faltantes": faltantes,
+        "filas_sobrantes": sobrantes,
+        "filas_distintas": int(distintas.sum()),
+        "max_diferencia_relativa": maxima,
+        "consistente": faltantes == 0 and sobrantes == 0 and not distintas.any(),
+    }
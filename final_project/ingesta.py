@@ -0,0 +1,96 @@
+"""
+    Ingesta en streaming del CSV de OWID.
+
+    El cuerpo de la respuesta se escribe a disco por bloques y luego se lee con el
+    lector CSV multihilo de Arrow, cargando solo las columnas que usan los assets.
+"""
+import hashlib
+from pathlib import Path
+from typing import Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import requests
+
+from .esquema import a_pandas, aplicar_esquema
+
+URL_OWID = "https://catalog.ourworldindata.org/garden/covid/latest/compact/compact.csv"
+
+# Columnas que consumen los assets posteriores (OWID publica 'country', antes 'location')
+COLUMNAS_INGESTA = ['location', 'date', 'new_cases', 'people_vaccinated', 'population']
+
+# Tipos de lectura: date se lee como texto y se convierte una sola vez con formato
+# explicito en aplicar_esquema (las fechas invalidas quedan nulas en vez de abortar)
+TIPOS_INGESTA = {
+    'location': pa.string(),
+    'date': pa.string(),
+    'new_cases': pa.float64(),
+    'people_vaccinated': pa.float64(),
+    'population': pa.float64(),
+}
+
+TAMANO_BLOQUE_DESCARGA = 1 << 20  # 1 MiB por escritura a disco
+TAMANO_BLOQUE_LECTURA = 16 << 20  # 16 MiB por bloque del lector Arrow
+
+
+def guardar_respuesta(response: requests.Response, destino: Union[str, Path]) -> str:
+    """
+        Escribe el cuerpo de response en destino por bloques y devuelve su sha256.
+    """
+    sha = hashlib.sha256()
+    with Path(destino).open('wb') as f:
+        for bloque in response.iter_content(chunk_size=TAMANO_BLOQUE_DESCARGA):
+            sha.update(bloque)
+            f.write(bloque)
+    return sha.hexdigest()
+
+
+def descargar_csv(url: str, destino: Union[str, Path], timeout: float = 60) -> Path:
+    """
+        Descarga url a destino por bloques, sin mantener el cuerpo completo en memoria.
+    """
+    destino = Path(destino)
+    with requests.get(url, stream=True, timeout=timeout) as response:
+        if response.status_code != 200:
+            raise Exception(f"Error al descargar datos: {response.status_code}")
+        guardar_respuesta(response, destino)
+    return destino
+
+
+def _columna_pais(ruta: Path) -> str:
+    # Solo se lee la cabecera para saber si el archivo usa 'country' o 'location'
+    with ruta.open('r', encoding='utf-8') as f:
+        cabecera = f.readline().strip().split(',')
+    return 'country' if 'country' in cabecera else 'location'
+
+
+def leer_tabla_csv(ruta: Union[str, Path]) -> pa.Table:
+    """
+        Lee el CSV con Arrow (multihilo) proyectando solo COLUMNAS_INGESTA y aplica el
+        esquema compacto (esquema.py). Renombra country -> location.
+    """
+    ruta = Path(ruta)
+    col_pais = _columna_pais(ruta)
+    columnas = [col_pais if c == 'location' else c for c in COLUMNAS_INGESTA]
+    tipos = {col_pais if c == 'location' else c: t for c, t in TIPOS_INGESTA.items()}
+
+    tabla = pa_csv.read_csv(
+        ruta,
+        read_options=pa_csv.ReadOptions(use_threads=True, block_size=TAMANO_BLOQUE_LECTURA),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=columnas,
+            include_missing_columns=True,
+            column_types=tipos,
+        ),
+    )
+    if col_pais != 'location':
+        tabla = tabla.rename_columns(['location' if c == col_pais else c for c in tabla.column_names])
+    return aplicar_esquema(tabla)
+
+
+def leer_csv_arrow(ruta: Union[str, Path]) -> pd.DataFrame:
+    """
+        leer_tabla_csv convertido a pandas (location categorical, date datetime64).
+    """
+    return a_pandas(leer_tabla_csv(ruta))
@@ -0,0 +1,188 @@
+"""
+    Instrumentacion de assets y asset checks.
+
+    @instrumentar envuelve la funcion de computo (debajo de @asset / @asset_check) y
+    registra tiempo de pared, tiempo de CPU, delta de RSS pico, filas y memoria
+    (memory_usage(deep=True)) de entradas y salidas. Las metricas se emiten como
+    metadata del MaterializeResult o de cada AssetCheckResult y, si la variable de
+    entorno COVID_METRICAS_ARCHIVO apunta a un archivo, se agregan alli como JSON lines.
+"""
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+from dagster import AssetCheckResult, MaterializeResult, OpExecutionContext
+
+VARIABLE_ARCHIVO = "COVID_METRICAS_ARCHIVO"
+INTERVALO_MUESTREO_RSS = 0.01  # segundos
+
+_PAGINA = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _rss_actual() -> Optional[int]:
+    """
+        RSS actual en bytes (/proc en Linux; en otros Unix el pico historico; None
+        donde no hay resource, p. ej. Windows).
+    """
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGINA
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maximo if sys.platform == "darwin" else maximo * 1024
+
+
+@contextmanager
+def _muestrear_rss():
+    """
+        Muestrea el RSS en un hilo mientras corre el bloque; entrega un dict que al
+        salir contiene 'delta_pico' (bytes sobre el RSS inicial, None si no se puede medir).
+    """
+    inicial = _rss_actual()
+    estado = {"pico": inicial}
+    if inicial is None:
+        yield estado
+        estado["delta_pico"] = None
+        return
+    fin = threading.Event()
+
+    def muestrear():
+        while not fin.wait(INTERVALO_MUESTREO_RSS):
+            estado["pico"] = max(estado["pico"], _rss_actual())
+
+    hilo = threading.Thread(target=muestrear, daemon=True)
+    hilo.start()
+    try:
+        yield estado
+    finally:
+        fin.set()
+        hilo.join()
+        estado["delta_pico"] = max(estado["pico"], _rss_actual()) - inicial
+
+
+def _tablas(valor) -> list:
+    if isinstance(valor, pd.DataFrame):
+        return [valor]
+    if isinstance(valor, dict):
+        # IO managers por defecto entregan particiones como dict {particion: DataFrame}
+        return [v for v in valor.values() if isinstance(v, pd.DataFrame)]
+    return []
+
+
+def perfil_tablas(valores) -> Dict[str, float]:
+    """
+        Filas y memoria (MB, memory_usage deep) sumadas de los DataFrames en valores.
+    """
+    tablas = [t for valor in valores for t in _tablas(valor)]
+    return {
+        "filas": sum(len(t) for t in tablas),
+        "memoria_mb": round(sum(int(t.memory_usage(deep=True).sum()) for t in tablas) / 2**20, 3),
+    }
+
+
+def _exportar(registro: dict) -> None:
+    ruta = os.environ.get(VARIABLE_ARCHIVO)
+    if not ruta:
+        return
+    Path(ruta).parent.mkdir(parents=True, exist_ok=True)
+    # Una linea por evento, escrita de una vez: procesos concurrentes no se intercalan
+    with open(ruta, "a", encoding="utf-8") as f:
+        f.write(json.dumps(registro, default=str) + "\n")
+
+
+def _contexto() -> Optional[OpExecutionContext]:
+    try:
+        return OpExecutionContext.get()
+    except Exception:
+        return None
+
+
+def _identificacion(contexto: Optional[OpExecutionContext], nombre: str) -> dict:
+    datos = {"fecha": datetime.now(timezone.utc).isoformat(), "nodo": nombre}
+    if contexto is None:
+        return datos
+    datos["run_id"] = contexto.run_id
+    particionado = contexto.has_assets_def and contexto.assets_def.partitions_def is not None
+    if particionado and contexto.has_partition_key_range:
+        rango = contexto.partition_key_range
+        datos["particiones"] = f"{rango.start}...{rango.end}"
+    return datos
+
+
+def instrumentar(fn: Callable) -> Callable:
+    """
+        Decorador para funciones de @asset, @asset_check y @multi_asset_check.
+    """
+    firma = inspect.signature(fn)
+
+    def medir(args, kwargs, ejecutar):
+        argumentos = firma.bind_partial(*args, **kwargs).arguments.values()
+        entrada = perfil_tablas(argumentos)
+        pared, cpu = time.perf_counter(), time.process_time()
+        with _muestrear_rss() as rss:
+            resultado = ejecutar()
+        metricas = {
+            "tiempo_pared_s": round(time.perf_counter() - pared, 6),
+            "tiempo_cpu_s": round(time.process_time() - cpu, 6),
+            "rss_pico_delta_mb": None if rss["delta_pico"] is None else round(rss["delta_pico"] / 2**20, 3),
+            "filas_entrada": entrada["filas"],
+            "memoria_entrada_mb": entrada["memoria_mb"],
+        }
+        return resultado, metricas
+
+    def registrar(metricas: dict) -> None:
+        _exportar({**_identificacion(_contexto(), fn.__name__), **metricas})
+
+    def con_metricas_check(resultado: AssetCheckResult, metricas: dict) -> AssetCheckResult:
+        return resultado.with_metadata({**(resultado.metadata or {}), **metricas})
+
+    if inspect.isgeneratorfunction(fn):
+        # multi_asset_check: los resultados se emiten juntos al terminar, con las
+        # metricas de toda la evaluacion en cada uno
+        @functools.wraps(fn)
+        def envoltura_generador(*args, **kwargs):
+            resultados, metricas = medir(args, kwargs, lambda: list(fn(*args, **kwargs)))
+            registrar(metricas)
+            for resultado in resultados:
+                yield con_metricas_check(resultado, metricas) if isinstance(resultado, AssetCheckResult) else resultado
+
+        return envoltura_generador
+
+    @functools.wraps(fn)
+    def envoltura(*args, **kwargs):
+        resultado, metricas = medir(args, kwargs, lambda: fn(*args, **kwargs))
+
+        if isinstance(resultado, AssetCheckResult):
+            registrar(metricas)
+            return con_metricas_check(resultado, metricas)
+
+        valor = resultado.value if isinstance(resultado, MaterializeResult) else resultado
+        salida = perfil_tablas([valor])
+        metricas.update({"filas_salida": salida["filas"], "memoria_salida_mb": salida["memoria_mb"]})
+        registrar(metricas)
+        if isinstance(resultado, MaterializeResult):
+            return MaterializeResult(
+                asset_key=resultado.asset_key,
+                metadata={**(resultado.metadata or {}), **metricas},
+                check_results=resultado.check_results,
+                data_version=resultado.data_version,
+                tags=resultado.tags,
+                value=resultado.value,
+            )
+        return MaterializeResult(value=resultado, metadata=metricas)
+
+    return envoltura
@@ -0,0 +1,159 @@
+"""
+    IO manager columnar para el pipeline COVID.
+
+    Cada asset (o particion) se persiste como Arrow IPC sin comprimir o Parquet.
+    Los consumidores leen con memory map: los buffers Arrow apuntan directo al
+    archivo mapeado y, con split_blocks, pandas reutiliza esos buffers para las
+    columnas numericas sin nulos en vez de copiar. Cada consumidor puede pedir
+    solo algunas columnas con AssetIn(metadata={"columnas": [...]}).
+"""
+import os
+import pickle
+from pathlib import Path
+from typing import Any, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from dagster import ConfigurableIOManager, InputContext, OutputContext
+
+EXTENSIONES = {"arrow": ".arrow", "parquet": ".parquet"}
+
+
+class ColumnarIOManager(ConfigurableIOManager):
+    """
+        - formato: 'arrow' (IPC sin comprimir, lectura zero-copy) o 'parquet' (comprimido)
+        - base_dir: directorio raiz; por defecto el storage de la instancia de Dagster
+
+        Metadata reconocida:
+        - columnas (AssetIn): proyeccion de columnas al cargar
+        - allow_missing_partitions (AssetIn): omitir particiones no materializadas
+        - columna_particion (asset): columna de fecha para repartir la salida de un
+          backfill de varias particiones en una sola ejecucion
+    """
+    formato: str = "arrow"
+    base_dir: Optional[str] = None
+
+    def _raiz(self, instance) -> Path:
+        return Path(self.base_dir) if self.base_dir else Path(instance.storage_directory())
+
+    def _ruta(self, raiz: Path, asset_key, particion: Optional[str], extension: str) -> Path:
+        ruta = raiz.joinpath(*asset_key.path)
+        if particion is not None:
+            return ruta / f"{particion}{extension}"
+        return ruta.with_name(ruta.name + extension)
+
+    # Escritura
+
+    def handle_output(self, context: OutputContext, obj: Any) -> None:
+        if obj is None:
+            return
+        raiz = self._raiz(context.step_context.instance)
+
+        if not isinstance(obj, pd.DataFrame):
+            # Salidas que no son tablas (p. ej. la ruta del reporte) se guardan con pickle
+            ruta = self._ruta(raiz, context.asset_key, self._clave_unica(context), ".pkl")
+            self._escribir_atomico(ruta, lambda tmp: tmp.write_bytes(pickle.dumps(obj)))
+            return
+
+        if not context.has_asset_partitions or len(context.asset_partition_keys) == 1:
+            ruta = self._escribir_tabla(raiz, context.asset_key, self._clave_unica(context), obj)
+            context.add_output_metadata({"path": str(ruta), "filas": len(obj)})
+            return
+
+        # Backfill en una sola ejecucion: una tabla por particion segun la columna de fecha
+        columna = context.definition_metadata.get("columna_particion")
+        if columna is None:
+            raise Exception(
+                f"{context.asset_key.to_user_string()} no define 'columna_particion'; "
+                "no se puede repartir una salida de varias particiones"
+            )
+        formato_fecha = context.asset_partitions_def.fmt
+        claves = obj[columna].dt.strftime(formato_fecha) if not obj.empty else pd.Series(dtype=str)
+        for particion in context.asset_partition_keys:
+            parte = obj[claves == particion] if not obj.empty else obj
+            self._escribir_tabla(raiz, context.asset_key, particion, parte)
+        context.add_output_metadata({"filas": len(obj), "particiones": len(context.asset_partition_keys)})
+
+    def _clave_unica(self, context) -> Optional[str]:
+        return context.asset_partition_key if context.has_asset_partitions else None
+
+    def _escribir_tabla(self, raiz: Path, asset_key, particion: Optional[str], df: pd.DataFrame) -> Path:
+        tabla = pa.Table.from_pandas(df, preserve_index=False)
+        ruta = self._ruta(raiz, asset_key, particion, EXTENSIONES[self.formato])
+
+        def escribir(tmp: Path):
+            if self.formato == "parquet":
+                pq.write_table(tabla, tmp)
+            else:
+                with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, tabla.schema) as writer:
+                    writer.write_table(tabla)
+
+        self._escribir_atomico(ruta, escribir)
+        return ruta
+
+    def _escribir_atomico(self, ruta: Path, escribir) -> None:
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        tmp = ruta.with_name(ruta.name + ".tmp")
+        escribir(tmp)
+        os.replace(tmp, ruta)
+        # Copias de la misma salida en otro formato (o pickle) quedarian obsoletas
+        for extension in (*EXTENSIONES.values(), ".pkl"):
+            hermano = ruta.with_suffix(extension)
+            if hermano != ruta:
+                hermano.unlink(missing_ok=True)
+
+    # Lectura
+
+    def load_input(self, context: InputContext) -> Any:
+        raiz = self._raiz(context.instance)
+        asset_key = context.asset_key
+        columnas = context.definition_metadata.get("columnas")
+        permitir_faltantes = context.definition_metadata.get("allow_missing_partitions", False)
+
+        if not context.has_asset_partitions:
+            pkl = self._ruta(raiz, asset_key, None, ".pkl")
+            if pkl.exists():
+                return pickle.loads(pkl.read_bytes())
+            return self._leer_tabla(self._buscar(raiz, asset_key, None), columnas).to_pandas(split_blocks=True)
+
+        tablas = []
+        for particion in context.asset_partition_keys:
+            ruta = self._buscar(raiz, asset_key, particion)
+            if ruta is None:
+                if permitir_faltantes:
+                    continue
+                raise FileNotFoundError(
+                    f"Partición {particion} de {asset_key.to_user_string()} no materializada"
+                )
+            tabla = self._leer_tabla(ruta, columnas)
+            if tabla.num_rows:
+                tablas.append(tabla)
+
+        if not tablas:
+            return pd.DataFrame(columns=columnas) if columnas else pd.DataFrame()
+        # Las particiones llegan como una sola tabla, no como dict {particion: DataFrame}
+        return pa.concat_tables(tablas, promote_options="permissive").to_pandas(split_blocks=True)
+
+    def _buscar(self, raiz: Path, asset_key, particion: Optional[str]) -> Optional[Path]:
+        # Primero el formato configurado; los demas permiten cambiar 'formato' sin
+        # re-materializar (handle_output borra las copias en otro formato)
+        preferida = EXTENSIONES[self.formato]
+        for extension in [preferida] + [e for e in EXTENSIONES.values() if e != preferida]:
+            ruta = self._ruta(raiz, asset_key, particion, extension)
+            if ruta.exists():
+                return ruta
+        if particion is None:
+            raise FileNotFoundError(f"{asset_key.to_user_string()} no materializado en {raiz}")
+        return None
+
+    def _leer_tabla(self, ruta: Path, columnas: Optional[List[str]]) -> pa.Table:
+        if ruta.suffix == ".parquet":
+            if columnas:
+                disponibles = pq.read_schema(ruta).names
+                columnas = [c for c in columnas if c in disponibles]
+            return pq.read_table(ruta, columns=columnas, memory_map=True)
+        tabla = pa.ipc.open_file(pa.memory_map(str(ruta), "r")).read_all()
+        if columnas:
+            tabla = tabla.select([c for c in columnas if c in tabla.column_names])
+        return tabla
@@ -0,0 +1,25 @@
+"""
+    Jobs y schedules del pipeline COVID.
+"""
+from dagster import AssetSelection, build_schedule_from_partitioned_job, define_asset_job
+
+from .assets import (
+    leer_datos,
+    datos_procesados,
+    metrica_incidencia_7d,
+    metrica_factor_crec_7d,
+    check_incidencia_consistente,
+    check_factor_crec_consistente,
+)
+
+# Refresco incremental: una ejecucion por particion diaria (el schedule solo lanza la
+# particion nueva) y backfills por rango de particiones sobre el mismo job. Los checks
+# de consistencia leen toda la historia: se lanzan a demanda, no en cada refresco
+covid_diario = define_asset_job(
+    "covid_diario",
+    selection=AssetSelection.assets(
+        leer_datos, datos_procesados, metrica_incidencia_7d, metrica_factor_crec_7d
+    ) - AssetSelection.checks(check_incidencia_consistente, check_factor_crec_consistente),
+)
+
+covid_diario_schedule = build_schedule_from_partitioned_job(covid_diario)
@@ -0,0 +1,139 @@
+"""
+    Transformaciones y metricas del pipeline COVID como funciones puras sobre DataFrames.
+
+    Los assets de Dagster solo resuelven particiones y contexto; el calculo vive aqui
+    para poder reutilizarlo en pruebas y benchmarks.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+PAISES_INTERES = ['Ecuador', 'Finland']
+COLUMNAS_ESENCIALES = ['location', 'date', 'new_cases', 'people_vaccinated', 'population']
+
+# Ventanas (en filas/días) del factor de crecimiento; VENTANA_MAXIMA fija el contexto
+# que necesita cada partición diaria (2n-1 días previos)
+VENTANAS_FACTOR_CREC = (7,)
+VENTANA_MAXIMA = 28
+
+
+def procesar_datos(leer_datos: pd.DataFrame, paises: Optional[list] = PAISES_INTERES) -> pd.DataFrame:
+    """
+    - Filtrar a Ecuador y país comparativo (Finlandia) o a los países indicados (None = todos)
+    - Seleccionar columnas esenciales: location, date, new_cases, people_vaccinated, population
+    - Eliminar filas con valores nulos en new_cases O people_vaccinated
+    - Eliminar duplicados si existen
+    El filtro de países y la proyección van primero: el resto del trabajo solo
+    recorre las filas de interés (el resultado es el mismo en cualquier orden)
+    Los tipos vienen del esquema de ingesta (esquema.py): date ya es datetime64
+    """
+    # Filtrar por paises de interes y seleccionar columnas esenciales
+    columnas_disponibles = [col for col in COLUMNAS_ESENCIALES if col in leer_datos.columns]
+    filas = leer_datos['location'].isin(paises) if paises is not None else leer_datos['location'].notna()
+    df = leer_datos.loc[filas, columnas_disponibles]
+    if isinstance(df['location'].dtype, pd.CategoricalDtype):
+        df = df.assign(location=df['location'].cat.remove_unused_categories())
+
+    # Eliminar filas con valores nulos en new_cases O people_vaccinated (segun instrucciones)
+    df = df.dropna(subset=['new_cases', 'people_vaccinated'], how='any')
+
+    # Eliminar duplicados
+    df = df.drop_duplicates(subset=['location', 'date'])
+
+    # Ordenar por fecha
+    df = df.sort_values(['location', 'date'])
+
+    return df
+
+
+def calcular_incidencia_7d(datos_procesados: pd.DataFrame) -> pd.DataFrame:
+    """
+    1. incidencia_diaria = (new_cases / population) * 100000
+    2. incidencia_7d = promedio móvil de 7 días de incidencia_diaria
+    """
+    if datos_procesados.empty or 'new_cases' not in datos_procesados.columns:
+        return pd.DataFrame()
+
+    df = datos_procesados.copy()
+
+    # Calcular incidencia diaria por 100k habitantes (en float64 aunque el esquema
+    # guarde las columnas en float32)
+    df['incidencia_diaria'] = (df['new_cases'].astype('float64') / df['population'].astype('float64')) * 100000
+
+    # Calcular promedio movil de 7 días por país
+    df['incidencia_7d'] = df.groupby('location', observed=True)['incidencia_diaria'].transform(
+        lambda x: x.rolling(window=7, min_periods=1).mean()
+    )
+
+    # Formatear segun ejemplo en instrucciones
+    resultado = df[['date', 'location', 'incidencia_7d']].rename(columns={
+        'date': 'fecha',
+        'location': 'pais'
+    })
+
+    return resultado
+
+
+def _columnas_ventana(n: int) -> tuple:
+    # La ventana de 7 días conserva los nombres originales del reporte
+    if n == 7:
+        return 'casos_semana', 'factor_crec_7d'
+    return f'casos_{n}d', f'factor_crec_{n}d'
+
+
+def calcular_factor_crec(datos_procesados: pd.DataFrame, ventanas=VENTANAS_FACTOR_CREC) -> pd.DataFrame:
+    """
+        Para cada ventana de n filas (por país, ordenado por fecha):
+        1. casos_actual = suma(new_cases de las últimas n filas)
+        2. casos_prev = suma(new_cases de las n filas previas)
+        3. factor_crec = casos_actual / casos_prev (np.inf si casos_prev <= 0)
+        Una fila por fecha desde la fila 2n-1 de la ventana más corta; las ventanas
+        más largas quedan en NaN hasta tener historia suficiente.
+    """
+    if datos_procesados.empty or 'new_cases' not in datos_procesados.columns:
+        return pd.DataFrame()
+
+    ventanas = sorted(set(ventanas))
+    df = datos_procesados[['location', 'date', 'new_cases']].dropna(subset=['location'])
+
+    # Países en orden de aparición y fechas ascendentes dentro de cada país
+    orden_pais = pd.Series(pd.factorize(df['location'])[0], index=df.index)
+    df = df.assign(_orden=orden_pais).sort_values(['_orden', 'date'], kind='stable')
+    posicion = df.groupby('_orden', sort=False).cumcount().to_numpy()
+
+    # Las sumas recorren el arreglo global: solo se conservan filas con historia
+    # suficiente dentro del país, así que las ventanas nunca cruzan países
+    valores = df['new_cases'].fillna(0).to_numpy(dtype='float64')
+    filas = posicion >= 2 * ventanas[0] - 1
+    resultado = pd.DataFrame({
+        'semana_fin': df['date'].to_numpy()[filas],
+        'pais': df['location'].array[filas],
+    })
+
+    for n in ventanas:
+        casos = np.full(len(valores), np.nan)
+        if len(valores) >= n:
+            casos[n - 1:] = sliding_window_view(valores, n).sum(axis=1)
+        casos_prev = np.full(len(valores), np.nan)
+        casos_prev[n:] = casos[:-n]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            factor = np.where(casos_prev > 0, casos / casos_prev, np.inf)
+
+        valido = posicion >= 2 * n - 1
+        col_casos, col_factor = _columnas_ventana(n)
+        resultado[col_casos] = np.where(valido, casos, np.nan)[filas]
+        resultado[col_factor] = np.where(valido, factor, np.nan)[filas]
+
+    if resultado.empty:
+        return pd.DataFrame()
+    return resultado
+
+
+def calcular_factor_crec_7d(datos_procesados: pd.DataFrame) -> pd.DataFrame:
+    """
+        Factor de crecimiento semanal (ventana de 7 días).
+    """
+    return calcular_factor_crec(datos_procesados, ventanas=(7,))
@@ -0,0 +1,137 @@
+"""
+    Motor DuckDB: las mismas transformaciones de metricas.py expresadas como SQL con
+    funciones de ventana.
+
+    procesar_datos_sql lee directo el snapshot Parquet de OWID (filtro, proyeccion,
+    nulos y duplicados en una sola consulta); las metricas consultan el DataFrame de
+    entrada sin copiarlo a estructuras intermedias de pandas. Los resultados son los
+    mismos que los de metricas.py, incluido el orden de filas.
+"""
+from pathlib import Path
+from typing import Optional, Union
+
+import duckdb
+import pandas as pd
+
+from .esquema import a_pandas, aplicar_esquema
+from .metricas import COLUMNAS_ESENCIALES, PAISES_INTERES, VENTANAS_FACTOR_CREC, _columnas_ventana
+
+
+def _conexion() -> duckdb.DuckDBPyConnection:
+    # Conexion en memoria por llamada: los assets pueden correr en procesos distintos
+    return duckdb.connect()
+
+
+def procesar_datos_sql(
+    ruta_snapshot: Union[str, Path],
+    paises: Optional[list] = PAISES_INTERES,
+    inicio: Optional[pd.Timestamp] = None,
+    fin: Optional[pd.Timestamp] = None,
+) -> pd.DataFrame:
+    """
+        Equivalente SQL de procesar_datos sobre el snapshot, opcionalmente acotado a
+        fechas en [inicio, fin); paises=None procesa todas las locaciones. Ante duplicados de (location, date) se conserva la
+        primera fila del archivo, como drop_duplicates.
+    """
+    condiciones = ["location IS NOT NULL", "new_cases IS NOT NULL", "people_vaccinated IS NOT NULL"]
+    parametros = {"ruta": str(ruta_snapshot)}
+    if paises is not None:
+        condiciones.append("location IN (SELECT unnest($paises))")
+        parametros["paises"] = list(paises)
+    if inicio is not None:
+        condiciones.append("date >= $inicio")
+        parametros["inicio"] = pd.Timestamp(inicio).date()
+    if fin is not None:
+        condiciones.append("date < $fin")
+        parametros["fin"] = pd.Timestamp(fin).date()
+
+    consulta = f"""
+        SELECT {', '.join(COLUMNAS_ESENCIALES)}
+        FROM read_parquet($ruta, file_row_number = true)
+        WHERE {' AND '.join(condiciones)}
+        QUALIFY row_number() OVER (PARTITION BY location, date ORDER BY file_row_number) = 1
+        ORDER BY location, date
+    """
+    with _conexion() as con:
+        tabla = con.execute(consulta, parametros).fetch_arrow_table()
+    # Mismos tipos que el motor pandas: los numericos ya vienen tipados del snapshot
+    return a_pandas(aplicar_esquema(tabla, reducir_numericas=False))
+
+
+def calcular_incidencia_7d_sql(datos_procesados: pd.DataFrame) -> pd.DataFrame:
+    """
+        incidencia_7d = AVG(new_cases / population * 100000) sobre las 7 filas que
+        terminan en la fila actual de cada país (min_periods=1 como en pandas).
+    """
+    if datos_procesados.empty or 'new_cases' not in datos_procesados.columns:
+        return pd.DataFrame()
+
+    entrada = datos_procesados[['location', 'date', 'new_cases', 'population']].assign(
+        _fila=range(len(datos_procesados))
+    )
+    consulta = """
+        SELECT
+            date AS fecha,
+            location AS pais,
+            avg(CAST(new_cases AS DOUBLE) / population * 100000) OVER (
+                PARTITION BY location ORDER BY _fila ROWS BETWEEN 6 PRECEDING AND CURRENT ROW
+            ) AS incidencia_7d
+        FROM entrada
+        ORDER BY _fila
+    """
+    with _conexion() as con:
+        con.register('entrada', entrada)
+        return con.execute(consulta).df()
+
+
+def calcular_factor_crec_sql(datos_procesados: pd.DataFrame, ventanas=VENTANAS_FACTOR_CREC) -> pd.DataFrame:
+    """
+        Para cada ventana n: suma de las últimas n filas y de las n filas previas por
+        país (ordenado por fecha), factor = actual / previa o 'inf' si la previa <= 0.
+        Mismas filas, columnas y orden que calcular_factor_crec.
+    """
+    if datos_procesados.empty or 'new_cases' not in datos_procesados.columns:
+        return pd.DataFrame()
+
+    ventanas = sorted(set(ventanas))
+    entrada = datos_procesados[['location', 'date', 'new_cases']].assign(
+        _fila=range(len(datos_procesados))
+    )
+
+    columnas = []
+    for n in ventanas:
+        col_casos, col_factor = _columnas_ventana(n)
+        actual = f"sum(casos) OVER (w ROWS BETWEEN {n - 1} PRECEDING AND CURRENT ROW)"
+        previa = f"sum(casos) OVER (w ROWS BETWEEN {2 * n - 1} PRECEDING AND {n} PRECEDING)"
+        valido = f"posicion >= {2 * n - 1}"
+        columnas.append(f"CASE WHEN {valido} THEN {actual} END AS {col_casos}")
+        columnas.append(
+            f"CASE WHEN {valido} THEN "
+            f"CASE WHEN {previa} > 0 THEN {actual} / {previa} ELSE 'inf'::DOUBLE END "
+            f"END AS {col_factor}"
+        )
+
+    # Países en orden de aparición y fechas ascendentes (desempate por orden de entrada)
+    consulta = f"""
+        WITH base AS (
+            SELECT
+                location, date, _fila,
+                coalesce(CAST(new_cases AS DOUBLE), 0) AS casos,
+                min(_fila) OVER (PARTITION BY location) AS orden_pais,
+                row_number() OVER (PARTITION BY location ORDER BY date, _fila) - 1 AS posicion
+            FROM entrada
+            WHERE location IS NOT NULL
+        )
+        SELECT date AS semana_fin, location AS pais, {', '.join(columnas)}
+        FROM base
+        WINDOW w AS (PARTITION BY location ORDER BY posicion)
+        QUALIFY posicion >= {2 * ventanas[0] - 1}
+        ORDER BY orden_pais, posicion
+    """
+    with _conexion() as con:
+        con.register('entrada', entrada)
+        resultado = con.execute(consulta).df()
+
+    if resultado.empty:
+        return pd.DataFrame()
+    return resultado
@@ -0,0 +1,76 @@
+"""
+    Motor de calculo seleccionable por ejecucion.
+
+    Los assets delegan en MotorCalculo; para cambiar de motor en una ejecucion basta
+    con configurar el recurso, p. ej. resources: {motor: {config: {motor: duckdb}}}.
+    Con procesos != 1 las metricas se calculan por fragmentos de paises en un pool
+    de procesos (paralelo.py).
+"""
+from functools import partial
+from typing import Optional
+
+import pandas as pd
+from dagster import ConfigurableResource
+
+from .cache import SnapshotsOWID
+from .metricas import (
+    COLUMNAS_ESENCIALES, VENTANAS_FACTOR_CREC,
+    procesar_datos, calcular_incidencia_7d, calcular_factor_crec,
+)
+from .metricas_duckdb import procesar_datos_sql, calcular_incidencia_7d_sql, calcular_factor_crec_sql
+from .paralelo import calcular_por_pais
+
+MOTORES = ("pandas", "duckdb")
+
+
+class MotorCalculo(ConfigurableResource):
+    """
+        - motor: 'pandas' (metricas.py) o 'duckdb' (metricas_duckdb.py, funciones de ventana SQL)
+        - procesos: procesos para las metricas; 1 = en el proceso actual, 0 = todos los nucleos
+    """
+    motor: str = "pandas"
+    procesos: int = 1
+
+    def _motor(self) -> str:
+        if self.motor not in MOTORES:
+            raise ValueError(f"motor desconocido: {self.motor} (opciones: {MOTORES})")
+        return self.motor
+
+    def _calcular(self, funcion, datos_procesados: pd.DataFrame) -> pd.DataFrame:
+        if self.procesos == 1:
+            return funcion(datos_procesados)
+        return calcular_por_pais(datos_procesados, funcion, procesos=self.procesos or None)
+
+    def procesar(
+        self,
+        owid: SnapshotsOWID,
+        paises: Optional[list],
+        inicio: Optional[pd.Timestamp] = None,
+        fin: Optional[pd.Timestamp] = None,
+    ) -> pd.DataFrame:
+        """
+            datos_procesados de los países (None = todos) y fechas [inicio, fin) desde el snapshot vigente.
+        """
+        if self._motor() == "duckdb":
+            ruta = owid.snapshot_actual()
+            if ruta is None:
+                raise Exception("No hay snapshot de OWID; materializar leer_datos primero")
+            return procesar_datos_sql(ruta, paises, inicio, fin)
+
+        # Proyección y predicados empujados al lector Parquet: solo se materializan
+        # las filas de los países y fechas pedidos
+        filtros = [('location', 'in', paises)] if paises is not None else []
+        if inicio is not None:
+            filtros.append(('date', '>=', inicio.date()))
+        if fin is not None:
+            filtros.append(('date', '<', fin.date()))
+        df = owid.escanear(columnas=COLUMNAS_ESENCIALES, filtros=filtros or None)
+        return procesar_datos(df, paises=paises)
+
+    def incidencia_7d(self, datos_procesados: pd.DataFrame) -> pd.DataFrame:
+        funcion = calcular_incidencia_7d_sql if self._motor() == "duckdb" else calcular_incidencia_7d
+        return self._calcular(funcion, datos_procesados)
+
+    def factor_crec(self, datos_procesados: pd.DataFrame, ventanas=VENTANAS_FACTOR_CREC) -> pd.DataFrame:
+        funcion = calcular_factor_crec_sql if self._motor() == "duckdb" else calcular_factor_crec
+        return self._calcular(partial(funcion, ventanas=ventanas), datos_procesados)
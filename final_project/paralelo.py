@@ -0,0 +1,144 @@
+"""
+    Calculo de metricas por pais en un pool de procesos.
+
+    Los datos se reparten en fragmentos con paises completos (balanceados por filas)
+    y cada fragmento viaja como archivo Arrow IPC (en /dev/shm si existe): el worker
+    lo abre con memory map y devuelve su resultado por la misma via, de modo que no
+    se serializan DataFrames con pickle. El resultado final sigue el orden de primera
+    aparicion de cada pais en la entrada, independiente del numero de procesos, y
+    tiene el mismo indice que el calculo secuencial: las etiquetas de fila que deja
+    la funcion o un RangeIndex nuevo si la funcion lo reinicia.
+"""
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+DIRECTORIO_MEMORIA = Path("/dev/shm")
+COLUMNA_INDICE = "__indice__"
+
+
+def procesos_disponibles() -> int:
+    """
+        Nucleos asignados al proceso (respeta cgroups/afinidad cuando el sistema lo expone).
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _contexto_multiproceso():
+    # forkserver precarga las metricas una vez y cada worker nace de ese proceso
+    # (sin heredar hilos de Dagster); en Windows solo existe spawn
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        contexto = multiprocessing.get_context("forkserver")
+        contexto.set_forkserver_preload([__name__, "final_project.metricas", "final_project.metricas_duckdb"])
+        return contexto
+    return multiprocessing.get_context("spawn")
+
+
+def repartir_paises(filas_por_pais: pd.Series, fragmentos: int) -> List[list]:
+    """
+        Reparte los paises en fragmentos de filas parecidas (mayor primero al fragmento
+        con menos filas). Determinista: empates se resuelven por nombre.
+    """
+    orden = sorted(filas_por_pais.items(), key=lambda par: (-par[1], str(par[0])))
+    grupos = [[] for _ in range(min(fragmentos, len(orden)))]
+    cargas = [0] * len(grupos)
+    for pais, filas in orden:
+        i = cargas.index(min(cargas))
+        grupos[i].append(pais)
+        cargas[i] += filas
+    return grupos
+
+
+def _escribir_ipc(tabla: pa.Table, ruta: Path) -> None:
+    with pa.OSFile(str(ruta), "wb") as destino, pa.ipc.new_file(destino, tabla.schema) as writer:
+        writer.write_table(tabla)
+
+
+def _leer_ipc(ruta: Path) -> pa.Table:
+    return pa.ipc.open_file(pa.memory_map(str(ruta), "r")).read_all()
+
+
+def _indice_por_defecto(df: pd.DataFrame) -> bool:
+    return isinstance(df.index, pd.RangeIndex) and df.index.start == 0 and df.index.step == 1
+
+
+def _calcular_fragmento(funcion: Callable, entrada: str, salida: str) -> Optional[tuple]:
+    """
+        Worker: lee el fragmento (con su indice) con memory map, calcula y escribe el
+        resultado. Devuelve None si no hay filas y, si no, (conserva_indice, nombre_indice).
+    """
+    tabla = _leer_ipc(Path(entrada))
+    datos = tabla.drop_columns([COLUMNA_INDICE]).to_pandas(split_blocks=True)
+    datos.index = pd.Index(tabla.column(COLUMNA_INDICE).to_numpy(), name=tabla.schema.metadata[b"indice"].decode() or None)
+    resultado = funcion(datos)
+    if resultado.empty:
+        return None
+    conserva = not _indice_por_defecto(resultado)
+    salida_tabla = pa.Table.from_pandas(resultado, preserve_index=False)
+    if conserva:
+        salida_tabla = salida_tabla.append_column(COLUMNA_INDICE, pa.array(resultado.index.to_numpy()))
+    _escribir_ipc(salida_tabla, Path(salida))
+    return conserva, resultado.index.name
+
+
+def calcular_por_pais(
+    datos: pd.DataFrame,
+    funcion: Callable[[pd.DataFrame], pd.DataFrame],
+    procesos: Optional[int] = None,
+    columna_pais_resultado: str = 'pais',
+) -> pd.DataFrame:
+    """
+        Aplica funcion (nivel de modulo, p. ej. calcular_incidencia_7d o un partial de
+        calcular_factor_crec) a cada fragmento de paises en paralelo y une los resultados.
+        procesos=None usa todos los nucleos disponibles.
+    """
+    procesos = procesos or procesos_disponibles()
+    if datos.empty or 'location' not in datos.columns:
+        return funcion(datos)
+
+    paises = pd.unique(datos['location'].dropna())
+    grupos = repartir_paises(datos['location'].value_counts(sort=False), procesos)
+    if len(grupos) <= 1:
+        return funcion(datos)
+
+    base = DIRECTORIO_MEMORIA if DIRECTORIO_MEMORIA.is_dir() else None
+    with tempfile.TemporaryDirectory(prefix="covid-paralelo-", dir=base) as tmp:
+        tareas = []
+        for i, grupo in enumerate(grupos):
+            entrada, salida = Path(tmp) / f"entrada-{i}.arrow", Path(tmp) / f"salida-{i}.arrow"
+            fragmento = datos[datos['location'].isin(grupo)]
+            tabla = pa.Table.from_pandas(fragmento, preserve_index=False)
+            tabla = tabla.append_column(COLUMNA_INDICE, pa.array(fragmento.index.to_numpy()))
+            tabla = tabla.replace_schema_metadata({**tabla.schema.metadata, b"indice": (datos.index.name or "").encode()})
+            _escribir_ipc(tabla, entrada)
+            tareas.append((str(entrada), str(salida)))
+
+        with ProcessPoolExecutor(max_workers=len(grupos), mp_context=_contexto_multiproceso()) as pool:
+            futuros = [pool.submit(_calcular_fragmento, funcion, e, s) for e, s in tareas]
+            salidas = [(futuro.result(), s) for futuro, (_, s) in zip(futuros, tareas)]
+            salidas = [(indice, s) for indice, s in salidas if indice is not None]
+            tablas = [_leer_ipc(Path(s)) for _, s in salidas]
+
+        if not tablas:
+            return pd.DataFrame()
+        resultado = pa.concat_tables(tablas, promote_options="permissive").to_pandas(split_blocks=True)
+
+    # Orden determinista: paises por primera aparicion en la entrada; dentro de cada
+    # pais se conserva el orden que produjo la funcion
+    rango = pd.Series(np.arange(len(paises)), index=pd.Index(paises, dtype=object))
+    claves = rango.reindex(resultado[columna_pais_resultado].astype(object)).to_numpy()
+    resultado = resultado.iloc[np.argsort(claves, kind='stable')]
+    # Mismo indice que funcion(datos): las etiquetas de fila si la funcion las conserva
+    if all(conserva for (conserva, _), _ in salidas):
+        etiquetas = resultado.pop(COLUMNA_INDICE).to_numpy()
+        return resultado.set_axis(pd.Index(etiquetas, name=salidas[0][0][1]), axis=0)
+    return resultado.drop(columns=[COLUMNA_INDICE], errors='ignore').reset_index(drop=True)
@@ -0,0 +1,128 @@
+"""
+    Escritura del reporte final.
+
+    El backend xlsxwriter en modo constant_memory escribe las filas en orden y las
+    vuelca a disco a medida que avanza, asi que la memoria no crece con el tamaño de
+    las hojas. Si xlsxwriter no esta instalado se usa openpyxl via pandas. Las salidas
+    complementarias (Parquet/CSV por hoja) se escriben en paralelo con el Excel.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+MOTORES = ('auto', 'xlsxwriter', 'openpyxl')
+FORMATOS_EXTRA = ('parquet', 'csv')
+FILAS_POR_BLOQUE = 10_000
+FORMATO_FECHA = 'YYYY-MM-DD HH:MM:SS'
+
+
+def _motor_disponible(motor: str) -> str:
+    if motor not in MOTORES:
+        raise ValueError(f"motor desconocido: {motor} (opciones: {MOTORES})")
+    if motor != 'auto':
+        return motor
+    try:
+        import xlsxwriter  # noqa: F401
+        return 'xlsxwriter'
+    except ImportError:
+        return 'openpyxl'
+
+
+def _escribir_openpyxl(hojas: Dict[str, pd.DataFrame], ruta: Path) -> None:
+    with pd.ExcelWriter(ruta, engine='openpyxl') as writer:
+        for nombre, df in hojas.items():
+            df.to_excel(writer, sheet_name=nombre, index=False)
+
+
+def _valores_columna(serie: pd.Series) -> list:
+    # Convierte un bloque de una columna a valores Python que xlsxwriter entiende, con
+    # el mismo criterio que pandas.to_excel: NaN/None en blanco e infinitos como texto
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return [None if pd.isna(v) else v.to_pydatetime() for v in serie]
+    if pd.api.types.is_float_dtype(serie):
+        valores = serie.to_numpy(dtype='float64', na_value=np.nan)
+        salida = np.where(np.isnan(valores), None, valores).tolist()
+        for i in np.flatnonzero(np.isinf(valores)):
+            salida[i] = 'inf' if valores[i] > 0 else '-inf'
+        return salida
+    return [None if v is pd.NA or v is pd.NaT or v != v else v for v in serie.tolist()]
+
+
+def _escritor_columna(hoja, serie: pd.Series, formato_fecha):
+    # Se elige el metodo de xlsxwriter una vez por columna y no celda por celda
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return lambda i, j, v: hoja.write_datetime(i, j, v, formato_fecha)
+    if pd.api.types.is_float_dtype(serie):
+        def escribir(i, j, v):
+            if type(v) is str:
+                hoja.write_string(i, j, v)
+            else:
+                hoja.write_number(i, j, v)
+        return escribir
+    if pd.api.types.is_bool_dtype(serie):
+        return hoja.write_boolean
+    if pd.api.types.is_numeric_dtype(serie):
+        return hoja.write_number
+    return lambda i, j, v: hoja.write_string(i, j, str(v))
+
+
+def _escribir_xlsxwriter(hojas: Dict[str, pd.DataFrame], ruta: Path) -> None:
+    import xlsxwriter
+
+    libro = xlsxwriter.Workbook(str(ruta), {'constant_memory': True})
+    formato_fecha = libro.add_format({'num_format': FORMATO_FECHA})
+    try:
+        for nombre, df in hojas.items():
+            hoja = libro.add_worksheet(nombre)
+            hoja.write_row(0, 0, [str(c) for c in df.columns])
+            escritores = [_escritor_columna(hoja, df[c], formato_fecha) for c in df.columns]
+            # En constant_memory las filas deben escribirse en orden: se recorre por
+            # bloques y dentro de cada bloque fila por fila
+            for inicio in range(0, len(df), FILAS_POR_BLOQUE):
+                bloque = df.iloc[inicio:inicio + FILAS_POR_BLOQUE]
+                columnas = [_valores_columna(bloque[c]) for c in bloque.columns]
+                for i, fila in enumerate(zip(*columnas), start=inicio + 1):
+                    for j, valor in enumerate(fila):
+                        if valor is not None:
+                            escritores[j](i, j, valor)
+    finally:
+        libro.close()
+
+
+def _escribir_extra(df: pd.DataFrame, ruta: Path, formato: str) -> Path:
+    if formato == 'parquet':
+        df.to_parquet(ruta, index=False)
+    else:
+        df.to_csv(ruta, index=False)
+    return ruta
+
+
+def escribir_reporte(
+    hojas: Dict[str, pd.DataFrame],
+    ruta: Union[str, Path],
+    motor: str = 'auto',
+    formatos_extra: Sequence[str] = (),
+) -> List[Path]:
+    """
+        Escribe el Excel en ruta y, si se piden, un archivo <hoja>.<formato> por hoja
+        junto al Excel, en paralelo. Devuelve las rutas escritas (Excel primero).
+    """
+    desconocidos = set(formatos_extra) - set(FORMATOS_EXTRA)
+    if desconocidos:
+        raise ValueError(f"formatos no soportados: {sorted(desconocidos)} (opciones: {FORMATOS_EXTRA})")
+
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    escribir_excel = _escribir_xlsxwriter if _motor_disponible(motor) == 'xlsxwriter' else _escribir_openpyxl
+
+    with ThreadPoolExecutor() as pool:
+        extras = [
+            pool.submit(_escribir_extra, df, ruta.with_name(f"{ruta.stem}_{nombre}.{formato}"), formato)
+            for formato in formatos_extra
+            for nombre, df in hojas.items()
+        ]
+        escribir_excel(hojas, ruta)
+        return [ruta] + [futuro.result() for futuro in extras]
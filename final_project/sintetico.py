@@ -0,0 +1,89 @@
+"""
+    Generador determinista de datos con la forma de OWID para pruebas y benchmarks.
+
+    Escala 1 = LOCACIONES_BASE países x DIAS_BASE días; la escala multiplica el número
+    de países (las métricas trabajan por país, así que crecer en países es lo que
+    mueve el costo). Incluye lo que aparece en el CSV real: nulos en new_cases,
+    people_vaccinated vacío antes del inicio de la vacunación, correcciones negativas
+    de new_cases y filas duplicadas.
+"""
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from .metricas import PAISES_INTERES
+
+LOCACIONES_BASE = 10
+DIAS_BASE = 730
+FECHA_INICIO = '2020-01-01'
+
+PROPORCION_NULOS_CASOS = 0.05
+PROPORCION_NULOS_VACUNAS = 0.10
+PROPORCION_NEGATIVOS = 0.005
+PROPORCION_DUPLICADOS = 0.001
+
+
+def nombres_locaciones(n: int) -> list:
+    # Los países de interés van primero para que la configuración por defecto encuentre datos
+    extra = [f'Pais_{i:05d}' for i in range(max(n - len(PAISES_INTERES), 0))]
+    return (list(PAISES_INTERES) + extra)[:n]
+
+
+def generar_owid(escala: int = 1, dias: int = DIAS_BASE, semilla: int = 0) -> pd.DataFrame:
+    """
+        DataFrame con las columnas de ingesta (location, date, new_cases,
+        people_vaccinated, population), ordenado por país y fecha como el CSV de OWID.
+        Misma escala y semilla -> mismos datos.
+    """
+    rng = np.random.default_rng(semilla)
+    locaciones = nombres_locaciones(LOCACIONES_BASE * escala)
+    n_loc = len(locaciones)
+    fechas = pd.date_range(FECHA_INICIO, periods=dias, freq='D')
+
+    # Población log-uniforme entre 1e5 y 1e9 habitantes
+    poblacion = np.round(10 ** rng.uniform(5, 9, n_loc))
+
+    # Olas: tasa diaria por 100k con dos sinusoides de fase aleatoria por país
+    t = np.arange(dias)
+    fase = rng.uniform(0, 2 * np.pi, (n_loc, 2))
+    tasa = 20 * (1.2 + np.sin(2 * np.pi * t / 180 + fase[:, :1])) * (1.1 + np.sin(2 * np.pi * t / 45 + fase[:, 1:]))
+    casos = rng.poisson(tasa * poblacion[:, None] / 1e5).astype('float64')
+
+    negativos = rng.random(casos.shape) < PROPORCION_NEGATIVOS
+    casos[negativos] = -rng.integers(1, 500, negativos.sum())
+    casos[rng.random(casos.shape) < PROPORCION_NULOS_CASOS] = np.nan
+
+    # Vacunación acumulada desde un día de inicio por país (antes: vacío)
+    inicio_vacunas = rng.integers(dias // 3, dias // 2 + 1, n_loc)
+    ritmo = rng.uniform(0.001, 0.005, n_loc) * poblacion
+    dias_vacunando = np.clip(t[None, :] - inicio_vacunas[:, None], 0, None)
+    vacunas = np.minimum(np.round(ritmo[:, None] * dias_vacunando), 0.9 * poblacion[:, None])
+    vacunas[t[None, :] < inicio_vacunas[:, None]] = np.nan
+    vacunas[rng.random(vacunas.shape) < PROPORCION_NULOS_VACUNAS] = np.nan
+
+    df = pd.DataFrame({
+        'location': np.repeat(np.array(locaciones, dtype=object), dias),
+        'date': np.tile(fechas.strftime('%Y-%m-%d').to_numpy(dtype=object), n_loc),
+        'new_cases': casos.ravel(),
+        'people_vaccinated': vacunas.ravel(),
+        'population': np.repeat(poblacion, dias),
+    })
+
+    # Duplicados exactos junto a la fila original
+    duplicadas = np.flatnonzero(rng.random(len(df)) < PROPORCION_DUPLICADOS)
+    if len(duplicadas):
+        orden = np.sort(np.concatenate([np.arange(len(df)), duplicadas]), kind='stable')
+        df = df.iloc[orden].reset_index(drop=True)
+    return df
+
+
+def escribir_csv_owid(df: pd.DataFrame, ruta: Union[str, Path]) -> Path:
+    """
+        Escribe df como el CSV compacto de OWID (columna country en vez de location).
+    """
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    df.rename(columns={'location': 'country'}).to_csv(ruta, index=False)
+    return ruta
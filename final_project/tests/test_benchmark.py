@@ -0,0 +1,42 @@
+import json
+
+import pandas as pd
+
+from final_project import benchmark
+from final_project.sintetico import LOCACIONES_BASE, generar_owid
+
+
+def test_generador_determinista_y_escalable():
+    df = generar_owid(escala=1, dias=60)
+    pd.testing.assert_frame_equal(df, generar_owid(escala=1, dias=60))
+    assert not df.equals(generar_owid(escala=1, dias=60, semilla=1))
+    assert df['location'].nunique() == LOCACIONES_BASE
+    assert generar_owid(escala=3, dias=60)['location'].nunique() == 3 * LOCACIONES_BASE
+    assert list(df.columns) == ['location', 'date', 'new_cases', 'people_vaccinated', 'population']
+
+
+def test_generador_incluye_anomalias_de_owid():
+    df = generar_owid(escala=10, dias=200)
+    assert df['new_cases'].isna().any()
+    assert df['people_vaccinated'].isna().any()
+    assert (df['new_cases'] < 0).any()
+    assert df.duplicated().any()
+    assert df['location'].is_monotonic_increasing
+
+
+def test_benchmark_guarda_json_por_paso(tmp_path, monkeypatch):
+    monkeypatch.setattr(benchmark, 'generar_owid', lambda escala: generar_owid(escala, dias=40))
+    salida = tmp_path / "resultado.json"
+    benchmark.main([
+        "--escalas", "1", "--motores", "pandas", "duckdb", "--repeticiones", "1", "--salida", str(salida),
+    ])
+
+    resultado = json.loads(salida.read_text())
+    pasos = {(fila['motor'], fila['paso']) for fila in resultado['resultados']}
+    assert ('duckdb', 'metrica_factor_crec_7d') in pasos
+    assert (None, 'checks_entrada') in pasos and (None, 'leer_datos_cache') in pasos
+    assert len(pasos) == 4 + 2 * 5
+    assert all(fila['segundos'] >= 0 and fila['memoria_pico_mb'] >= 0 for fila in resultado['resultados'])
+
+    tabla = benchmark.comparar(resultado, resultado)
+    assert (tabla['razon_tiempo'].dropna() == 1).all()
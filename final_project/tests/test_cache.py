@@ -0,0 +1,215 @@
+import threading
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from final_project import cache
+from final_project.cache import SnapshotsOWID
+
+CSV_V1 = (
+    "country,date,new_cases,people_vaccinated,population,extra\n"
+    "Ecuador,2021-01-01,10,5,100,x\n"
+    "Finland,2021-01-01,20,,200,y\n"
+)
+CSV_V2 = CSV_V1 + "Ecuador,2021-01-02,30,6,100,x\n"
+
+
+class ServidorOWID:
+    """Servidor HTTP local que imita a OWID: ETag, Last-Modified y 304."""
+
+    def __init__(self):
+        self.contenido = CSV_V1
+        self.etag = '"v1"'
+        self.usar_conditional = True
+        self.peticiones = []
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                servidor.peticiones.append(dict(self.headers))
+                if servidor.usar_conditional and self.headers.get("If-None-Match") == servidor.etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                cuerpo = servidor.contenido.encode()
+                self.send_response(200)
+                if servidor.usar_conditional:
+                    self.send_header("ETag", servidor.etag)
+                    self.send_header("Last-Modified", "Mon, 01 Jan 2024 00:00:00 GMT")
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/compact.csv"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def publicar(self, contenido, etag):
+        self.contenido, self.etag = contenido, etag
+
+
+@pytest.fixture
+def servidor():
+    s = ServidorOWID()
+    yield s
+    s.httpd.shutdown()
+    s.httpd.server_close()
+
+
+@pytest.fixture
+def parseos(monkeypatch):
+    """Cuenta las llamadas al parser CSV."""
+    llamadas = []
+    original = cache.leer_tabla_csv
+
+    def contar(ruta):
+        llamadas.append(ruta)
+        return original(ruta)
+
+    monkeypatch.setattr(cache, "leer_tabla_csv", contar)
+    return llamadas
+
+
+def test_primera_descarga_materializa_parquet(servidor, parseos, tmp_path):
+    owid = SnapshotsOWID(directorio=str(tmp_path), url=servidor.url)
+    df = owid.cargar()
+    assert list(df.columns) == ['location', 'date', 'new_cases', 'people_vaccinated', 'population']
+    assert len(df) == 2
+    assert len(parseos) == 1
+    assert owid.snapshot_actual().suffix == ".parquet"
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_fuente_sin_cambios_un_round_trip_y_cero_parseos(servidor, parseos, tmp_path):
+    owid = SnapshotsOWID(directorio=str(tmp_path), url=servidor.url)
+    df1 = owid.cargar()
+    servidor.peticiones.clear()
+    parseos.clear()
+
+    df2 = owid.cargar()
+
+    assert len(servidor.peticiones) == 1
+    assert servidor.peticiones[0]["If-None-Match"] == '"v1"'
+    assert servidor.peticiones[0]["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert parseos == []
+    assert df2.equals(df1)
+
+
+def test_mismo_contenido_sin_etag_no_se_parsea(servidor, parseos, tmp_path):
+    servidor.usar_conditional = False
+    owid = SnapshotsOWID(directorio=str(tmp_path), url=servidor.url)
+    owid.cargar()
+    owid.cargar()
+    assert len(servidor.peticiones) == 2
+    assert len(parseos) == 1
+
+
+def test_fuente_actualizada_crea_nuevo_snapshot(servidor, parseos, tmp_path):
+    owid = SnapshotsOWID(directorio=str(tmp_path), url=servidor.url)
+    primero = owid.obtener()
+    servidor.publicar(CSV_V2, '"v2"')
+    segundo = owid.obtener()
+    assert segundo != primero
+    assert len(owid.cargar()) == 3
+    assert len(parseos) == 2
+
+
+def test_retencion_max_snapshots(servidor, tmp_path):
+    owid = SnapshotsOWID(directorio=str(tmp_path), url=servidor.url, max_snapshots=2)
+    for i in range(4):
+        servidor.publicar(CSV_V1 + f"Peru,2021-01-0{i + 1},1,1,50,z\n", f'"v{i}"')
+        owid.obtener()
+    snapshots = list(tmp_path.glob("*.parquet"))
+    assert len(snapshots) == 2
+    assert owid.snapshot_actual() in snapshots
+
+
+def test_retencion_borra_versiones_de_esquema_anteriores(servidor, tmp_path, monkeypatch):
+    owid = SnapshotsOWID(directorio=str(tmp_path), url=servidor.url, max_snapshots=1)
+    monkeypatch.setattr(cache, "VERSION_ESQUEMA", 1)
+    viejo = owid.obtener()
+    monkeypatch.setattr(cache, "VERSION_ESQUEMA", 2)
+    # Mismo contenido con el esquema nuevo: el snapshot v1 ya no sirve
+    servidor.publicar(CSV_V1, '"v1b"')
+    mismo = owid.obtener()
+    assert mismo != viejo and list(tmp_path.glob("*.parquet")) == [mismo]
+    # Un snapshot desalojado se borra en todas sus versiones
+    monkeypatch.setattr(cache, "VERSION_ESQUEMA", 1)
+    servidor.publicar(CSV_V2, '"v2"')
+    owid.obtener()
+    monkeypatch.setattr(cache, "VERSION_ESQUEMA", 2)
+    actual = owid.obtener()
+    assert list(tmp_path.glob("*.parquet")) == [actual]
+
+
+def test_retencion_por_edad(servidor, tmp_path):
+    owid = SnapshotsOWID(directorio=str(tmp_path), url=servidor.url, max_snapshots=10, max_edad_dias=0)
+    owid.obtener()
+    servidor.publicar(CSV_V2, '"v2"')
+    actual = owid.obtener()
+    assert list(tmp_path.glob("*.parquet")) == [actual]
+
+
+def test_offline_no_toca_la_red(servidor, parseos, tmp_path):
+    SnapshotsOWID(directorio=str(tmp_path), url=servidor.url).obtener()
+    servidor.peticiones.clear()
+    parseos.clear()
+
+    df = SnapshotsOWID(directorio=str(tmp_path), url=servidor.url, offline=True).cargar()
+
+    assert len(df) == 2
+    assert servidor.peticiones == []
+    assert parseos == []
+
+
+def test_offline_sin_snapshot_falla(tmp_path):
+    owid = SnapshotsOWID(directorio=str(tmp_path), url="http://127.0.0.1:9/compact.csv", offline=True)
+    with pytest.raises(Exception, match="offline"):
+        owid.obtener()
+
+
+def test_sin_red_reutiliza_ultimo_snapshot(servidor, tmp_path):
+    owid = SnapshotsOWID(directorio=str(tmp_path), url=servidor.url)
+    ruta = owid.obtener()
+    sin_red = SnapshotsOWID(directorio=str(tmp_path), url="http://127.0.0.1:9/compact.csv", timeout=2)
+    assert sin_red.obtener() == ruta
+
+
+def test_escanear_empuja_filtros_y_columnas(servidor, tmp_path):
+    servidor.publicar(CSV_V2, '"v2"')
+    owid = SnapshotsOWID(directorio=str(tmp_path), url=servidor.url)
+    owid.obtener()
+    servidor.peticiones.clear()
+
+    df = owid.escanear(
+        columnas=['location', 'date', 'new_cases'],
+        filtros=[('location', 'in', ['Ecuador']), ('date', '>=', date(2021, 1, 2))],
+    )
+
+    assert servidor.peticiones == []
+    assert list(df.columns) == ['location', 'date', 'new_cases']
+    assert df.to_dict('records') == [
+        {'location': 'Ecuador', 'date': pd.Timestamp('2021-01-02'), 'new_cases': 30.0}
+    ]
+
+
+def test_escanear_sin_snapshot_falla(tmp_path):
+    with pytest.raises(Exception, match="leer_datos"):
+        SnapshotsOWID(directorio=str(tmp_path)).escanear()
+
+
+def test_importar_csv_local_sin_red(parseos, tmp_path):
+    csv = tmp_path / "owid.csv"
+    csv.write_text(CSV_V2)
+    owid = SnapshotsOWID(directorio=str(tmp_path / "snap"), url="http://127.0.0.1:9/compact.csv", offline=True)
+
+    ruta = owid.importar(csv)
+    assert owid.importar(csv) == ruta
+    assert owid.snapshot_actual() == ruta
+    assert len(owid.cargar()) == 3
+    assert len(parseos) == 1
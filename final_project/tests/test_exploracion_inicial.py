@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from final_project.exploracion_inicial import TODAS, crear_tabla_perfilado, perfilar_csv
+from final_project.sintetico import escribir_csv_owid, generar_owid
+
+
+@pytest.fixture(scope='module')
+def csv_owid(tmp_path_factory):
+    df = generar_owid(1, dias=120, semilla=3)
+    df['continent'] = df['location'].where(df['location'].str.startswith('Pais_0000'))
+    return escribir_csv_owid(df, tmp_path_factory.mktemp('owid') / 'compact.csv')
+
+
+def test_resumen_igual_a_lectura_completa(tmp_path, csv_owid):
+    salida = tmp_path / 'tabla_perfilado.csv'
+    resumen = crear_tabla_perfilado(str(csv_owid), str(salida), filas_por_bloque=97)
+
+    df = pd.read_csv(csv_owid)
+    filtrado = df[df['country'].isin(['Ecuador', 'Finland'])]
+    assert resumen['total_filas_dataset'] == len(df)
+    assert resumen['total_columnas'] == len(df.columns)
+    assert resumen['registros_ecuador'] == (filtrado['country'] == 'Ecuador').sum()
+    assert (resumen['fecha_inicio'], resumen['fecha_fin']) == (filtrado['date'].min(), filtrado['date'].max())
+    assert resumen['new_cases_minimo'] == filtrado['new_cases'].min()
+    assert resumen['new_cases_maximo'] == filtrado['new_cases'].max()
+    assert resumen['porcentaje_missing_people_vaccinated'] == round(filtrado['people_vaccinated'].isna().mean() * 100, 1)
+
+    # Misma forma que la tabla del proyecto
+    esperado = pd.read_csv(Path(__file__).parents[1] / 'tabla_perfilado.csv', nrows=0).columns
+    assert list(pd.read_csv(salida).columns) == list(esperado)
+
+
+def test_perfil_independiente_de_bloques_y_procesos(csv_owid):
+    referencia = perfilar_csv(csv_owid)
+    for filas, procesos in [(61, 1), (50, 2), (200, 3)]:
+        pd.testing.assert_frame_equal(perfilar_csv(csv_owid, filas_por_bloque=filas, procesos=procesos), referencia)
+
+
+def test_perfil_por_pais_y_columna(csv_owid):
+    df = pd.read_csv(csv_owid)
+    perfil = perfilar_csv(csv_owid, paises=['Ecuador', 'Pais_00003'], filas_por_bloque=100).set_index(['location', 'columna'])
+
+    assert set(perfil.index.get_level_values('location')) == {TODAS, 'Ecuador', 'Pais_00003'}
+    ecuador = df[df['country'] == 'Ecuador']
+    fila = perfil.loc[('Ecuador', 'new_cases')]
+    assert (fila['filas'], fila['nulos']) == (len(ecuador), ecuador['new_cases'].isna().sum())
+    assert fila['fecha_min'] == ecuador.loc[ecuador['new_cases'].notna(), 'date'].min()
+    # Menos de k valores distintos: la estimación es exacta
+    assert fila['distintos_estimados'] == ecuador['new_cases'].nunique()
+    assert perfil.loc[('Ecuador', 'continent'), 'porcentaje_nulos'] == 100.0
+    assert perfil.loc[(TODAS, 'country'), 'distintos_estimados'] == 2
@@ -0,0 +1,83 @@
+from functools import partial
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from final_project.esquema import a_pandas, aplicar_esquema
+from final_project.incremental import EstadoIncremental, EstadoRodante, comparar_con_recalculo, lista_paises
+from final_project.metricas import calcular_factor_crec, calcular_incidencia_7d, procesar_datos
+from final_project.metricas_duckdb import calcular_factor_crec_sql
+
+from .test_metricas import datos_sinteticos
+
+
+@pytest.fixture(scope='module')
+def procesados():
+    """Datos tipados como en la ingesta, con huecos de fechas distintos por país."""
+    df = datos_sinteticos(n_paises=4, n_dias=60)
+    df = df.drop(df.sample(frac=0.2, random_state=0).index)
+    return procesar_datos(a_pandas(aplicar_esquema(pa.Table.from_pandas(df, preserve_index=False))), paises=None)
+
+
+@pytest.mark.parametrize('funcion, columna, filas_contexto', [
+    (calcular_incidencia_7d, 'fecha', 6),
+    (partial(calcular_factor_crec, ventanas=(7, 14)), 'semana_fin', 27),
+    (partial(calcular_factor_crec_sql, ventanas=(7, 14)), 'semana_fin', 27),
+])
+def test_plegar_dia_a_dia_igual_a_recalculo(tmp_path, procesados, funcion, columna, filas_contexto):
+    fechas = sorted(procesados['date'].unique())
+    corte = fechas[10]
+    historia = procesados[procesados['date'] < corte]
+    recurso = EstadoIncremental(directorio=str(tmp_path), activo=True)
+    recurso.guardar('metrica', EstadoRodante.desde_historia(historia, filas_contexto, hasta=corte))
+
+    partes = [funcion(historia)]
+    for dia in fechas[10:]:
+        estado = recurso.cargar('metrica')
+        assert estado.continua(dia, filas_contexto, lista_paises(historia))
+        nuevos = procesados[procesados['date'] == dia]
+        partes.append(estado.avanzar(nuevos, funcion, columna, hasta=dia + pd.Timedelta(days=1)))
+        recurso.guardar('metrica', estado)
+        assert estado.ventana.groupby('location', observed=True).size().max() <= filas_contexto + 1
+
+    acumulado = pd.concat([p for p in partes if not p.empty], ignore_index=True)
+    resumen = comparar_con_recalculo(acumulado, funcion(procesados), [columna, 'pais'])
+    assert resumen['consistente'], resumen
+
+
+def test_paises_o_config_distintos_no_continuan(tmp_path, procesados):
+    corte = sorted(procesados['date'].unique())[10]
+    historia = procesados[procesados['date'] < corte]
+    paises = lista_paises(historia)
+    recurso = EstadoIncremental(directorio=str(tmp_path), activo=True)
+    recurso.guardar('metrica', EstadoRodante.desde_historia(historia[historia['location'] != paises[0]], 27,
+                                                            hasta=corte, config={"ventanas": [7, 14]}))
+
+    estado = recurso.cargar('metrica')
+    assert estado.continua(corte, 27, paises[1:], {"ventanas": [7, 14]})
+    # Un país nuevo no tiene historia en el estado; otras ventanas piden otro estado
+    assert not estado.continua(corte, 27, paises, {"ventanas": [7, 14]})
+    assert not estado.continua(corte, 27, paises[1:], {"ventanas": [14]})
+
+
+def test_plegar_fechas_repetidas_falla(procesados):
+    estado = EstadoRodante.desde_historia(procesados, 6)
+    with pytest.raises(ValueError, match="recálculo completo"):
+        estado.avanzar(procesados.tail(1), calcular_incidencia_7d, 'fecha')
+
+
+def test_comparar_con_recalculo_detecta_diferencias(procesados):
+    completo = calcular_incidencia_7d(procesados)
+    alterado = completo.iloc[1:].copy()
+    alterado.iloc[0, alterado.columns.get_loc('incidencia_7d')] += 1.0
+    resumen = comparar_con_recalculo(alterado, completo, ['fecha', 'pais'])
+    assert (resumen['filas_faltantes'], resumen['filas_sobrantes'], resumen['filas_distintas']) == (1, 0, 1)
+    assert not resumen['consistente']
+
+
+def test_estado_inactivo_no_escribe(tmp_path, procesados):
+    recurso = EstadoIncremental(directorio=str(tmp_path))
+    recurso.guardar('metrica', EstadoRodante.desde_historia(procesados, 6))
+    assert recurso.cargar('metrica') is None
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,98 @@
+import builtins
+import json
+import sys
+
+import pandas as pd
+from dagster import (
+    AssetCheckResult, AssetCheckSpec, asset, asset_check, materialize, multi_asset_check,
+)
+
+from final_project import instrumentacion
+from final_project.instrumentacion import VARIABLE_ARCHIVO, instrumentar, perfil_tablas
+
+METRICAS = {
+    "tiempo_pared_s", "tiempo_cpu_s", "rss_pico_delta_mb", "filas_entrada", "memoria_entrada_mb",
+}
+
+
+@asset
+@instrumentar
+def origen() -> pd.DataFrame:
+    return pd.DataFrame({'location': ['Ecuador'] * 1000, 'new_cases': range(1000)})
+
+
+@asset
+@instrumentar
+def filtrado(origen: pd.DataFrame) -> pd.DataFrame:
+    return origen[origen['new_cases'] % 2 == 0]
+
+
+@asset_check(asset=filtrado)
+@instrumentar
+def check_pares(filtrado: pd.DataFrame) -> AssetCheckResult:
+    return AssetCheckResult(passed=bool((filtrado['new_cases'] % 2 == 0).all()), metadata={"propio": 1})
+
+
+@multi_asset_check(specs=[AssetCheckSpec("uno", asset=origen), AssetCheckSpec("dos", asset=origen)])
+@instrumentar
+def checks_origen(origen: pd.DataFrame):
+    yield AssetCheckResult(check_name="uno", passed=True)
+    yield AssetCheckResult(check_name="dos", passed=len(origen) > 0)
+
+
+def test_metadata_en_materializaciones_y_checks(tmp_path, monkeypatch):
+    archivo = tmp_path / "metricas" / "run.jsonl"
+    monkeypatch.setenv(VARIABLE_ARCHIVO, str(archivo))
+
+    resultado = materialize([origen, filtrado, check_pares, checks_origen])
+    assert resultado.success
+
+    metadata = resultado.asset_materializations_for_node('filtrado')[0].metadata
+    assert METRICAS | {"filas_salida", "memoria_salida_mb"} <= set(metadata)
+    assert metadata["filas_entrada"].value == 1000
+    assert metadata["filas_salida"].value == 500
+    assert metadata["memoria_entrada_mb"].value > metadata["memoria_salida_mb"].value > 0
+
+    evaluaciones = resultado.get_asset_check_evaluations()
+    assert len(evaluaciones) == 3
+    for evaluacion in evaluaciones:
+        assert evaluacion.passed
+        assert METRICAS <= set(evaluacion.metadata)
+    propio = [e for e in evaluaciones if e.check_name == "check_pares"][0]
+    assert propio.metadata["propio"].value == 1
+
+    registros = [json.loads(linea) for linea in archivo.read_text().splitlines()]
+    assert sorted(r["nodo"] for r in registros) == ["check_pares", "checks_origen", "filtrado", "origen"]
+    assert all(r["run_id"] == resultado.run_id for r in registros)
+
+
+def test_sin_variable_no_exporta(tmp_path, monkeypatch):
+    monkeypatch.delenv(VARIABLE_ARCHIVO, raising=False)
+    monkeypatch.chdir(tmp_path)
+    assert materialize([origen]).success
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_perfil_tablas_suma_dataframes_y_particiones():
+    df = pd.DataFrame({'a': range(10)})
+    perfil = perfil_tablas([df, {'2021-01-01': df, '2021-01-02': df}, "no es tabla", None])
+    assert perfil["filas"] == 30
+    assert perfil["memoria_mb"] > 0
+
+
+def test_sin_proc_ni_resource_no_mide_rss(monkeypatch):
+    # Como en Windows: sin /proc y sin el modulo resource
+    abrir = builtins.open
+
+    def sin_proc(ruta, *args, **kwargs):
+        if str(ruta).startswith("/proc/"):
+            raise OSError(ruta)
+        return abrir(ruta, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, 'open', sin_proc)
+    monkeypatch.setitem(sys.modules, 'resource', None)
+    assert instrumentacion._rss_actual() is None
+
+    resultado = materialize([origen])
+    assert resultado.success
+    assert resultado.asset_materializations_for_node('origen')[0].metadata["rss_pico_delta_mb"].value is None
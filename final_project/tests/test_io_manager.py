@@ -0,0 +1,91 @@
+import pandas as pd
+import pytest
+from dagster import (
+    AssetIn, BackfillPolicy, DagsterInstance, DailyPartitionsDefinition, asset, materialize,
+)
+
+from final_project.io_manager import ColumnarIOManager
+
+diarias = DailyPartitionsDefinition(start_date="2021-01-01", end_date="2021-01-05")
+
+
+@asset
+def tabla() -> pd.DataFrame:
+    return pd.DataFrame({'a': [1, 2, 3], 'b': [0.5, 1.5, None], 'c': ['x', 'y', 'z']})
+
+
+@asset(ins={"tabla": AssetIn(metadata={"columnas": ['a', 'c']})})
+def proyeccion(tabla: pd.DataFrame) -> pd.DataFrame:
+    return tabla
+
+
+@asset
+def ruta(tabla: pd.DataFrame) -> str:
+    return "reporte.xlsx"
+
+
+@asset
+def usa_ruta(ruta: str) -> str:
+    return ruta.upper()
+
+
+@asset(partitions_def=diarias, backfill_policy=BackfillPolicy.single_run(),
+       metadata={"columna_particion": "date"})
+def diaria(context) -> pd.DataFrame:
+    fechas = pd.date_range(context.partition_time_window.start.date(),
+                           context.partition_time_window.end.date(), inclusive='left')
+    return pd.DataFrame({'date': fechas, 'valor': range(len(fechas))})
+
+
+@asset(ins={"diaria": AssetIn(metadata={"allow_missing_partitions": True})})
+def todas(diaria: pd.DataFrame) -> pd.DataFrame:
+    return diaria
+
+
+@pytest.fixture
+def instancia(tmp_path):
+    return DagsterInstance.local_temp(str(tmp_path))
+
+
+@pytest.mark.parametrize('formato', ['arrow', 'parquet'])
+def test_proyeccion_por_consumidor(instancia, tmp_path, formato):
+    io = ColumnarIOManager(formato=formato)
+    resultado = materialize([tabla, proyeccion], instance=instancia, resources={"io_manager": io})
+    assert list(resultado.output_for_node('proyeccion').columns) == ['a', 'c']
+    assert (tmp_path / 'storage' / f'tabla.{formato}').exists()
+
+
+def test_cambio_de_formato_no_lee_copias_obsoletas(instancia, tmp_path):
+    materialize([tabla], instance=instancia, resources={"io_manager": ColumnarIOManager(formato="arrow")})
+    (tmp_path / 'storage' / 'tabla.pkl').write_bytes(b'obsoleto')
+
+    @asset(name="tabla")
+    def tabla_nueva() -> pd.DataFrame:
+        return pd.DataFrame({'a': [9], 'b': [0.0], 'c': ['n']})
+
+    io = ColumnarIOManager(formato="parquet")
+    resultado = materialize([tabla_nueva, proyeccion], instance=instancia, resources={"io_manager": io})
+    assert list(resultado.output_for_node('proyeccion')['a']) == [9]
+    assert sorted(p.name for p in (tmp_path / 'storage').glob('tabla.*')) == ['tabla.parquet']
+
+
+def test_salidas_no_tabulares_con_pickle(instancia):
+    resultado = materialize([tabla, ruta, usa_ruta], instance=instancia,
+                            resources={"io_manager": ColumnarIOManager()})
+    assert resultado.output_for_node('usa_ruta') == "REPORTE.XLSX"
+
+
+def test_backfill_en_una_ejecucion_se_reparte_por_particion(instancia, tmp_path):
+    io = ColumnarIOManager()
+    resultado = materialize([diaria], instance=instancia, resources={"io_manager": io}, tags={
+        "dagster/asset_partition_range_start": "2021-01-01",
+        "dagster/asset_partition_range_end": "2021-01-03",
+    })
+    assert resultado.success
+    archivos = sorted(p.name for p in (tmp_path / 'storage' / 'diaria').iterdir())
+    assert archivos == ['2021-01-01.arrow', '2021-01-02.arrow', '2021-01-03.arrow']
+
+    # El consumidor no particionado recibe una sola tabla; la partición 2021-01-04 falta
+    unidas = materialize([diaria, todas], instance=instancia, resources={"io_manager": io},
+                         selection=[todas]).output_for_node('todas')
+    assert list(unidas['date'].dt.strftime('%Y-%m-%d')) == ['2021-01-01', '2021-01-02', '2021-01-03']
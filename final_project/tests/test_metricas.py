@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from final_project.metricas import calcular_factor_crec, calcular_factor_crec_7d
+
+
+def factor_crec_referencia(datos_procesados, n=7):
+    """Implementación original fila a fila (generalizada a ventanas de n días)."""
+    if datos_procesados.empty or 'new_cases' not in datos_procesados.columns:
+        return pd.DataFrame()
+    df = datos_procesados.copy()
+    resultados = []
+    for pais in df['location'].unique():
+        df_pais = df[df['location'] == pais].sort_values('date')
+        for i in range(n, len(df_pais)):
+            casos_semana_actual = df_pais.iloc[i-(n-1):i+1]['new_cases'].sum()
+            if i >= 2 * n - 1:
+                casos_semana_prev = df_pais.iloc[i-(2*n-1):i-(n-1)]['new_cases'].sum()
+                factor_crec = casos_semana_actual / casos_semana_prev if casos_semana_prev > 0 else np.inf
+                resultados.append({
+                    'semana_fin': df_pais.iloc[i]['date'],
+                    'pais': pais,
+                    'casos_semana': casos_semana_actual,
+                    'factor_crec_7d': factor_crec
+                })
+    return pd.DataFrame(resultados)
+
+
+def datos_sinteticos(n_paises=3, n_dias=60, seed=0):
+    rng = np.random.default_rng(seed)
+    partes = []
+    for p in range(n_paises):
+        fechas = pd.date_range('2021-01-01', periods=n_dias)
+        casos = rng.integers(0, 500, n_dias).astype(float)
+        casos[rng.random(n_dias) < 0.1] = 0
+        casos[rng.random(n_dias) < 0.03] = -rng.integers(1, 50)
+        casos[10:24] = 0  # semanas completas en cero -> np.inf
+        partes.append(pd.DataFrame({
+            'location': f'Pais{p}',
+            'date': fechas,
+            'new_cases': casos,
+            'people_vaccinated': 1.0,
+            'population': 1e6,
+        }).sample(frac=1, random_state=p))  # desordenado dentro del país
+    return pd.concat(partes, ignore_index=True)
+
+
+def test_paridad_con_implementacion_original():
+    df = datos_sinteticos()
+    esperado = factor_crec_referencia(df)
+    obtenido = calcular_factor_crec_7d(df)
+    pd.testing.assert_frame_equal(obtenido, esperado, check_exact=True)
+    assert np.isinf(obtenido['factor_crec_7d']).any()
+
+
+@pytest.mark.parametrize('n_dias', [0, 5, 13, 14])
+def test_paridad_series_cortas(n_dias):
+    df = datos_sinteticos(n_paises=2, n_dias=n_dias)
+    esperado = factor_crec_referencia(df)
+    obtenido = calcular_factor_crec_7d(df)
+    if esperado.empty:
+        assert obtenido.empty
+    else:
+        pd.testing.assert_frame_equal(obtenido, esperado, check_exact=True)
+
+
+def test_paises_con_largos_distintos():
+    df = pd.concat([datos_sinteticos(1, 10, seed=1), datos_sinteticos(1, 40, seed=2)
+                    .assign(location='Largo')], ignore_index=True)
+    pd.testing.assert_frame_equal(calcular_factor_crec_7d(df), factor_crec_referencia(df), check_exact=True)
+
+
+def test_varias_ventanas_en_una_pasada():
+    df = datos_sinteticos(n_dias=90)
+    resultado = calcular_factor_crec(df, ventanas=[28, 7, 14])
+    assert list(resultado.columns) == [
+        'semana_fin', 'pais', 'casos_semana', 'factor_crec_7d',
+        'casos_14d', 'factor_crec_14d', 'casos_28d', 'factor_crec_28d',
+    ]
+    pd.testing.assert_frame_equal(resultado.iloc[:, :4], factor_crec_referencia(df), check_exact=True)
+
+    for n in (14, 28):
+        ref = factor_crec_referencia(df, n=n).rename(
+            columns={'casos_semana': f'casos_{n}d', 'factor_crec_7d': f'factor_crec_{n}d'})
+        unido = resultado.dropna(subset=[f'factor_crec_{n}d'])
+        cols = ['semana_fin', 'pais', f'casos_{n}d', f'factor_crec_{n}d']
+        pd.testing.assert_frame_equal(unido[cols].reset_index(drop=True), ref, check_exact=True)
+
+
+def test_vectorizado_igual_a_bucle():
+    # Los tiempos se miden en benchmark.py (paso metrica_factor_crec_7d), no aqui
+    df = datos_sinteticos(n_paises=10, n_dias=600)
+    pd.testing.assert_frame_equal(calcular_factor_crec_7d(df), factor_crec_referencia(df), check_exact=True)
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from final_project.esquema import a_pandas, aplicar_esquema
+
+from final_project.metricas import calcular_factor_crec, calcular_incidencia_7d, procesar_datos
+from final_project.metricas_duckdb import (
+    calcular_factor_crec_sql, calcular_incidencia_7d_sql, procesar_datos_sql,
+)
+from final_project.motor import MotorCalculo
+
+from .test_metricas import datos_sinteticos
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    """Snapshot Parquet como el de SnapshotsOWID: fechas como texto, nulos y duplicados."""
+    df = datos_sinteticos(n_paises=4, n_dias=40)
+    df['date'] = df['date'].dt.strftime('%Y-%m-%d')
+    df.loc[df.sample(frac=0.1, random_state=1).index, 'people_vaccinated'] = np.nan
+    df.loc[df.sample(frac=0.05, random_state=2).index, 'new_cases'] = np.nan
+    duplicados = df.sample(n=10, random_state=3).assign(new_cases=-1.0)
+    df = pd.concat([df, duplicados], ignore_index=True)
+    ruta = tmp_path / "snapshot.parquet"
+    pq.write_table(aplicar_esquema(pa.Table.from_pandas(df, preserve_index=False)), ruta)
+    return ruta
+
+
+def _leer(ruta):
+    return a_pandas(pq.read_table(ruta))
+
+
+def _sin_indice(df):
+    return df.reset_index(drop=True)
+
+
+@pytest.mark.parametrize('paises', [['Pais0', 'Pais2'], ['Pais1'], ['Inexistente'], None])
+def test_paridad_procesar_datos(snapshot, paises):
+    esperado = procesar_datos(_leer(snapshot), paises=paises)
+    obtenido = procesar_datos_sql(snapshot, paises)
+    # Sin filas las categorías vacías difieren solo en el tipo del índice vacío
+    pd.testing.assert_frame_equal(
+        _sin_indice(obtenido), _sin_indice(esperado), check_dtype=False, check_categorical=not esperado.empty,
+    )
+    assert list(map(str, obtenido.dtypes)) == list(map(str, esperado.dtypes))
+
+
+def test_procesar_datos_rango_fechas(snapshot):
+    inicio, fin = pd.Timestamp('2021-01-10'), pd.Timestamp('2021-01-20')
+    esperado = procesar_datos(_leer(snapshot), paises=['Pais0'])
+    esperado = esperado[(esperado['date'] >= inicio) & (esperado['date'] < fin)]
+    obtenido = procesar_datos_sql(snapshot, ['Pais0'], inicio, fin)
+    assert len(obtenido) == len(esperado) > 0
+    pd.testing.assert_frame_equal(_sin_indice(obtenido), _sin_indice(esperado), check_dtype=False)
+
+
+def test_paridad_incidencia_7d():
+    df = datos_sinteticos(n_paises=4, n_dias=50)
+    df.loc[5, 'population'] = np.nan
+    esperado = calcular_incidencia_7d(df)
+    obtenido = calcular_incidencia_7d_sql(df)
+    pd.testing.assert_frame_equal(obtenido, _sin_indice(esperado), rtol=1e-12)
+
+
+@pytest.mark.parametrize('ventanas', [(7,), (7, 14, 28), (3, 10)])
+def test_paridad_factor_crec(ventanas):
+    df = datos_sinteticos(n_paises=4, n_dias=80)
+    esperado = calcular_factor_crec(df, ventanas=ventanas)
+    obtenido = calcular_factor_crec_sql(df, ventanas=ventanas)
+    pd.testing.assert_frame_equal(obtenido, esperado, rtol=1e-12)
+    assert np.isinf(obtenido['factor_crec_7d' if 7 in ventanas else f'factor_crec_{ventanas[0]}d']).any()
+
+
+@pytest.mark.parametrize('n_dias', [0, 5, 13, 14])
+def test_paridad_series_cortas(n_dias):
+    df = datos_sinteticos(n_paises=2, n_dias=n_dias)
+    pd.testing.assert_frame_equal(calcular_factor_crec_sql(df), calcular_factor_crec(df))
+
+
+def test_motor_desconocido():
+    with pytest.raises(ValueError, match="motor"):
+        MotorCalculo(motor="spark").incidencia_7d(datos_sinteticos())
@@ -0,0 +1,43 @@
+from functools import partial
+
+import pandas as pd
+import pytest
+
+from final_project.metricas import calcular_factor_crec, calcular_incidencia_7d, procesar_datos
+from final_project.metricas_duckdb import calcular_incidencia_7d_sql
+from final_project.paralelo import calcular_por_pais, repartir_paises
+
+from .test_metricas import datos_sinteticos
+
+
+@pytest.fixture(scope='module')
+def procesados():
+    # Países con distinto número de filas para que el reparto no sea trivial
+    df = datos_sinteticos(n_paises=5, n_dias=60)
+    df = df[~((df['location'] == 'Pais3') & (df['date'] > df['date'].min() + pd.Timedelta(days=20)))]
+    return procesar_datos(df, paises=None)
+
+
+def test_repartir_paises_balancea_y_es_determinista():
+    filas = pd.Series({'A': 10, 'B': 7, 'C': 5, 'D': 3, 'E': 3})
+    grupos = repartir_paises(filas, 2)
+    assert grupos == repartir_paises(filas.iloc[::-1], 2)
+    assert sorted(p for g in grupos for p in g) == list('ABCDE')
+    assert sorted(sum(filas[p] for p in g) for g in grupos) == [13, 15]
+    assert len(repartir_paises(filas, 10)) == 5
+
+
+@pytest.mark.parametrize('funcion', [
+    calcular_incidencia_7d,
+    partial(calcular_factor_crec, ventanas=(7, 14)),
+    calcular_incidencia_7d_sql,
+])
+def test_paralelo_igual_a_secuencial(procesados, funcion):
+    esperado = funcion(procesados)
+    for procesos in (2, 3):
+        obtenido = calcular_por_pais(procesados, funcion, procesos=procesos)
+        pd.testing.assert_frame_equal(obtenido, esperado)
+
+
+def test_paralelo_sin_filas(procesados):
+    assert calcular_por_pais(procesados.iloc[:0], calcular_incidencia_7d, procesos=2).empty
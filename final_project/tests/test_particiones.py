@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+from dagster import DagsterInstance, materialize
+
+from final_project.assets import datos_procesados, metrica_factor_crec_7d, metrica_incidencia_7d
+from final_project.cache import SnapshotsOWID
+from final_project.incremental import EstadoIncremental, comparar_con_recalculo
+from final_project.io_manager import ColumnarIOManager
+from final_project.metricas import PAISES_INTERES
+from final_project.motor import MotorCalculo
+from final_project.sintetico import escribir_csv_owid, generar_owid
+
+ASSETS = [datos_procesados, metrica_incidencia_7d, metrica_factor_crec_7d]
+
+
+@pytest.fixture(scope='module')
+def owid(tmp_path_factory):
+    """Snapshot sintético con huecos de people_vaccinated (filas descartadas por datos_procesados)."""
+    tmp = tmp_path_factory.mktemp('owid')
+    df = generar_owid(1, dias=90)
+    rng = np.random.default_rng(1)
+    df.loc[rng.random(len(df)) < 0.3, 'people_vaccinated'] = np.nan
+    df.loc[(df['location'] == 'Ecuador') & df['date'].between('2020-03-01', '2020-03-20'), 'people_vaccinated'] = np.nan
+    recurso = SnapshotsOWID(directorio=str(tmp / 'snapshots'), offline=True)
+    recurso.importar(escribir_csv_owid(df, tmp / 'owid.csv'))
+    return recurso
+
+
+@pytest.mark.parametrize('motor', ['pandas', 'duckdb'])
+def test_backfill_y_particiones_diarias_igual_a_recalculo(tmp_path, owid, motor):
+    instancia = DagsterInstance.local_temp(str(tmp_path))
+    motor = MotorCalculo(motor=motor)
+    recursos = {"owid": owid, "motor": motor, "estado": EstadoIncremental(directorio=str(tmp_path / 'estado')),
+                "io_manager": ColumnarIOManager()}
+    salidas = {'metrica_incidencia_7d': [], 'metrica_factor_crec_7d': []}
+
+    def ejecutar(**kwargs):
+        resultado = materialize(ASSETS, instance=instancia, resources=recursos, **kwargs)
+        assert resultado.success
+        for nombre in salidas:
+            salidas[nombre].append(resultado.output_for_node(nombre))
+
+    ejecutar(tags={"dagster/asset_partition_range_start": "2020-02-01",
+                   "dagster/asset_partition_range_end": "2020-03-10"})
+    for dia in pd.date_range('2020-03-11', '2020-03-31'):
+        ejecutar(partition_key=dia.strftime('%Y-%m-%d'))
+
+    completos = motor.procesar(owid, list(PAISES_INTERES))
+    for nombre, funcion, columna in [('metrica_incidencia_7d', motor.incidencia_7d, 'fecha'),
+                                     ('metrica_factor_crec_7d', motor.factor_crec, 'semana_fin')]:
+        recalculo = funcion(completos)
+        recalculo = recalculo[recalculo[columna].between('2020-02-01', '2020-03-31')]
+        acumulado = pd.concat([p for p in salidas[nombre] if not p.empty], ignore_index=True)
+        resumen = comparar_con_recalculo(acumulado, recalculo, [columna, 'pais'])
+        assert resumen['consistente'], (nombre, resumen)
+
+
+def test_particiones_de_contexto_sin_materializar_se_leen_del_snapshot(tmp_path, owid):
+    instancia = DagsterInstance.local_temp(str(tmp_path))
+    motor = MotorCalculo(motor='pandas')
+    recursos = {"owid": owid, "motor": motor, "estado": EstadoIncremental(directorio=str(tmp_path / 'estado')),
+                "io_manager": ColumnarIOManager()}
+
+    # datos_procesados sin las particiones 03-06 y 03-07, dentro del contexto de 03-11
+    for inicio, fin in [('2020-02-01', '2020-03-05'), ('2020-03-08', '2020-03-11')]:
+        assert materialize([datos_procesados], instance=instancia, resources=recursos, tags={
+            "dagster/asset_partition_range_start": inicio, "dagster/asset_partition_range_end": fin,
+        }).success
+    resultado = materialize(ASSETS, instance=instancia, resources=recursos, partition_key='2020-03-11',
+                            selection=[metrica_incidencia_7d, metrica_factor_crec_7d])
+    assert resultado.success
+
+    completos = motor.procesar(owid, list(PAISES_INTERES))
+    for nombre, funcion, columna in [('metrica_incidencia_7d', motor.incidencia_7d, 'fecha'),
+                                     ('metrica_factor_crec_7d', motor.factor_crec, 'semana_fin')]:
+        recalculo = funcion(completos)
+        recalculo = recalculo[recalculo[columna] == '2020-03-11']
+        resumen = comparar_con_recalculo(resultado.output_for_node(nombre), recalculo, [columna, 'pais'])
+        assert resumen['consistente'], (nombre, resumen)
+
+
+def test_estado_incremental_se_resiembra_con_un_pais_nuevo(tmp_path, owid):
+    instancia = DagsterInstance.local_temp(str(tmp_path))
+    motor = MotorCalculo(motor='pandas')
+    recursos = {"owid": owid, "motor": motor, "io_manager": ColumnarIOManager(),
+                "estado": EstadoIncremental(directorio=str(tmp_path / 'estado'), activo=True)}
+    salidas = []
+
+    # Finland entra a la configuración el 03-21 con el estado ya sembrado solo con Ecuador
+    for dia in pd.date_range('2020-03-10', '2020-03-25'):
+        paises = ['Ecuador'] if dia < pd.Timestamp('2020-03-21') else list(PAISES_INTERES)
+        resultado = materialize(ASSETS, instance=instancia, resources=recursos, partition_key=dia.strftime('%Y-%m-%d'),
+                                run_config={"ops": {"datos_procesados": {"config": {"paises": paises}}}})
+        assert resultado.success
+        salidas.append(resultado.output_for_node('metrica_incidencia_7d'))
+
+    recalculo = motor.incidencia_7d(motor.procesar(owid, list(PAISES_INTERES)))
+    recalculo = recalculo[recalculo['fecha'].between('2020-03-21', '2020-03-25')]
+    acumulado = pd.concat(salidas, ignore_index=True)
+    acumulado = acumulado[acumulado['fecha'] >= '2020-03-21']
+    resumen = comparar_con_recalculo(acumulado, recalculo, ['fecha', 'pais'])
+    assert resumen['consistente'], resumen
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from final_project.reporte import escribir_reporte
+
+
+@pytest.fixture
+def hojas():
+    return {
+        'Datos_Procesados': pd.DataFrame({
+            'location': ['Ecuador', 'Finland', 'Ecuador'],
+            'date': pd.to_datetime(['2021-01-01', '2021-01-01', '2021-01-02']),
+            'new_cases': [10.0, np.nan, 30.0],
+        }),
+        'Factor_Crec_7d': pd.DataFrame({
+            'pais': ['Ecuador', 'Finland'],
+            'factor_crec_7d': [1.5, np.inf],
+        }),
+        'Resumen_Validaciones': pd.DataFrame({
+            'nombre_regla': ['check_fechas_validas'],
+            'estado': ['PASSED'],
+            'filas_afectadas': [0],
+        }),
+    }
+
+
+def _leer(ruta):
+    return pd.read_excel(ruta, sheet_name=None)
+
+
+def test_xlsxwriter_igual_a_openpyxl(hojas, tmp_path):
+    streaming = escribir_reporte(hojas, tmp_path / "a.xlsx", motor='xlsxwriter')[0]
+    fallback = escribir_reporte(hojas, tmp_path / "b.xlsx", motor='openpyxl')[0]
+
+    leido_streaming, leido_fallback = _leer(streaming), _leer(fallback)
+    assert list(leido_streaming) == list(hojas)
+    for nombre in hojas:
+        pd.testing.assert_frame_equal(leido_streaming[nombre], leido_fallback[nombre])
+    pd.testing.assert_series_equal(
+        leido_streaming['Datos_Procesados']['date'], hojas['Datos_Procesados']['date'], check_dtype=False
+    )
+
+
+def test_crea_directorios_y_formatos_extra(hojas, tmp_path):
+    ruta = tmp_path / "salidas" / "reporte.xlsx"
+    rutas = escribir_reporte(hojas, ruta, formatos_extra=['parquet', 'csv'])
+
+    assert rutas[0] == ruta and ruta.exists()
+    assert len(rutas) == 1 + 2 * len(hojas)
+    parquet = pd.read_parquet(ruta.with_name("reporte_Datos_Procesados.parquet"))
+    pd.testing.assert_frame_equal(parquet, hojas['Datos_Procesados'], check_dtype=False)
+    assert ruta.with_name("reporte_Resumen_Validaciones.csv").exists()
+
+
+def test_opciones_invalidas(hojas, tmp_path):
+    with pytest.raises(ValueError, match="motor"):
+        escribir_reporte(hojas, tmp_path / "r.xlsx", motor='xlrd')
+    with pytest.raises(ValueError, match="formatos"):
+        escribir_reporte(hojas, tmp_path / "r.xlsx", formatos_extra=['json'])
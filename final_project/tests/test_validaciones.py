@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from dagster import AssetKey, DagsterInstance, materialize
+
+from final_project import validaciones
+from final_project.assets import checks_entrada, leer_datos, resumen_validaciones
+from final_project.cache import SnapshotsOWID
+from final_project.sintetico import escribir_csv_owid, generar_owid
+from final_project.validaciones import REGLAS_ENTRADA, evaluar_reglas, resultado_validaciones, tabla_resumen
+
+
+def datos_con_problemas():
+    return pd.DataFrame({
+        'location': ['Ecuador', 'Ecuador', 'Ecuador', 'Finland', 'Finland'],
+        'date': ['2021-01-01', '2021-01-01', '2999-01-01', '2021-01-01', 'no-es-fecha'],
+        'new_cases': [1.0, -3.0, 2.0, np.nan, -1.0],
+        'people_vaccinated': [1.0, 1.0, 1.0, 1.0, 1.0],
+        'population': [100.0, 0.0, np.nan, 50.0, 50.0],
+    })
+
+
+def test_reglas_en_una_pasada():
+    resultados = evaluar_reglas(datos_con_problemas())
+    afectadas = {n: r.filas_afectadas for n, r in resultados.items()}
+    assert afectadas == {
+        'check_fechas_validas': 1,
+        'check_columnas_clave_no_nulas': 0,
+        'check_unicidad_location_date': 1,
+        'check_population_positiva': 2,
+        'check_new_cases_no_negativos': 2,
+    }
+    assert [r.passed for r in resultados.values()] == [False, True, False, False, True]
+
+
+def test_no_muta_la_entrada():
+    df = datos_con_problemas()
+    original = df.copy()
+    evaluar_reglas(df)
+    pd.testing.assert_frame_equal(df, original)
+
+
+def test_columnas_faltantes():
+    resultados = evaluar_reglas(pd.DataFrame({'location': ['Ecuador']}))
+    assert not resultados['check_fechas_validas'].passed
+    assert resultados['check_columnas_clave_no_nulas'].metadata == {'columnas_faltantes': ['date', 'population']}
+    assert not resultados['check_new_cases_no_negativos'].passed
+
+
+def test_tabla_resumen():
+    tabla = tabla_resumen(evaluar_reglas(datos_con_problemas()))
+    assert list(tabla.columns) == ['nombre_regla', 'estado', 'filas_afectadas', 'notas']
+    assert list(tabla['nombre_regla']) == REGLAS_ENTRADA
+    assert list(tabla['estado']) == ['FAILED', 'PASSED', 'FAILED', 'FAILED', 'PASSED']
+
+
+def contexto(instancia, storage_id):
+    # Contexto minimo: solo instancia y el evento de leer_datos que leyo el paso
+    info = SimpleNamespace(storage_id=storage_id)
+    paso = SimpleNamespace(maybe_fetch_and_get_input_asset_version_info=lambda clave: info)
+    return SimpleNamespace(instance=instancia,
+                           op_execution_context=SimpleNamespace(get_step_execution_context=lambda: paso))
+
+
+def test_cache_por_materializacion(tmp_path, monkeypatch):
+    evaluaciones = []
+    original = validaciones.evaluar_reglas
+    monkeypatch.setattr(validaciones, 'evaluar_reglas', lambda df: evaluaciones.append(1) or original(df))
+
+    instancia = DagsterInstance.local_temp(str(tmp_path))
+    df = datos_con_problemas()
+    cache = tmp_path / 'storage' / 'validaciones'
+
+    primero = resultado_validaciones(contexto(instancia, 5), df)
+    segundo = resultado_validaciones(contexto(instancia, 5), df)
+    assert primero == segundo
+    assert len(evaluaciones) == 1
+
+    # Otra materializacion invalida el resultado; una ejecucion vieja no borra la nueva
+    resultado_validaciones(contexto(instancia, 7), df.iloc[:1])
+    resultado_validaciones(contexto(instancia, 6), df)
+    assert len(evaluaciones) == 3
+    assert sorted(r.name for r in cache.glob('*.json')) == ['leer_datos-6.json', 'leer_datos-7.json']
+    assert not list(cache.glob('*.tmp'))
+
+    # Un JSON a medias se recalcula en vez de fallar
+    (cache / 'leer_datos-7.json').write_text('{"check_fe', encoding='utf-8')
+    assert resultado_validaciones(contexto(instancia, 7), df) == primero
+    assert len(evaluaciones) == 4
+
+
+def test_cache_usa_la_materializacion_leida_por_el_paso(tmp_path):
+    instancia = DagsterInstance.local_temp(str(tmp_path))
+    owid = SnapshotsOWID(directorio=str(tmp_path / 'snapshots'), offline=True)
+    owid.importar(escribir_csv_owid(generar_owid(1, dias=30), tmp_path / 'owid.csv'))
+    resultado = materialize([leer_datos, checks_entrada, resumen_validaciones], instance=instancia,
+                            resources={"owid": owid})
+    assert resultado.success
+
+    # Check y resumen comparten la entrada cacheada con el evento de leer_datos de esta ejecucion
+    evento = instancia.fetch_materializations(AssetKey('leer_datos'), limit=1).records[0]
+    assert evento.run_id == resultado.run_id
+    assert [r.name for r in (tmp_path / 'storage' / 'validaciones').glob('*.json')] == \
+        [f'leer_datos-{evento.storage_id}.json']
@@ -0,0 +1,183 @@
+"""
+    Motor de validaciones de entrada sobre leer_datos.
+
+    Todas las reglas se evaluan en una sola pasada columnar (cada columna se lee una
+    vez y nunca se modifica el DataFrame de entrada). El resultado se cachea por
+    materializacion de leer_datos, de modo que los asset checks y resumen_validaciones
+    leen el mismo resultado sin volver a escanear los datos.
+"""
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+from dagster import AssetKey
+
+from .esquema import parsear_fechas
+
+COLUMNAS_CLAVE = ['location', 'date', 'population']
+
+# Orden de las reglas en la tabla de resumen
+REGLAS_ENTRADA = [
+    'check_fechas_validas',
+    'check_columnas_clave_no_nulas',
+    'check_unicidad_location_date',
+    'check_population_positiva',
+    'check_new_cases_no_negativos',
+]
+
+
+@dataclass(frozen=True)
+class ResultadoRegla:
+    nombre_regla: str
+    passed: bool
+    filas_afectadas: int
+    descripcion: str
+    notas: str
+    metadata: dict = field(default_factory=dict)
+
+
+def _faltante(nombre: str, columna: str, notas: str) -> ResultadoRegla:
+    return ResultadoRegla(
+        nombre, False, 0, f"Columna '{columna}' no encontrada", notas
+    )
+
+
+def evaluar_reglas(leer_datos: pd.DataFrame, hoy: Optional[pd.Timestamp] = None) -> Dict[str, ResultadoRegla]:
+    """
+        Evalua las 5 reglas de entrada en una pasada y sin mutar leer_datos.
+    """
+    df = leer_datos
+    columnas = set(df.columns)
+    hoy = pd.Timestamp.now() if hoy is None else hoy
+    resultados = {}
+
+    # Regla 1: max(date) <= hoy (fechas no parseables no cuentan como futuras)
+    nombre, notas = 'check_fechas_validas', 'Verificación de fechas no futuras'
+    if 'date' in columnas:
+        # Con el esquema de ingesta date ya es datetime64; solo se parsea si no viene tipada
+        futuras = int((parsear_fechas(df['date']) > hoy).sum())
+        resultados[nombre] = ResultadoRegla(
+            nombre, futuras == 0, futuras,
+            f"Verificación fechas no futuras. Filas afectadas: {futuras}", notas,
+        )
+    else:
+        resultados[nombre] = _faltante(nombre, 'date', notas)
+
+    # Regla 2: columnas clave presentes y no completamente nulas
+    nombre, notas = 'check_columnas_clave_no_nulas', 'Columnas: location, date, population'
+    faltantes = [col for col in COLUMNAS_CLAVE if col not in columnas]
+    if faltantes:
+        resultados[nombre] = ResultadoRegla(
+            nombre, False, len(faltantes), f"Columnas faltantes: {faltantes}", notas,
+            {"columnas_faltantes": faltantes},
+        )
+    else:
+        filas_nulas = sum(len(df) for col in COLUMNAS_CLAVE if df[col].isna().all())
+        resultados[nombre] = ResultadoRegla(
+            nombre, filas_nulas == 0, filas_nulas,
+            f"Columnas clave verificadas. Filas con nulos: {filas_nulas}", notas,
+            {"columnas_verificadas": COLUMNAS_CLAVE},
+        )
+
+    # Regla 3: unicidad de (location, date)
+    nombre, notas = 'check_unicidad_location_date', 'Unicidad de (location, date)'
+    if {'location', 'date'}.issubset(columnas):
+        duplicados = int(df.duplicated(subset=['location', 'date']).sum())
+        resultados[nombre] = ResultadoRegla(
+            nombre, duplicados == 0, duplicados,
+            f"Verificación unicidad (location,date). Duplicados: {duplicados}", notas,
+        )
+    else:
+        resultados[nombre] = ResultadoRegla(
+            nombre, False, 0, "Columnas location o date no encontradas", notas
+        )
+
+    # Regla 4: population > 0 (los nulos cuentan como invalidos)
+    nombre, notas = 'check_population_positiva', 'Validación population > 0'
+    if 'population' in columnas:
+        invalidas = int((~(df['population'] > 0)).sum())
+        resultados[nombre] = ResultadoRegla(
+            nombre, invalidas == 0, invalidas,
+            f"Verificación population > 0. Filas afectadas: {invalidas}", notas,
+        )
+    else:
+        resultados[nombre] = _faltante(nombre, 'population', notas)
+
+    # Regla 5: new_cases >= 0, negativos permitidos pero documentados
+    nombre, notas = 'check_new_cases_no_negativos', 'Casos negativos permitidos (correcciones admin)'
+    if 'new_cases' in columnas:
+        negativos = int((df['new_cases'] < 0).sum())
+        resultados[nombre] = ResultadoRegla(
+            nombre, True, negativos,
+            f"Casos negativos documentados (correcciones admin): {negativos}", notas,
+            {"nota": "Valores negativos permitidos - correcciones administrativas"},
+        )
+    else:
+        resultados[nombre] = _faltante(nombre, 'new_cases', notas)
+
+    return resultados
+
+
+def tabla_resumen(resultados: Dict[str, ResultadoRegla]) -> pd.DataFrame:
+    """
+        Tabla nombre_regla, estado, filas_afectadas, notas.
+    """
+    return pd.DataFrame([
+        {
+            'nombre_regla': nombre,
+            'estado': 'PASSED' if resultados[nombre].passed else 'FAILED',
+            'filas_afectadas': resultados[nombre].filas_afectadas,
+            'notas': resultados[nombre].notas,
+        }
+        for nombre in REGLAS_ENTRADA
+    ])
+
+
+def _clave_materializacion(context) -> Optional[int]:
+    # storage_id del evento de leer_datos que leyo este paso (el mismo al que Dagster
+    # asocia los resultados de los checks), no el ultimo evento de la instancia
+    paso = context.op_execution_context.get_step_execution_context()
+    info = paso.maybe_fetch_and_get_input_asset_version_info(AssetKey("leer_datos"))
+    return info.storage_id if info is not None else None
+
+
+def _leer_cache(ruta: Path) -> Optional[Dict[str, ResultadoRegla]]:
+    # Un archivo borrado por otra ejecucion o ilegible se trata como ausente
+    try:
+        datos = json.loads(ruta.read_text(encoding='utf-8'))
+        return {nombre: ResultadoRegla(**valores) for nombre, valores in datos.items()}
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def resultado_validaciones(context, leer_datos: pd.DataFrame) -> Dict[str, ResultadoRegla]:
+    """
+        Resultado de evaluar_reglas cacheado por materializacion de leer_datos en el
+        storage de la instancia de Dagster.
+    """
+    clave = _clave_materializacion(context)
+    if clave is None:
+        return evaluar_reglas(leer_datos)
+
+    directorio = Path(context.instance.storage_directory()) / "validaciones"
+    ruta = directorio / f"leer_datos-{clave}.json"
+    resultados = _leer_cache(ruta)
+    if resultados is not None:
+        return resultados
+
+    resultados = evaluar_reglas(leer_datos)
+    directorio.mkdir(parents=True, exist_ok=True)
+    # checks_entrada y resumen_validaciones corren en paralelo: se escribe a un temporal
+    # del mismo directorio y se reemplaza atomicamente para no exponer JSON a medias
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directorio, suffix='.tmp', delete=False) as tmp:
+        json.dump({n: asdict(r) for n, r in resultados.items()}, tmp)
+    os.replace(tmp.name, ruta)
+    # Solo se descartan materializaciones anteriores; las posteriores pueden estar en uso
+    for anterior in directorio.glob("leer_datos-*.json"):
+        if int(anterior.stem.rsplit('-', 1)[1]) < clave:
+            anterior.unlink(missing_ok=True)
+    return resultados
@@ -0,0 +1,49 @@
+import argparse
+import random
+import time
+from modulo_utilidades import BuscadorMultiple, buscar
+
+# Benchmark: bucle anidado de buscar (un str.find por par texto-patron) contra
+# BuscadorMultiple (un solo recorrido por texto). Verifica que ambos den lo mismo.
+#
+#   python benchmark_buscar.py --patrones 10 100 1000 5000 --textos 200
+
+ALFABETO = "abcdefghijklmnopqrstuvwxyz "
+
+def generar(n, largo_min, largo_max, rng):
+    return ["".join(rng.choice(ALFABETO) for _ in range(rng.randint(largo_min, largo_max))) for _ in range(n)]
+
+def ingenuo(textos, patrones):
+    return [{p: buscar(t, p) for p in patrones} for t in textos]
+
+def automata(textos, patrones):
+    buscador = BuscadorMultiple(patrones)
+    return [buscador.buscar_todos(t) for t in textos]
+
+def medir(funcion, *args):
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return time.perf_counter() - inicio, resultado
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--patrones", nargs="+", type=int, default=[10, 100, 1000, 5000])
+    ap.add_argument("--textos", type=int, default=200)
+    ap.add_argument("--largo", type=int, default=2000, help="caracteres por texto")
+    ap.add_argument("--semilla", type=int, default=0)
+    args = ap.parse_args()
+
+    rng = random.Random(args.semilla)
+    textos = generar(args.textos, args.largo, args.largo, rng)
+    print(f"{args.textos} textos de {args.largo} caracteres")
+    print(f"{'patrones':>9} {'ingenuo_s':>10} {'automata_s':>11} {'compilar_s':>11} {'aceleracion':>12}")
+    for n in args.patrones:
+        patrones = generar(n, 3, 8, rng)
+        t_ingenuo, esperado = medir(ingenuo, textos, patrones)
+        t_compilar, _ = medir(BuscadorMultiple, patrones)
+        t_automata, obtenido = medir(automata, textos, patrones)
+        if obtenido != esperado: raise SystemExit(f"resultados distintos con {n} patrones")
+        print(f"{n:>9} {t_ingenuo:10.3f} {t_automata:11.3f} {t_compilar:11.3f} {t_ingenuo / t_automata:11.1f}x")
+
+if __name__ == "__main__":
+    main()
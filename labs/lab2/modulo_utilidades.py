@@ -1,7 +1,8 @@
 """
     Modulo de utilidades de cadenas.
 """
-from typing import Optional
+from collections import deque
+from typing import Dict, Iterable, List, Optional
 
 def normalizar(texto: str) -> str:
     return texto.strip().lower()
@@ -18,3 +19,68 @@ def cortar(texto: str, n: int) -> str:
 def buscar(texto: str, sub: str) -> Optional[int]:
     idx = texto.find(sub)
     return idx if idx != -1 else None
+
+
+class BuscadorMultiple:
+    """
+        Automata de Aho-Corasick sobre un conjunto de patrones: se compila una vez y
+        cada texto se recorre una sola vez, sin importar cuantos patrones haya.
+        buscar_todos devuelve la primera posicion de cada patron o None, igual que
+        buscar(texto, patron).
+    """
+
+    def __init__(self, patrones: Iterable[str]):
+        self.patrones: List[str] = list(dict.fromkeys(patrones))
+        self._hijos: List[Dict[str, int]] = [{}]
+        self._salida: List[List[int]] = [[]]   # patrones que terminan en el nodo
+        for k, patron in enumerate(self.patrones):
+            nodo = 0
+            for c in patron:
+                siguiente = self._hijos[nodo].get(c)
+                if siguiente is None:
+                    siguiente = len(self._hijos)
+                    self._hijos[nodo][c] = siguiente
+                    self._hijos.append({})
+                    self._salida.append([])
+                nodo = siguiente
+            self._salida[nodo].append(k)
+        # falla: sufijo propio mas largo que tambien es prefijo de algun patron;
+        # enlace: el nodo con salida mas cercano siguiendo fallas (0 si no hay)
+        self._falla = [0] * len(self._hijos)
+        self._enlace = [0] * len(self._hijos)
+        cola = deque(self._hijos[0].values())
+        while cola:
+            nodo = cola.popleft()
+            for c, hijo in self._hijos[nodo].items():
+                f = self._falla[nodo]
+                while f and c not in self._hijos[f]:
+                    f = self._falla[f]
+                f = self._hijos[f].get(c, 0) if nodo else 0
+                self._falla[hijo] = f if f != hijo else 0
+                self._enlace[hijo] = f if self._salida[f] else self._enlace[f]
+                cola.append(hijo)
+
+    def buscar_todos(self, texto: str) -> Dict[str, Optional[int]]:
+        resultado: List[Optional[int]] = [None] * len(self.patrones)
+        pendientes = len(self.patrones)
+        for k in self._salida[0]:   # patron vacio: "".find -> 0
+            resultado[k] = 0
+            pendientes -= 1
+        hijos, falla, salida, enlace = self._hijos, self._falla, self._salida, self._enlace
+        largos = [len(p) for p in self.patrones]
+        nodo = 0
+        for i, c in enumerate(texto):
+            if not pendientes:
+                break
+            while nodo and c not in hijos[nodo]:
+                nodo = falla[nodo]
+            nodo = hijos[nodo].get(c, 0)
+            # la primera vez que un patron termina en i es su aparicion mas a la izquierda
+            n = nodo if salida[nodo] else enlace[nodo]
+            while n:
+                for k in salida[n]:
+                    if resultado[k] is None:
+                        resultado[k] = i - largos[k] + 1
+                        pendientes -= 1
+                n = enlace[n]
+        return dict(zip(self.patrones, resultado))
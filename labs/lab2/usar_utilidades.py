@@ -1,4 +1,4 @@
-from modulo_utilidades import normalizar, es_palindromo, cortar, buscar
+from modulo_utilidades import normalizar, es_palindromo, cortar, buscar, BuscadorMultiple
 
 def main():
     print("--- Pruebas modulo_utilidades ---")
@@ -10,6 +10,7 @@ def main():
     except ValueError as e:
         print("OK error esperado:", e)
     print("buscar 'mun' en 'comunidad':", buscar("comunidad", "mun"))
+    print("buscar_todos en 'comunidad':", BuscadorMultiple(["mun", "dad", "xyz"]).buscar_todos("comunidad"))
 
 if __name__ == "__main__":
     main()
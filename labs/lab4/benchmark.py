@@ -0,0 +1,163 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+# Benchmark y paridad pandas vs DuckDB: genera CSV con la forma de data/example.csv,
+# ejecuta cada script en un proceso aparte (tiempo de pared y memoria pico del proceso,
+# incluidas las asignaciones de Arrow y DuckDB) y compara los resumenes por (categoria, mes).
+#
+#   python benchmark.py --filas 10k 1M 10M --nulos unidades=0.08 valor=0.01
+#   python benchmark.py --filas 50M --motores pandas-bloques duckdb --json resultados.json
+
+AQUI = Path(__file__).resolve().parent
+MOTORES = {
+    "pandas": ["pandas_analysis.py"],
+    "pandas-bloques": ["pandas_analysis.py", "--chunksize"],  # + filas por bloque
+    "duckdb": ["duckdb_analysis.py"],
+}
+SALIDA = {"pandas": "pandas_summary.csv", "pandas-bloques": "pandas_summary.csv", "duckdb": "duckdb_summary.csv"}
+NULOS = {"categoria": 0.0, "fecha": 0.0, "valor": 0.0, "unidades": 0.08}  # como example.csv
+CLAVES = ["categoria", "mes"]
+BLOQUE = 1_000_000
+TOLERANCIA = 1e-9
+
+def _filas(texto):
+    # 10k, 1M, 50M o un entero
+    mult = {"k": 10**3, "m": 10**6}.get(texto[-1].lower(), 1)
+    return int(float(texto[:-1] if mult > 1 else texto) * mult)
+
+def _nulos(pares):
+    nulos = dict(NULOS)
+    for par in pares:
+        col, tasa = par.split("=")
+        if col not in nulos: raise SystemExit(f"columna desconocida: {col}")
+        nulos[col] = float(tasa)
+    return nulos
+
+def generar(ruta, filas, nulos, semilla=0):
+    # Por bloques: 50M filas no pasan por memoria de una vez. id, 3 categorias,
+    # fechas de 2024-01 a 2024-03, valor 10-100 con 2 decimales, unidades 1-10
+    rng = np.random.default_rng(semilla)
+    inicio = np.datetime64("2024-01-01")
+    esquema = pa.schema([("id", pa.int64()), ("categoria", pa.string()), ("fecha", pa.date32()),
+                         ("valor", pa.float64()), ("unidades", pa.int64())])
+    with open(ruta, "wb") as f:
+        f.write((",".join(esquema.names) + "\n").encode())
+    opciones = pacsv.WriteOptions(include_header=False, quoting_style="none")
+    with open(ruta, "ab") as f, pacsv.CSVWriter(f, esquema, write_options=opciones) as writer:
+        for desde in range(0, filas, BLOQUE):
+            n = min(BLOQUE, filas - desde)
+            mascara = {c: rng.random(n) < nulos[c] for c in nulos}
+            columnas = {
+                "id": pa.array(np.arange(desde + 1, desde + n + 1)),
+                "categoria": pa.array(np.array(["A", "B", "C"])[rng.integers(0, 3, n)], mask=mascara["categoria"]),
+                "fecha": pa.array(inicio + rng.integers(0, 91, n).astype("timedelta64[D]"), mask=mascara["fecha"]),
+                "valor": pa.array(np.round(rng.uniform(10, 100, n), 2), mask=mascara["valor"]),
+                "unidades": pa.array(rng.integers(1, 11, n), mask=mascara["unidades"]),
+            }
+            writer.write_table(pa.table(columnas))
+
+def datos(directorio, filas, nulos, semilla=0):
+    # Se reutiliza el CSV si ya existe con los mismos parametros
+    etiqueta = "_".join(f"{c}{nulos[c]:g}" for c in sorted(nulos))
+    ruta = directorio/f"datos_{filas}_{etiqueta}_s{semilla}.csv"
+    if not ruta.exists():
+        tmp = ruta.with_suffix(".tmp")
+        generar(tmp, filas, nulos, semilla)
+        os.replace(tmp, ruta)
+    return ruta
+
+def ejecutar(motor, csv_path, outdir, extra=()):
+    # Proceso hijo: os.wait4 da el rusage de ese hijo (ru_maxrss en KB en Linux).
+    # El tiempo incluye el arranque del interprete (~0.5 s), que domina en archivos chicos
+    comando = [sys.executable, str(AQUI/MOTORES[motor][0]), *MOTORES[motor][1:], *extra, "--csv", str(csv_path), "--outdir", str(outdir)]
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen(comando, stdout=subprocess.DEVNULL)
+    if hasattr(os, "wait4"):
+        _, estado, uso = os.wait4(proceso.pid, 0)
+        proceso.returncode, pico = os.waitstatus_to_exitcode(estado), uso.ru_maxrss / 1024
+    else:
+        proceso.wait(); pico = None
+    segundos = time.perf_counter() - inicio
+    if proceso.returncode: raise SystemExit(f"{motor} fallo con codigo {proceso.returncode}")
+    return segundos, pico
+
+def leer_resumen(ruta):
+    # Mismas claves para ambos motores: pandas escribe NaT para fechas nulas y DuckDB NA
+    df = pd.read_csv(ruta, keep_default_na=False, na_values={c: [""] for c in ["valor_sum", "valor_avg", "total_sum", "total_avg"]})
+    df["mes"] = df["mes"].replace("NaT", "NA")
+    return df
+
+def comparar(ref, otro):
+    # Grupos solo en un lado y, en los comunes, grupos y maxima diferencia relativa por metrica
+    unido = ref.merge(otro, on=CLAVES, how="outer", suffixes=("", "_otro"), indicator=True)
+    comunes = unido[unido["_merge"] == "both"]
+    diferencia = {
+        "solo_referencia": [tuple(x) for x in unido.loc[unido["_merge"] == "left_only", CLAVES].to_numpy().tolist()],
+        "solo_motor": [tuple(x) for x in unido.loc[unido["_merge"] == "right_only", CLAVES].to_numpy().tolist()],
+        "columnas": {},
+    }
+    for col in [c for c in ref.columns if c not in CLAVES and c in otro.columns]:
+        a, b = comunes[col].to_numpy(dtype="float64"), comunes[f"{col}_otro"].to_numpy(dtype="float64")
+        iguales = (a == b) | (np.isnan(a) & np.isnan(b))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            relativa = np.where(iguales, 0.0, np.abs(a - b) / np.maximum(np.abs(a), np.finfo("float64").tiny))
+        relativa = np.nan_to_num(relativa, nan=np.inf)
+        if (relativa > TOLERANCIA).any():
+            diferencia["columnas"][col] = {"grupos": int((relativa > TOLERANCIA).sum()), "max_relativa": float(relativa.max())}
+    faltan = [c for c in ref.columns if c not in otro.columns] + [c for c in otro.columns if c not in ref.columns]
+    if faltan: diferencia["columnas_distintas"] = faltan
+    diferencia["iguales"] = not (diferencia["solo_referencia"] or diferencia["solo_motor"] or diferencia["columnas"] or faltan)
+    return diferencia
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--filas", nargs="+", type=_filas, default=[_filas("10k"), _filas("100k"), _filas("1M")], help="tamanos: 10k ... 50M")
+    ap.add_argument("--nulos", nargs="*", default=[], help="tasas de nulos por columna, p. ej. unidades=0.08 valor=0.01")
+    ap.add_argument("--motores", nargs="+", default=list(MOTORES), choices=list(MOTORES), help="el primero es la referencia de paridad")
+    ap.add_argument("--chunksize", type=int, default=200_000, help="filas por bloque de pandas-bloques")
+    ap.add_argument("--repeticiones", type=int, default=1)
+    ap.add_argument("--semilla", type=int, default=0)
+    ap.add_argument("--datos", default="data/benchmark", help="directorio de CSV generados (se reutilizan)")
+    ap.add_argument("--outdir", default="outputs/benchmark")
+    ap.add_argument("--json", default=None, help="guardar resultados en JSON")
+    args = ap.parse_args()
+
+    nulos = _nulos(args.nulos)
+    directorio = Path(args.datos); directorio.mkdir(parents=True, exist_ok=True)
+    resultados = []
+    print(f"nulos: {nulos}")
+    print(f"{'filas':>11} {'motor':<15} {'segundos':>9} {'pico_mb':>9} {'filas/s':>12}  paridad")
+    for filas in args.filas:
+        csv_path = datos(directorio, filas, nulos, args.semilla)
+        resumenes = {}
+        for motor in args.motores:
+            outdir = Path(args.outdir)/str(filas)/motor
+            extra = [str(args.chunksize)] if motor == "pandas-bloques" else []
+            medidas = [ejecutar(motor, csv_path, outdir, extra) for _ in range(args.repeticiones)]
+            segundos = min(s for s, _ in medidas)
+            pico = max((p for _, p in medidas if p is not None), default=None)
+            resumenes[motor] = leer_resumen(outdir/SALIDA[motor])
+            ref = args.motores[0]
+            paridad = None if motor == ref else comparar(resumenes[ref], resumenes[motor])
+            resultados.append({"filas": filas, "motor": motor, "segundos": segundos, "memoria_pico_mb": pico,
+                               "filas_por_segundo": filas / segundos, "paridad": paridad})
+            estado = "referencia" if paridad is None else "igual" if paridad["iguales"] else \
+                f"DISTINTO ({len(paridad['solo_referencia'])}/{len(paridad['solo_motor'])} grupos sin par, " \
+                f"columnas: {', '.join(paridad['columnas']) or '-'})"
+            pico_txt = f"{pico:9.1f}" if pico is not None else f"{'-':>9}"
+            print(f"{filas:>11,} {motor:<15} {segundos:9.3f} {pico_txt} {filas / segundos:12,.0f}  {estado}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"nulos": nulos, "semilla": args.semilla, "resultados": resultados}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,15 @@
 import argparse
+import os
 from pathlib import Path
 import duckdb
+import pyarrow.parquet as pq
 
 CONFIG = {"categoria":"categoria","fecha":"fecha","valor":"valor","unidades":"unidades"}
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--csv", default="data/example.csv")
-    ap.add_argument("--outdir", default="outputs")
-    args = ap.parse_args()
-
-    csv_path = Path(args.csv)
-    outdir = Path(args.outdir); outdir.mkdir(parents=True, exist_ok=True)
-
-    c = duckdb.connect()
+def con_grupo(fuente):
     fcol, vcol, ucol, ccol = CONFIG["fecha"], CONFIG["valor"], CONFIG["unidades"], CONFIG["categoria"]
-    query = f"""
-        with src as (select * from read_csv_auto('{csv_path.as_posix()}')),
+    return f"""
+        with src as (select * from {fuente}),
         base as (
           select *, try_cast({fcol} as timestamp) as fecha_dt,
                  coalesce({ucol}, 0) as unidades_ok,
@@ -33,6 +26,21 @@ def main():
                  {vcol}, total
           from filtrado
         )
+    """
+
+def patrones_csv(entradas):
+    # Un directorio se lee como dir/*.csv; archivos y globs pasan tal cual al escaneo
+    # multi-archivo de DuckDB (paralelo)
+    entradas = [entradas] if isinstance(entradas, (str, Path)) else entradas
+    return [(Path(e)/"*.csv").as_posix() if Path(e).is_dir() else Path(e).as_posix() for e in entradas]
+
+def fuente_csv(patrones):
+    lista = ", ".join(f"'{p}'" for p in ([patrones] if isinstance(patrones, str) else patrones))
+    return f"read_csv_auto([{lista}], union_by_name = true)"
+
+def consulta_resumen(patrones):
+    vcol = CONFIG["valor"]
+    return con_grupo(fuente_csv(patrones)) + f"""
         select categoria, mes,
                sum({vcol}) as valor_sum, avg({vcol}) as valor_avg,
                sum(coalesce(total,0)) as total_sum, avg(coalesce(total,0)) as total_avg,
@@ -41,10 +49,115 @@ def main():
         group by 1,2
         order by 1,2
     """
-    df = c.execute(query).df()
-    df.to_csv(outdir/"duckdb_summary.csv", index=False)
-    try: c.execute(f"copy ({query}) to '{(outdir/'duckdb_summary.parquet').as_posix()}' (format parquet)")
+
+# Base persistente: cada CSV se agrega una sola vez por (categoria, mes) en la tabla
+# agregado (sumas y conteos, combinables entre archivos); los resumenes siguientes
+# leen solo esa tabla. Un CSV se vuelve a cargar si cambia su tamano o fecha de
+# modificacion (sus filas de agregado se reemplazan) y las filas de los archivos que
+# ya no estan en --csv se borran: la base resume exactamente los archivos pedidos.
+# Las sumas de columnas enteras se guardan tambien como HUGEINT para devolver los
+# mismos tipos que la consulta directa (HUGEINT si todos los archivos son enteros).
+
+ESQUEMA_DB = """
+    create table if not exists archivos (ruta varchar primary key, tamano bigint, mtime double, cargado timestamp);
+    create table if not exists agregado (
+      ruta varchar, categoria varchar, mes varchar,
+      valor_sum double, valor_n bigint, total_sum double, n bigint
+    );
+    alter table archivos add column if not exists valor_entero boolean;
+    alter table archivos add column if not exists total_entero boolean;
+    alter table agregado add column if not exists valor_sum_int hugeint;
+    alter table agregado add column if not exists total_sum_int hugeint;
+"""
+ENTEROS = {"TINYINT", "SMALLINT", "INTEGER", "BIGINT", "HUGEINT", "UTINYINT", "USMALLINT", "UINTEGER", "UBIGINT"}
+
+def ingerir(c, csv_path):
+    ruta = str(Path(csv_path).resolve())
+    stat = os.stat(ruta)
+    previo = c.execute("select tamano, mtime, valor_entero is not null from archivos where ruta = ?", [ruta]).fetchone()
+    if previo == (stat.st_size, stat.st_mtime, True): return False
+    fuente = fuente_csv(Path(ruta).as_posix())
+    tipos = dict(c.execute(f"select column_name, column_type from (describe select * from {fuente})").fetchall())
+    vcol, ucol = CONFIG["valor"], CONFIG["unidades"]
+    valor_entero = tipos[vcol] in ENTEROS
+    total_entero = valor_entero and tipos[ucol] in ENTEROS
+    c.execute("begin transaction")
+    c.execute("delete from agregado where ruta = ?", [ruta])
+    c.execute(f"""
+        insert into agregado (ruta, categoria, mes, valor_sum, valor_n, total_sum, n, valor_sum_int, total_sum_int)
+        {con_grupo(fuente)}
+        select ? as ruta, categoria, mes,
+               sum({vcol}), count({vcol}), sum(coalesce(total,0)), count(*),
+               {f"sum({vcol})" if valor_entero else "null"}, {"sum(coalesce(total,0))" if total_entero else "null"}
+        from con_grupo
+        group by 2,3
+    """, [ruta])
+    c.execute("insert or replace into archivos values (?, ?, ?, now(), ?, ?)",
+              [ruta, stat.st_size, stat.st_mtime, valor_entero, total_entero])
+    c.execute("commit")
+    return True
+
+def podar(c, archivos):
+    # Borra los archivos (y sus agregados) que ya no estan entre los de entrada
+    rutas = [str(Path(a).resolve()) for a in archivos]
+    borradas = [r for (r,) in c.execute("select ruta from archivos where not list_contains(?, ruta)", [rutas]).fetchall()]
+    if not borradas: return borradas
+    c.execute("begin transaction")
+    c.execute("delete from agregado where list_contains(?, ruta)", [borradas])
+    c.execute("delete from archivos where list_contains(?, ruta)", [borradas])
+    c.execute("commit")
+    return borradas
+
+def consulta_agregado(c):
+    valor_entero, total_entero = c.execute(
+        "select coalesce(bool_and(valor_entero), false), coalesce(bool_and(total_entero), false) from archivos").fetchone()
+    valor = "valor_sum_int" if valor_entero else "valor_sum"
+    total = "total_sum_int" if total_entero else "total_sum"
+    return f"""
+        select categoria, mes,
+               sum({valor}) as valor_sum, sum({valor}) / nullif(sum(valor_n), 0) as valor_avg,
+               sum({total}) as total_sum, sum({total}) / sum(n) as total_avg,
+               sum(n)::bigint as n
+        from agregado
+        group by 1,2
+        order by 1,2
+    """
+
+def escribir_parquet(tabla, outdir, particionar=False):
+    if not particionar: return pq.write_table(tabla, outdir/"duckdb_summary.parquet")
+    # Hive: outdir/duckdb_summary/categoria=A/mes=2024-01/*.parquet
+    pq.write_to_dataset(tabla, outdir/"duckdb_summary", partition_cols=["categoria", "mes"],
+                        existing_data_behavior="delete_matching")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--csv", nargs="+", default=["data/example.csv"], help="archivos, directorios o patrones glob (p. ej. 'data/dia_*.csv')")
+    ap.add_argument("--outdir", default="outputs")
+    ap.add_argument("--db", default=None, help="base .duckdb persistente con agregados incrementales por (categoria, mes)")
+    ap.add_argument("--particionar", action="store_true", help="Parquet particionado (Hive) por categoria y mes")
+    args = ap.parse_args()
+
+    patrones = patrones_csv(args.csv)
+    outdir = Path(args.outdir); outdir.mkdir(parents=True, exist_ok=True)
+
+    if args.db:
+        c = duckdb.connect(args.db)
+        c.execute(ESQUEMA_DB)
+        archivos = sorted({f for p in patrones for (f,) in c.execute("select file from glob(?)", [p]).fetchall()})
+        if not archivos: raise SystemExit(f"sin archivos CSV en {args.csv}")
+        for ruta in podar(c, archivos): print("quitado:", ruta)
+        for archivo in archivos:
+            if ingerir(c, archivo): print("ingerido:", archivo)
+        query = consulta_agregado(c)
+    else:
+        c = duckdb.connect()
+        query = consulta_resumen(patrones)
+    # Una sola ejecucion: CSV y Parquet salen del mismo resultado Arrow
+    tabla = c.execute(query).to_arrow_table()
+    tabla.to_pandas().to_csv(outdir/"duckdb_summary.csv", index=False)
+    try: escribir_parquet(tabla, outdir, args.particionar)
     except Exception as e: print("parquet no disponible:", e)
+    c.close()
 
 if __name__ == "__main__":
     main()
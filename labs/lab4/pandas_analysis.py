@@ -1,20 +1,30 @@
 import argparse
+import glob
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import pandas as pd
 
 CONFIG = {"categoria":"categoria","fecha":"fecha","valor":"valor","unidades":"unidades"}
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--csv", default="data/example.csv")
-    ap.add_argument("--outdir", default="outputs")
-    args = ap.parse_args()
+def archivos_csv(entradas):
+    # Archivos, directorios (todos sus *.csv) o patrones glob; orden alfabetico sin repetidos
+    archivos = set()
+    for entrada in [entradas] if isinstance(entradas, (str, Path)) else entradas:
+        ruta = Path(entrada)
+        if ruta.is_dir(): archivos.update(ruta.glob("*.csv"))
+        elif glob.has_magic(str(entrada)): archivos.update(Path(p) for p in glob.glob(str(entrada), recursive=True))
+        else: archivos.add(ruta)
+    if not archivos: raise SystemExit(f"sin archivos CSV en {entradas}")
+    return sorted(archivos)
 
-    csv_path = Path(args.csv)
-    outdir = Path(args.outdir); outdir.mkdir(parents=True, exist_ok=True)
+def leer(archivos, hilos=None):
+    # Lectura en paralelo; se concatena en el orden de archivos_csv
+    if len(archivos) == 1: return pd.read_csv(archivos[0])
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        return pd.concat(list(pool.map(pd.read_csv, archivos)), ignore_index=True)
 
-    df = pd.read_csv(csv_path)
-    fcol, vcol, ucol, ccol = CONFIG["fecha"], CONFIG["valor"], CONFIG["unidades"], CONFIG["categoria"]
+def preparar(df):
+    fcol, vcol, ucol = CONFIG["fecha"], CONFIG["valor"], CONFIG["unidades"]
     if fcol in df.columns: df[fcol] = pd.to_datetime(df[fcol], errors="coerce")
     if vcol in df.columns and ucol in df.columns: df["total"] = df[vcol] * df[ucol]
     if ucol in df.columns: df[ucol] = df[ucol].fillna(0)
@@ -23,14 +33,95 @@ def main():
     else: filtered = df
     if fcol in filtered.columns: filtered["mes"] = filtered[fcol].dt.to_period("M").astype(str)
     else: filtered["mes"] = "NA"
+    return filtered
+
+def resumir(filtered):
+    vcol, ccol = CONFIG["valor"], CONFIG["categoria"]
     group_cols = [c for c in [ccol, "mes"] if c in filtered.columns]
     metrics = {}
     if vcol in filtered.columns: metrics.update({"valor_sum": (vcol, "sum"), "valor_avg": (vcol, "mean")})
     if "total" in filtered.columns: metrics.update({"total_sum": ("total","sum"), "total_avg": ("total","mean")})
     metrics["n"] = (filtered.columns[0], "count")
-    summary = filtered.groupby(group_cols).agg(**metrics).reset_index()
+    return filtered.groupby(group_cols).agg(**metrics).reset_index()
+
+# Modo por bloques: por (categoria, mes) se guardan suma, compensacion y conteo de cada
+# columna y los promedios salen de suma/conteo al final. Las sumas siguen el mismo
+# algoritmo (Kahan, filas en orden del archivo) que groupby.sum/mean de pandas, por eso
+# el resultado es identico bit a bit al de leer el archivo completo. La memoria depende
+# del bloque y del numero de grupos, no del tamano del archivo.
+
+def _kahan(suma, compensacion, nobs, valores):
+    for v in valores:
+        if v == v:  # NaN no suma, como en pandas
+            y = v - compensacion
+            t = suma + y
+            compensacion = t - suma - y
+            suma = t
+            nobs += 1
+    return [suma, compensacion, nobs]
+
+def _bloques(archivos, chunksize):
+    for archivo in archivos:
+        yield from pd.read_csv(archivo, chunksize=chunksize)
+
+def resumir_por_bloques(archivos, chunksize):
+    # Archivos en secuencia (orden de archivos_csv): la memoria sigue acotada por el bloque
+    if isinstance(archivos, (str, Path)): archivos = [archivos]
+    vcol, ccol = CONFIG["valor"], CONFIG["categoria"]
+    estado, group_cols, columnas, primera, enteras = {}, None, None, None, {}
+    for chunk in _bloques(archivos, chunksize):
+        filtered = preparar(chunk)
+        if group_cols is None:
+            group_cols = [c for c in [ccol, "mes"] if c in filtered.columns]
+            columnas = [c for c in [vcol, "total"] if c in filtered.columns]
+            primera = filtered.columns[0]
+        for c in columnas:
+            enteras[c] = enteras.get(c, True) and pd.api.types.is_integer_dtype(chunk[c])
+        valores = [filtered[c].to_numpy(dtype="float64") for c in columnas]
+        conteo = filtered[primera].notna().to_numpy()
+        # indices: posiciones de cada grupo en orden del archivo (sin claves nulas, como groupby)
+        for clave, pos in filtered.groupby(group_cols, sort=False).indices.items():
+            clave = clave if isinstance(clave, tuple) else (clave,)
+            fila = estado.setdefault(clave, [[0.0, 0.0, 0] for _ in columnas] + [0])
+            for k, serie in enumerate(valores):
+                fila[k] = _kahan(*fila[k], serie[pos].tolist())
+            fila[-1] += int(conteo[pos].sum())
+
+    nombres = {vcol: "valor", "total": "total"}
+    filas = []
+    for clave, fila in estado.items():
+        registro = dict(zip(group_cols, clave))
+        for c, (suma, _, nobs) in zip(columnas, fila):
+            registro[f"{nombres[c]}_sum"] = int(suma) if enteras[c] else suma  # enteras: pandas suma en int64
+            registro[f"{nombres[c]}_avg"] = suma / nobs if nobs else float("nan")
+        registro["n"] = fila[-1]
+        filas.append(registro)
+    metricas = [f"{nombres[c]}_{m}" for c in columnas for m in ("sum", "avg")]
+    summary = pd.DataFrame(filas, columns=group_cols + metricas + ["n"])
+    return summary.sort_values(group_cols, kind="stable").reset_index(drop=True)
+
+def escribir_parquet(summary, outdir, particionar=False):
+    if not particionar: return summary.to_parquet(outdir/"pandas_summary.parquet", index=False)
+    # Hive: outdir/pandas_summary/categoria=A/mes=2024-01/*.parquet
+    cols = [c for c in [CONFIG["categoria"], "mes"] if c in summary.columns]
+    summary.to_parquet(outdir/"pandas_summary", index=False, partition_cols=cols, existing_data_behavior="delete_matching")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--csv", nargs="+", default=["data/example.csv"], help="archivos, directorios o patrones glob (p. ej. 'data/dia_*.csv')")
+    ap.add_argument("--outdir", default="outputs")
+    ap.add_argument("--chunksize", type=int, default=None, help="filas por bloque (modo streaming, memoria acotada)")
+    ap.add_argument("--hilos", type=int, default=None, help="hilos de lectura con varios archivos")
+    ap.add_argument("--particionar", action="store_true", help="Parquet particionado (Hive) por categoria y mes")
+    args = ap.parse_args()
+
+    archivos = archivos_csv(args.csv)
+    outdir = Path(args.outdir); outdir.mkdir(parents=True, exist_ok=True)
+
+    if args.chunksize: summary = resumir_por_bloques(archivos, args.chunksize)
+    else: summary = resumir(preparar(leer(archivos, args.hilos)))
     summary.to_csv(outdir/"pandas_summary.csv", index=False)
-    try: summary.to_parquet(outdir/"pandas_summary.parquet", index=False)
+    try: escribir_parquet(summary, outdir, args.particionar)
     except Exception as e: print("parquet no disponible:", e)
 
 if __name__ == "__main__":
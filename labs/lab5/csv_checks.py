@@ -1,7 +1,12 @@
 from __future__ import annotations
 import csv
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import Iterable, Set
+from typing import Iterable, Iterator, Set
+from schema import FALTA, Schema, Violation, iter_rows as schema_iter_rows
 REQUIRED_COLUMNS=['id','nombre','edad','ingreso']
 
 def load_rows(path:str|Path)->list[dict[str,str]]:
@@ -15,16 +20,293 @@ def check_required_columns(fieldnames:Iterable[str])->bool:
     if missing: raise AssertionError(f'faltan columnas: {sorted(missing)}')
     return True
 
-def validate_rows(rows):
-    ids:Set[int]=set()
+def validate_rows(rows,ids:str|object='set',batch_size:int=65536):
+    # ids: 'set', 'bitmap', 'sorted' o un rastreador (BitmapIdTracker, SortedIdTracker)
+    if ids!='set':
+        return _validate_rows_batched(rows,ID_TRACKERS[ids]() if isinstance(ids,str) else ids,batch_size)
+    vistos:Set[int]=set()
     for i,r in enumerate(rows, start=1):
         try:
             _id=int(r['id']); edad=int(r['edad']); ingreso=float(r['ingreso']); nombre=str(r['nombre'])
         except Exception as e:
             raise AssertionError(f'fila {i}: tipos invalidos -> {e}')
-        if _id in ids: raise AssertionError(f'fila {i}: id repetido {_id}')
-        ids.add(_id)
+        if _id in vistos: raise AssertionError(f'fila {i}: id repetido {_id}')
+        vistos.add(_id)
         if edad<0: raise AssertionError(f'fila {i}: edad negativa')
         if ingreso<0: raise AssertionError(f'fila {i}: ingreso negativo')
         if not nombre: raise AssertionError(f'fila {i}: nombre vacio')
     return True
+
+# Deteccion de ids repetidos con memoria acotada. validate_rows(rows, ids=...) acepta
+# 'set' (por defecto, ~60 bytes por id), 'bitmap', 'sorted' o un rastreador ya creado.
+# Con un rastreador las filas se validan por lotes: los tipos y reglas se revisan fila a
+# fila como siempre y los ids del lote se consultan de una vez; el error que se lanza es
+# exactamente el mismo que con el conjunto (misma fila y mismo mensaje).
+
+_INT64=(-2**63,2**63-1)
+
+def _ordenar(arr):
+    import numpy as np
+    orden=np.argsort(arr,kind='stable'); ordenados=arr[orden]
+    primeros=np.ones(len(arr),dtype=bool); primeros[1:]=ordenados[1:]!=ordenados[:-1]
+    return orden,ordenados,primeros
+
+def _primer_repetido(orden,primeros,vistos):
+    # Indice del primer id que ya estaba (vistos) o que repite uno anterior del lote
+    # (orden estable: en cada grupo de iguales el primero es el de menor indice)
+    import numpy as np
+    candidatos=np.concatenate([orden[~primeros],np.flatnonzero(vistos)])
+    return int(candidatos.min()) if len(candidatos) else None
+
+class _IdTracker:
+    # Base: los ids fuera de int64 (raros) van a un conjunto y el resto en bloque
+    def __init__(self): self.extra:Set[int]=set()
+    def first_duplicate(self,ids:list[int])->int|None:
+        import numpy as np
+        try: return self._bloque(np.array(ids,dtype=np.int64))
+        except OverflowError: pass
+        inicio=0
+        for k in [k for k,x in enumerate(ids) if not _INT64[0]<=x<=_INT64[1]]+[len(ids)]:
+            if k>inicio:
+                d=self._bloque(np.array(ids[inicio:k],dtype=np.int64))
+                if d is not None: return inicio+d
+            if k<len(ids):
+                if ids[k] in self.extra: return k
+                self.extra.add(ids[k])
+            inicio=k+1
+        return None
+
+class BitmapIdTracker(_IdTracker):
+    # Un bit por id desde start. El mapa crece con los ids, pero nunca a mas de
+    # bits_por_id bits por id visto ni a mas de max_bits: un id suelto muy grande no
+    # reserva gigas. Los ids que quedan fuera del mapa van a un conjunto y, si luego
+    # el mapa crece hasta cubrirlos, pasan al mapa (rangos densos con pocas excepciones)
+    def __init__(self,start:int=0,max_bits:int=1<<32,bits_por_id:int=64):
+        import numpy as np
+        super().__init__(); self.start=start; self.max_bits=max_bits; self.bits_por_id=bits_por_id
+        self.bits=np.zeros(1<<16,dtype=np.uint8); self.fuera:Set[int]=set(); self.contados=0
+    def _crecer(self,off,limite):
+        import numpy as np
+        nuevo=np.zeros(max(int(off.max()>>3)+1,min(2*len(self.bits),limite>>3)),dtype=np.uint8)
+        nuevo[:len(self.bits)]=self.bits; self.bits=nuevo
+        cubiertos=[x for x in self.fuera if 0<=x-self.start<8*len(self.bits)]
+        if cubiertos:
+            self.fuera.difference_update(cubiertos)
+            mover=np.array(cubiertos,dtype=np.int64)-self.start
+            np.bitwise_or.at(self.bits,mover>>3,np.left_shift(1,mover&7).astype(np.uint8))
+    def _bloque(self,arr):
+        import numpy as np
+        self.contados+=len(arr)
+        limite=min(self.max_bits,max(8*len(self.bits),self.bits_por_id*self.contados))
+        rango=(arr>=self.start)&(arr-self.start<limite)
+        off=arr[rango]-self.start
+        if len(off) and int(off.max()>>3)>=len(self.bits): self._crecer(off,limite)
+        byte=off>>3; mascara=np.left_shift(1,off&7).astype(np.uint8)
+        vistos=np.zeros(len(arr),dtype=bool)
+        vistos[rango]=(self.bits[byte]&mascara)!=0
+        for k in np.flatnonzero(~rango): vistos[k]=int(arr[k]) in self.fuera
+        orden,_,primeros=_ordenar(arr)
+        d=_primer_repetido(orden,primeros,vistos)
+        np.bitwise_or.at(self.bits,byte,mascara)
+        self.fuera.update(arr[~rango].tolist())
+        return d
+
+def _mezclar(a,b,destino:Path,bloque:int=1<<20):
+    # Mezcla dos arreglos ordenados y disjuntos (memory map) en un .npy, por bloques:
+    # en memoria solo hay dos trozos de a lo sumo `bloque` ids
+    import numpy as np
+    salida=np.lib.format.open_memmap(destino,mode='w+',dtype=np.int64,shape=(len(a)+len(b),))
+    i=j=k=0
+    while i<len(a) and j<len(b):
+        ta=np.asarray(a[i:i+bloque]); tb=np.asarray(b[j:j+bloque])
+        limite=min(ta[-1],tb[-1])
+        ta=ta[:np.searchsorted(ta,limite,side='right')]; tb=tb[:np.searchsorted(tb,limite,side='right')]
+        salida[k:k+len(ta)+len(tb)]=np.insert(tb,np.searchsorted(tb,ta),ta)
+        i+=len(ta); j+=len(tb); k+=len(ta)+len(tb)
+    for resto,desde in ((a,i),(b,j)):
+        for x in range(desde,len(resto),bloque):
+            trozo=resto[x:x+bloque]; salida[k:k+len(trozo)]=trozo; k+=len(trozo)
+    salida.flush()
+    return np.load(destino,mmap_mode='r')
+
+class SortedIdTracker(_IdTracker):
+    # Ids como arreglo ordenado de int64 (8 bytes por id); cada lote se intercala con
+    # una mezcla lineal. Al pasar de memory_ids se vuelca a disco como corrida ordenada
+    # (memory map) y las consultas buscan en cada corrida con searchsorted; con mas de
+    # max_runs corridas se mezclan de a pares (las dos mas chicas) por bloques.
+    # bloom_bits>0 agrega un filtro de Bloom delante: solo los ids que el filtro marca
+    # como posibles se buscan en memoria y en disco
+    def __init__(self,memory_ids:int=8_000_000,spill_dir:str|Path|None=None,bloom_bits:int=0,max_runs:int=8):
+        import numpy as np
+        super().__init__(); self.memory_ids=memory_ids; self.spill_dir=spill_dir; self.max_runs=max_runs
+        self.memoria=np.zeros(0,dtype=np.int64); self.corridas:list=[]; self._tmp=None; self._volcadas=0
+        self.bloom=None
+        if bloom_bits:
+            self.log_bits=max((bloom_bits-1).bit_length(),3)
+            self.bloom=np.zeros(1<<(self.log_bits-3),dtype=np.uint8)
+    def _posiciones_bloom(self,arr):
+        import numpy as np
+        # 4 hashes multiplicativos de 64 bits (se usan los log_bits bits altos)
+        x=arr.view(np.uint64)
+        return [(x*np.uint64(a))>>np.uint64(64-self.log_bits) for a in
+                (0x9E3779B97F4A7C15,0xC2B2AE3D27D4EB4F,0x165667B19E3779F9,0xD6E8FEB86659FD93)]
+    def _contiene(self,arr):
+        # arr ordenado: searchsorted aprovecha claves crecientes (accesos casi secuenciales)
+        import numpy as np
+        vistos=np.zeros(len(arr),dtype=bool)
+        for ordenado in [self.memoria,*self.corridas]:
+            if len(ordenado)==0: continue
+            pos=np.searchsorted(ordenado,arr).clip(max=len(ordenado)-1)
+            vistos|=ordenado[pos]==arr
+        return vistos
+    def _bloque(self,arr):
+        import numpy as np
+        orden,ordenados,primeros=_ordenar(arr)
+        unicos=ordenados[primeros]
+        if self.bloom is None: vistos_unicos=self._contiene(unicos)
+        else:
+            posiciones=[(p>>np.uint64(3),np.left_shift(1,p&np.uint64(7)).astype(np.uint8)) for p in self._posiciones_bloom(unicos)]
+            posible=np.ones(len(unicos),dtype=bool)
+            for byte,mascara in posiciones: posible&=(self.bloom[byte]&mascara)!=0
+            vistos_unicos=np.zeros(len(unicos),dtype=bool)
+            if posible.any(): vistos_unicos[posible]=self._contiene(unicos[posible])
+            for byte,mascara in posiciones: np.bitwise_or.at(self.bloom,byte,mascara)
+        vistos=np.zeros(len(arr),dtype=bool)
+        vistos[orden]=vistos_unicos[np.cumsum(primeros)-1]
+        d=_primer_repetido(orden,primeros,vistos)
+        nuevos=unicos[~vistos_unicos]
+        self.memoria=np.insert(self.memoria,np.searchsorted(self.memoria,nuevos),nuevos)
+        if len(self.memoria)>self.memory_ids: self._volcar()
+        return d
+    def _ruta_corrida(self)->Path:
+        import tempfile
+        if self._tmp is None: self._tmp=tempfile.TemporaryDirectory(prefix='ids-',dir=self.spill_dir)
+        self._volcadas+=1
+        return Path(self._tmp.name)/f'corrida-{self._volcadas}.npy'
+    def _volcar(self):
+        import numpy as np
+        ruta=self._ruta_corrida()
+        np.save(ruta,self.memoria)
+        self.corridas.append(np.load(ruta,mmap_mode='r'))
+        self.memoria=np.zeros(0,dtype=np.int64)
+        while len(self.corridas)>self.max_runs: self._compactar()
+    def _compactar(self):
+        a,b=sorted(self.corridas,key=len)[:2]
+        self.corridas=[c for c in self.corridas if c is not a and c is not b]
+        self.corridas.append(_mezclar(a,b,self._ruta_corrida()))
+        for c in (a,b): os.remove(c.filename)
+
+ID_TRACKERS={'bitmap':BitmapIdTracker,'sorted':SortedIdTracker}
+
+def _validate_rows_batched(rows,tracker,batch_size):
+    filas=enumerate(rows, start=1)
+    while True:
+        lote_ids:list[int]=[]; lote_filas:list[int]=[]; error=None; leidas=0
+        for i,r in islice(filas,batch_size):
+            leidas+=1
+            try:
+                _id=int(r['id']); edad=int(r['edad']); ingreso=float(r['ingreso']); nombre=str(r['nombre'])
+            except Exception as e:
+                error=f'fila {i}: tipos invalidos -> {e}'; break
+            # el id de una fila con otro error tambien se consulta: el repetido va antes
+            lote_ids.append(_id); lote_filas.append(i)
+            if edad<0: error=f'fila {i}: edad negativa'; break
+            if ingreso<0: error=f'fila {i}: ingreso negativo'; break
+            if not nombre: error=f'fila {i}: nombre vacio'; break
+        d=tracker.first_duplicate(lote_ids) if lote_ids else None
+        if d is not None: raise AssertionError(f'fila {lote_filas[d]}: id repetido {lote_ids[d]}')
+        if error: raise AssertionError(error)
+        if leidas<batch_size: return True
+
+# Validacion en streaming: se recorren las filas una a una y se reportan todas las
+# violaciones (fila, columna, regla) hasta un limite, en orden de fila y, dentro de la
+# fila, en el orden de REQUIRED_COLUMNS. Solo el conjunto de ids crece con el archivo.
+# Las reglas son las de schemas/people.toml y las aplica el motor de schema.py: fila a
+# fila con Schema.iter_violations o, con columnar=True (requiere pyarrow), por bloques
+# Arrow con el esquema compilado. Unica diferencia entre ambos: enteros fuera de int64
+# se reportan como tipo en el camino columnar.
+
+PEOPLE=Schema.load(Path(__file__).parent/'schemas'/'people.toml')
+
+def iter_rows(path:str|Path)->Iterator[dict[str,str]]:
+    return schema_iter_rows(path,PEOPLE)
+
+def iter_violations(rows:Iterable[dict[str,str]],resumen:dict|None=None)->Iterator[Violation]:
+    # rows como los de iter_rows (campos faltantes = FALTA); resumen para el paralelo
+    return PEOPLE.iter_violations(rows,resumen)
+
+def iter_violations_columnar(path:str|Path,block_size:int=1<<24)->Iterator[Violation]:
+    return PEOPLE.compile().iter_file(path,block_size)
+
+# Validacion en paralelo: el cuerpo del archivo se corta en rangos de bytes alineados a
+# inicio de linea y cada proceso valida un rango con numeracion local. Al unir, en orden
+# de rango, las filas se desplazan por las filas de los rangos anteriores y, en cada
+# columna unica, los valores de cada rango (su primera aparicion) se cruzan con los ya
+# vistos para reportar repetidos entre rangos. Supone que ningun campo entre comillas
+# contiene saltos de linea.
+
+BYTES_POR_RANGO=64<<20
+
+def byte_ranges(path:str|Path,parts:int)->list[tuple[int,int]]:
+    tamano=os.path.getsize(path)
+    with open(path,'rb') as f:
+        f.readline(); cortes=[f.tell()]
+        for k in range(1,parts):
+            objetivo=cortes[0]+(tamano-cortes[0])*k//parts
+            if objetivo<=cortes[-1]: continue
+            f.seek(objetivo-1); f.readline()  # termina la linea que contiene objetivo-1
+            if cortes[-1]<f.tell()<tamano: cortes.append(f.tell())
+    return [(a,b) for a,b in zip(cortes,cortes[1:]+[tamano]) if a<b]
+
+def _validar_rango(path,inicio,fin,encabezado,columnar,limit,block_size):
+    with open(path,'rb') as f:
+        f.seek(inicio); datos=f.read(fin-inicio)
+    resumen:dict={}
+    if columnar:
+        import pyarrow as pa
+        violaciones=PEOPLE.compile().iter_file(pa.BufferReader(encabezado+datos),block_size,resumen)
+    else:
+        nombres=next(csv.reader([encabezado.decode('utf-8')]))
+        filas=csv.DictReader(io.StringIO(datos.decode('utf-8'),newline=''),fieldnames=nombres,restval=FALTA)
+        violaciones=iter_violations(filas,resumen)
+    # El rango se recorre entero aunque se llegue a limit: hacen falta todos sus valores unicos
+    locales=list(islice(violaciones,limit))
+    for _ in violaciones: pass
+    return resumen['filas'],locales,resumen['unicos']
+
+def iter_violations_parallel(path:str|Path,processes:int|None=None,columnar:bool=False,
+                             limit:int|None=None,block_size:int=1<<24)->Iterator[Violation]:
+    with Path(path).open('rb') as f: encabezado=f.readline()
+    check_required_columns(next(csv.reader([encabezado.decode('utf-8')]),[]))
+    processes=processes or os.cpu_count() or 1
+    rangos=byte_ranges(path,max(processes,-(-os.path.getsize(path)//BYTES_POR_RANGO)))
+    vistos:dict[str,Set]={c.name:set() for c in PEOPLE.columns if c.unique}; desplazamiento=0
+    with ProcessPoolExecutor(processes) as pool:
+        futuros=[pool.submit(_validar_rango,str(path),a,b,encabezado,columnar,limit,block_size) for a,b in rangos]
+        try:
+            for futuro in futuros:
+                filas,locales,unicos=futuro.result()
+                nuevas=[v._replace(row=desplazamiento+v.row) for v in locales]
+                for columna,(valores,filas_valores) in unicos.items():
+                    cruzados=vistos[columna].intersection(valores)
+                    if cruzados:
+                        nuevas+=[Violation(desplazamiento+f,columna,'unico',f'{columna} repetido {x}')
+                                 for x,f in zip(valores,filas_valores) if x in cruzados]
+                    vistos[columna].update(valores)
+                nuevas.sort(key=PEOPLE.order)
+                yield from nuevas
+                desplazamiento+=filas
+        finally:
+            for futuro in futuros: futuro.cancel()
+
+def collect_violations(path:str|Path,limit:int|None=1000,columnar:bool=False,processes:int=1)->list[Violation]:
+    # Corta al llegar a limit: el resto del archivo no se lee. processes=0 usa todos los nucleos
+    if processes!=1: violaciones=iter_violations_parallel(path,processes,columnar,limit)
+    elif columnar: violaciones=iter_violations_columnar(path)
+    else: violaciones=iter_violations(iter_rows(path))
+    return list(islice(violaciones,limit))
+
+def validate_file(path:str|Path,limit:int|None=1000,columnar:bool=False,processes:int=1)->bool:
+    violaciones=collect_violations(path,limit,columnar,processes)
+    if violaciones: raise AssertionError(f'{len(violaciones)} violaciones:\n'+'\n'.join(map(str,violaciones)))
+    return True
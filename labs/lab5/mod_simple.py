@@ -1,3 +1,4 @@
+from functools import lru_cache
 from typing import Union
 Number = Union[int,float]
 
@@ -10,3 +11,81 @@ def word_count(s:str)->int:
 def dividir(a:Number,b:Number)->float:
     if b==0: raise ValueError('division por cero')
     return float(a)/float(b)
+
+# Variantes por lote (requieren pyarrow): aceptan listas, arreglos NumPy, Series de
+# pandas o arreglos Arrow y devuelven el mismo tipo de contenedor. El texto se procesa
+# con kernels de Arrow sobre todo el arreglo; los nulos quedan nulos. Los pocos textos
+# con caracteres donde Arrow y Python difieren (minusculas especiales como 'İ' o la
+# sigma final, espacios) se recalculan con la funcion escalar, asi el resultado es
+# identico al de aplicar normalize_text/word_count elemento a elemento.
+
+@lru_cache(maxsize=None)
+def _patron_distintos()->str:
+    # Se calcula una vez comparando Arrow y Python sobre todos los code points
+    import sys, numpy as np, pyarrow as pa, pyarrow.compute as pc
+    chars=[chr(i) for i in range(sys.maxunicode+1) if not 0xD800<=i<=0xDFFF]
+    arr=pa.array(chars)
+    distinto=pc.or_(pc.not_equal(pc.utf8_lower(arr),pa.array([c.lower() for c in chars])),
+                    pc.not_equal(pc.equal(pc.utf8_trim_whitespace(arr),''),pa.array([c.isspace() for c in chars])))
+    raros=[chars[k] for k in np.flatnonzero(distinto.to_numpy(zero_copy_only=False))]+['Σ']
+    assert all(ord(c)>127 for c in raros)  # _corregir descarta el texto ASCII sin regex
+    return '['+''.join(f'\\x{{{ord(c):x}}}' for c in raros)+']'
+
+def _un_bloque(arr):
+    # pa.array devuelve ChunkedArray cuando el texto pasa de 2 GB de offsets (o arreglos
+    # NumPy <U grandes); replace_with_mask en _corregir solo acepta arreglos simples
+    import pyarrow as pa
+    return arr.combine_chunks() if isinstance(arr,pa.ChunkedArray) else arr
+
+def _como_arrow(valores):
+    # (arreglo Arrow de texto, funcion que devuelve un resultado Arrow al tipo de entrada)
+    import pyarrow as pa
+    if isinstance(valores,pa.ChunkedArray): return valores.combine_chunks(),lambda r:r
+    if isinstance(valores,pa.Array): return valores,lambda r:r
+    if type(valores).__module__.split('.')[0]=='pandas':
+        import pandas as pd
+        # enteros con nulos como Int64; texto en el mismo dtype de la entrada si es de pandas
+        # (con almacenamiento Arrow se convierte sin copiar)
+        texto=valores.dtype if isinstance(valores.dtype,pd.StringDtype) else None
+        tipos={pa.int64():pd.Int64Dtype(),pa.string():texto,pa.large_string():texto}.get
+        return _un_bloque(pa.array(valores,from_pandas=True)),lambda r:r.to_pandas(types_mapper=tipos).set_axis(valores.index).rename(valores.name)
+    if type(valores).__module__=='numpy': return _un_bloque(pa.array(valores,from_pandas=True)),lambda r:r.to_numpy(zero_copy_only=False)
+    return _un_bloque(pa.array(list(valores))),lambda r:r.to_pylist()
+
+def _corregir(arr,resultado,escalar):
+    import numpy as np, pyarrow as pa, pyarrow.compute as pc
+    # Todos los caracteres conflictivos estan fuera de ASCII: el regex solo mira el resto
+    no_ascii=pc.invert(pc.string_is_ascii(arr)).fill_null(False)
+    if not pc.any(no_ascii).as_py(): return resultado
+    raros=pc.and_(no_ascii,pc.match_substring_regex(arr,_patron_distintos()).fill_null(False))
+    if not pc.any(raros).as_py(): return resultado
+    valores=[escalar(s) for s in arr.filter(raros).to_pylist()]
+    return pc.replace_with_mask(resultado,raros,pa.array(valores,resultado.type))
+
+def normalize_text_batch(valores):
+    import pyarrow.compute as pc
+    arr,volver=_como_arrow(valores)
+    return volver(_corregir(arr,pc.utf8_lower(pc.utf8_trim_whitespace(arr)),normalize_text))
+
+def word_count_batch(valores):
+    # Solo espacios -> 0, como word_count; los espacios internos seguidos cuentan como uno
+    import pyarrow as pa, pyarrow.compute as pc
+    arr,volver=_como_arrow(valores)
+    recortado=pc.utf8_trim_whitespace(arr)
+    palabras=pc.list_value_length(pc.utf8_split_whitespace(recortado)).cast(pa.int64())
+    conteo=pc.if_else(pc.equal(recortado,''),pa.scalar(0,pa.int64()),palabras)
+    return volver(_corregir(arr,conteo,word_count))
+
+def dividir_batch(a,b,on_zero:str='raise'):
+    # a/b elemento a elemento en float64 (como float(a)/float(b)). Divisores cero:
+    # 'raise' ValueError como dividir, 'nan' NaN en esas posiciones, 'mask' np.ma enmascarado
+    import numpy as np
+    if on_zero not in ('raise','nan','mask'): raise ValueError(f'politica desconocida: {on_zero}')
+    a=np.asarray(a,dtype=np.float64); b=np.asarray(b,dtype=np.float64)
+    cero=b==0
+    if on_zero=='raise' and cero.any(): raise ValueError('division por cero')
+    with np.errstate(divide='ignore',invalid='ignore'): r=a/b
+    cero=np.broadcast_to(cero,r.shape)
+    if on_zero=='nan': return np.where(cero,np.nan,r)
+    if on_zero=='mask': return np.ma.masked_array(r,mask=cero)
+    return r
@@ -0,0 +1,301 @@
+from __future__ import annotations
+import csv
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Set
+
+# Esquema declarativo de columnas (tipo, nulos, unicidad, rango) que se carga desde
+# TOML/YAML/JSON o se arma en Python, y se compila a chequeos por columna sobre lotes
+# Arrow/NumPy. Schema.iter_violations es el interprete fila a fila de referencia:
+# CompiledSchema debe producir exactamente las mismas violaciones.
+#
+# Reglas por columna, en este orden dentro de cada fila:
+#   tipo      el valor no se convierte a int/float (int()/float() de Python)
+#   no_vacio  valor vacio o nulo en una columna no nullable de tipo str (en int/float
+#             un vacio no nullable es error de tipo)
+#   unico     el valor ya aparecio en una fila anterior (NaN nunca se repite)
+#   minimo / maximo
+# Un vacio en columna nullable no se revisa. Una fila con otra cantidad de campos que el
+# encabezado se reporta una vez como 'campos'. csv_checks valida con este motor
+# (schemas/people.toml), asi que las reglas y mensajes son los mismos en todo el lab.
+
+TIPOS={'int':int,'float':float,'str':str}
+FALTA='<falta>'  # restval de iter_rows: campo ausente en una fila corta (None es nulo)
+REGLAS=['tipo','no_vacio','unico','minimo','maximo']
+CAMPOS='numero de campos distinto al encabezado'
+
+class Violation(NamedTuple):
+    row:int
+    column:str
+    rule:str
+    detail:str
+    def __str__(self)->str:
+        return f'fila {self.row}: {self.column} [{self.rule}] {self.detail}'
+
+@dataclass(frozen=True)
+class Column:
+    name:str
+    type:str='str'
+    nullable:bool=False
+    unique:bool=False
+    min:float|None=None
+    max:float|None=None
+    def __post_init__(self):
+        if self.type not in TIPOS: raise ValueError(f'{self.name}: tipo desconocido {self.type!r}')
+        if self.type=='str' and (self.min is not None or self.max is not None):
+            raise ValueError(f'{self.name}: min/max solo para int y float')
+
+@dataclass(frozen=True)
+class Schema:
+    columns:tuple[Column,...]
+
+    @classmethod
+    def from_dict(cls,datos:dict)->Schema:
+        # {'columns': [{'name': 'id', 'type': 'int', 'unique': True}, ...]}
+        return cls(tuple(Column(**c) for c in datos['columns']))
+
+    @classmethod
+    def load(cls,path:str|Path)->Schema:
+        p=Path(path)
+        if p.suffix=='.toml':
+            try: import tomllib
+            except ModuleNotFoundError: import tomli as tomllib  # Python < 3.11: pip install tomli
+            datos=tomllib.loads(p.read_text(encoding='utf-8'))
+        elif p.suffix in ('.yaml','.yml'):
+            import yaml  # opcional: pip install pyyaml
+            datos=yaml.safe_load(p.read_text(encoding='utf-8'))
+        elif p.suffix=='.json': datos=json.loads(p.read_text(encoding='utf-8'))
+        else: raise ValueError(f'formato de esquema no soportado: {p.suffix}')
+        return cls.from_dict(datos)
+
+    @property
+    def names(self)->list[str]:
+        return [c.name for c in self.columns]
+
+    def check_header(self,fieldnames:Iterable[str])->bool:
+        missing=set(self.names)-set(fieldnames or [])
+        if missing: raise AssertionError(f'faltan columnas: {sorted(missing)}')
+        return True
+
+    def order(self,v:Violation)->tuple:
+        # Clave de orden de las violaciones: fila, columna del esquema y regla
+        if v.column=='*': return (v.row,-1,0)
+        return (v.row,self.names.index(v.column),REGLAS.index(v.rule))
+
+    def iter_violations(self,rows:Iterable[dict],resumen:dict|None=None)->Iterator[Violation]:
+        # Referencia: filas como dicts (iter_rows o to_pylist de Arrow). resumen (para la
+        # validacion en paralelo) recibe 'filas' y, por columna unica, la primera aparicion
+        # de cada valor en 'unicos': {columna: (valores, filas)}
+        vistos:dict[str,Set]={c.name:set() for c in self.columns if c.unique}
+        unicos=_nuevo_resumen(self,resumen)
+        # por columna: conversion directa del texto del CSV (el caso comun) y su conjunto
+        plan=[(c.name,c.type,{'int':int,'float':_real,'str':str}[c.type],c.nullable,vistos.get(c.name),c.min,c.max)
+              for c in self.columns]
+        nombres=set(self.names)
+        i=0
+        for i,r in enumerate(rows, start=1):
+            if None in r or FALTA in r.values() or not r.keys()>=nombres:
+                yield Violation(i,'*','campos',CAMPOS); continue
+            for nombre,tipo,conv,nullable,vistos_c,minimo,maximo in plan:
+                v=r[nombre]
+                if v is None or v=='':
+                    if nullable: continue
+                    if tipo=='str': yield Violation(i,nombre,'no_vacio',f'{nombre} vacio'); continue
+                    v=''
+                try: x=conv(v) if type(v) is str else _valor(v,tipo)
+                except ValueError as e: yield Violation(i,nombre,'tipo',str(e)); continue
+                if vistos_c is not None and x==x:  # NaN nunca se repite
+                    if x in vistos_c: yield Violation(i,nombre,'unico',f'{nombre} repetido {x}')
+                    else:
+                        vistos_c.add(x)
+                        if unicos is not None: unicos[nombre][0].append(x); unicos[nombre][1].append(i)
+                if minimo is not None and x<minimo: yield Violation(i,nombre,'minimo',f'{nombre} < {minimo}')
+                if maximo is not None and x>maximo: yield Violation(i,nombre,'maximo',f'{nombre} > {maximo}')
+        if resumen is not None: resumen['filas']=i
+
+    def compile(self)->CompiledSchema:
+        return CompiledSchema(self)
+
+def _nuevo_resumen(schema,resumen):
+    if resumen is None: return None
+    resumen['unicos']={c.name:([],[]) for c in schema.columns if c.unique}
+    return resumen['unicos']
+
+def _real(v):
+    return float(v)+0.0  # -0.0 cuenta como 0.0
+
+def _valor(v,tipo):
+    if tipo=='str': return str(v)
+    if isinstance(v,str): return int(v) if tipo=='int' else _real(v)
+    if tipo=='int':
+        if isinstance(v,float) and not v.is_integer(): raise ValueError(f'no entero: {v}')
+        return int(v)
+    return float(v)+0.0
+
+# Texto del CSV a numeros en bloque: los valores con formato simple (digitos, signo -,
+# punto y exponente) se convierten con Arrow; el resto, que es raro, pasa por
+# int()/float() de Python para conservar su semantica (espacios, '+', '_').
+
+_ENTERO=r'^-?[0-9]{1,18}$'
+_REAL=r'^-?[0-9]+(\.[0-9]*)?([eE][-+]?[0-9]+)?$'
+
+def _convertir(col,conv,patron,tipo,filas):
+    import numpy as np, pyarrow as pa, pyarrow.compute as pc
+    simple=pc.match_substring_regex(col,patron).to_numpy(zero_copy_only=False)
+    valores=np.zeros(len(col),dtype=tipo.to_pandas_dtype())
+    valores[simple]=pc.cast(pc.filter(col,pa.array(simple)),tipo).to_numpy()
+    ok=simple.copy(); errores={}
+    for k in np.flatnonzero(~simple):
+        try: valores[k]=conv(col[k].as_py()); ok[k]=True
+        except ValueError as e: errores[int(filas[k])]=str(e)
+        except OverflowError: errores[int(filas[k])]='fuera del rango int64'
+    return valores,ok,errores
+
+def iter_csv_batches(source,names:list[str],block_size:int=1<<24)->Iterator[tuple]:
+    # CSV por bloques con Arrow (ruta o flujo Arrow, p. ej. pa.BufferReader), las columnas
+    # names como texto. Produce (batch, filas, campos): el numero global de fila de cada
+    # fila del lote y las filas con otra cantidad de campos anteriores a la ultima del
+    # lote; al final, con batch None, las que quedan. Las filas con otra cantidad de
+    # campos se saltan y la numeracion las cuenta (row.number incluye el encabezado)
+    import numpy as np, pyarrow as pa, pyarrow.csv as pacsv
+    invalidas:list[int]=[]
+    def saltar(fila): invalidas.append(fila.number-1); return 'skip'
+    reader=pacsv.open_csv(str(source) if isinstance(source,Path) else source,
+        read_options=pacsv.ReadOptions(block_size=block_size,use_threads=False),
+        parse_options=pacsv.ParseOptions(newlines_in_values=True,invalid_row_handler=saltar),
+        convert_options=pacsv.ConvertOptions(column_types={n:pa.string() for n in names},
+            include_columns=names,strings_can_be_null=False,quoted_strings_can_be_null=False))
+    validas=0; ultima=0
+    for batch in reader:
+        n=batch.num_rows
+        if n==0: continue
+        # fila global de cada fila valida: su posicion mas las invalidas anteriores
+        inv=np.sort(np.array(invalidas,dtype=np.int64))
+        filas=np.arange(validas+1,validas+n+1)
+        filas=filas+np.searchsorted(inv-np.arange(len(inv))-1,filas,side='left')
+        validas+=n
+        campos=inv[(inv>ultima)&(inv<=filas[-1])].tolist()
+        ultima=int(filas[-1])
+        yield batch,filas,campos
+    yield None,np.zeros(0,dtype=np.int64),sorted(i for i in invalidas if i>ultima)
+
+class CompiledSchema:
+    # Cada columna se compila a una funcion que recibe el arreglo Arrow del lote (texto
+    # del CSV o ya tipado, p. ej. de Parquet) y las filas globales, y devuelve sus
+    # violaciones. Solo las filas con violaciones pasan por Python. La unicidad se lleva
+    # entre lotes con un conjunto por columna. Unica diferencia con la referencia:
+    # enteros de texto fuera de int64 se reportan como tipo.
+    def __init__(self,schema:Schema):
+        self.schema=schema
+        self._chequeos=[self._compilar(k,c) for k,c in enumerate(schema.columns)]
+        self.reset()
+
+    def reset(self,resumen:dict|None=None)->None:
+        self.vistos:dict[str,Set]={c.name:set() for c in self.schema.columns if c.unique}
+        self._unicos_nuevos=_nuevo_resumen(self.schema,resumen)
+
+    def _compilar(self,k,c):
+        import numpy as np, pyarrow as pa, pyarrow.compute as pc
+        tipo={'int':pa.int64(),'float':pa.float64()}.get(c.type)
+        patron={'int':_ENTERO,'float':_REAL}.get(c.type)
+        conv=TIPOS[c.type]
+        orden={r:k*len(REGLAS)+j for j,r in enumerate(REGLAS)}
+        def chequear(arr,filas,salida):
+            if isinstance(arr,pa.ChunkedArray): arr=arr.combine_chunks()
+            texto=pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type)
+            vacio=arr.is_null().to_numpy(zero_copy_only=False)
+            if texto: vacio|=pc.equal(arr,'').fill_null(True).to_numpy(zero_copy_only=False)
+            if vacio.any() and not c.nullable:
+                for f in filas[vacio]:
+                    if c.type=='str': salida.append((f,orden['no_vacio'],Violation(int(f),c.name,'no_vacio',f'{c.name} vacio')))
+                    else:
+                        try: conv('')
+                        except ValueError as e: salida.append((f,orden['tipo'],Violation(int(f),c.name,'tipo',str(e))))
+            presentes=np.flatnonzero(~vacio)
+            if not len(presentes): return
+            sub=arr.take(pa.array(presentes)); f_sub=filas[presentes]
+            if c.type=='str': valores=sub.cast(pa.string()); ok=np.ones(len(sub),dtype=bool)
+            elif texto:
+                valores,ok,errores=_convertir(sub,conv,patron,tipo,f_sub)
+                for f,m in errores.items(): salida.append((f,orden['tipo'],Violation(f,c.name,'tipo',m)))
+            else:
+                valores=sub.to_numpy(zero_copy_only=False).astype(np.float64 if c.type=='float' or pa.types.is_floating(sub.type) else np.int64)
+                ok=np.ones(len(sub),dtype=bool)
+                if c.type=='int' and pa.types.is_floating(sub.type):
+                    ok=np.isfinite(valores)&(valores==np.floor(valores))
+                    for j in np.flatnonzero(~ok): salida.append((f_sub[j],orden['tipo'],Violation(int(f_sub[j]),c.name,'tipo',f'no entero: {valores[j]}')))
+                    valores=np.where(ok,valores,0).astype(np.int64)
+            if c.type=='float': valores=valores+0.0  # -0.0 y 0.0 son el mismo valor para unico
+            if c.unique: self._unicos(c,valores,ok,f_sub,orden['unico'],salida)
+            if c.min is not None:
+                for j in np.flatnonzero(ok&(valores<c.min)):
+                    salida.append((f_sub[j],orden['minimo'],Violation(int(f_sub[j]),c.name,'minimo',f'{c.name} < {c.min}')))
+            if c.max is not None:
+                for j in np.flatnonzero(ok&(valores>c.max)):
+                    salida.append((f_sub[j],orden['maximo'],Violation(int(f_sub[j]),c.name,'maximo',f'{c.name} > {c.max}')))
+        return chequear
+
+    def _unicos(self,c,valores,ok,filas,orden,salida):
+        # Repetidos en orden de fila: dentro del lote (codigo de diccionario ya visto) o
+        # presentes en lotes anteriores
+        import numpy as np, pyarrow as pa, pyarrow.compute as pc
+        pos=np.flatnonzero(ok)
+        if not len(pos): return
+        arr=pa.array(valores[pos]) if isinstance(valores,np.ndarray) else valores.take(pa.array(pos))
+        if c.type=='float':
+            nan=np.isnan(valores[pos]); pos=pos[~nan]; arr=arr.filter(pa.array(~nan))
+        codificado=pc.dictionary_encode(arr)
+        codigos=codificado.indices.to_numpy(zero_copy_only=False); dic=codificado.dictionary.to_pylist()
+        _,primera=np.unique(codigos,return_index=True)
+        repetido=np.ones(len(pos),dtype=bool); repetido[primera]=False
+        vistos=self.vistos[c.name]; previos=vistos.intersection(dic)
+        if previos: repetido|=np.isin(codigos,[j for j,v in enumerate(dic) if v in previos])
+        vistos.update(dic)
+        if self._unicos_nuevos is not None:
+            # los codigos se asignan en orden de primera aparicion: primera ya va por fila
+            nuevos=[j for j,v in enumerate(dic) if v not in previos]
+            valores_nuevos,filas_nuevas=self._unicos_nuevos[c.name]
+            valores_nuevos.extend(dic[j] for j in nuevos)
+            filas_nuevas.extend(filas[pos[primera[nuevos]]].tolist())
+        for j in np.flatnonzero(repetido):
+            x=dic[codigos[j]]
+            salida.append((filas[pos[j]],orden,Violation(int(filas[pos[j]]),c.name,'unico',f'{c.name} repetido {x}')))
+
+    def check_batch(self,batch,first_row:int=1,rows=None)->list[Violation]:
+        # batch: RecordBatch/Table de Arrow o dict nombre -> arreglo (NumPy, lista o Arrow).
+        # rows: numero global de cada fila (por defecto first_row, first_row+1, ...)
+        import numpy as np, pyarrow as pa
+        if isinstance(batch,dict):
+            columnas={n:v if isinstance(v,(pa.Array,pa.ChunkedArray)) else pa.array(v) for n,v in batch.items()}
+        else: columnas={n:batch.column(n) for n in batch.schema.names}
+        self.schema.check_header(columnas)
+        n=len(next(iter(columnas.values()))) if columnas else 0
+        filas=np.arange(first_row,first_row+n) if rows is None else np.asarray(rows)
+        salida:list=[]
+        for c,chequear in zip(self.schema.columns,self._chequeos): chequear(columnas[c.name],filas,salida)
+        salida.sort(key=lambda t:(t[0],t[1]))
+        return [v for *_,v in salida]
+
+    def iter_file(self,source,block_size:int=1<<24,resumen:dict|None=None)->Iterator[Violation]:
+        # CSV por bloques con iter_csv_batches. source: ruta (se revisa el encabezado) o
+        # flujo Arrow; resumen como en Schema.iter_violations
+        if isinstance(source,(str,Path)):
+            with Path(source).open(newline='',encoding='utf-8') as f:
+                self.schema.check_header(next(csv.reader(f),[]))
+        self.reset(resumen)
+        filas_totales=0
+        for batch,filas,campos in iter_csv_batches(source,self.schema.names,block_size):
+            filas_totales+=len(filas)+len(campos)
+            violaciones=[Violation(i,'*','campos',CAMPOS) for i in campos]
+            if batch is not None:
+                lote=self.check_batch(batch,rows=filas)
+                violaciones=sorted(violaciones+lote,key=lambda v:v.row) if violaciones else lote
+            yield from violaciones
+        if resumen is not None: resumen['filas']=filas_totales
+
+def iter_rows(path:str|Path,schema:Schema)->Iterator[dict[str,str]]:
+    with Path(path).open(newline='',encoding='utf-8') as f:
+        reader=csv.DictReader(f,restval=FALTA)
+        schema.check_header(reader.fieldnames)
+        yield from reader
@@ -1,6 +1,8 @@
 import csv
 from pathlib import Path
-from csv_checks import REQUIRED_COLUMNS, load_rows, check_required_columns, validate_rows
+import pytest
+from csv_checks import (REQUIRED_COLUMNS, load_rows, check_required_columns, validate_rows,
+                        byte_ranges, collect_violations, iter_violations_columnar, validate_file)
 DATA=Path('data/people.csv')
 
 def test_csv_header_columns():
@@ -11,3 +13,89 @@ def test_csv_header_columns():
 def test_csv_rows_valid():
     rows=load_rows(DATA)
     assert validate_rows(rows)
+
+def _csv(tmp_path, lineas):
+    p=tmp_path/'people.csv'
+    p.write_text('id,nombre,edad,ingreso\n'+'\n'.join(lineas)+'\n', encoding='utf-8')
+    return p
+
+def test_collect_violations_reporta_todas(tmp_path):
+    p=_csv(tmp_path, ['1,a,3,10.5', '2,,x,-1', '1,b,-4,2', '3,c,5', '4, d ,+6,1_000.5'])
+    vs=collect_violations(p)
+    assert [(v.row,v.column,v.rule) for v in vs]==[
+        (2,'nombre','no_vacio'), (2,'edad','tipo'), (2,'ingreso','minimo'),
+        (3,'id','unico'), (3,'edad','minimo'), (4,'*','campos')]
+    assert collect_violations(p, limit=2)==vs[:2]
+    with pytest.raises(AssertionError, match='fila 3: id \\[unico\\] id repetido 1'):
+        validate_file(p)
+
+def test_validate_file_datos_validos():
+    assert validate_file(DATA)
+    assert collect_violations(DATA)==[]
+
+def test_columnar_igual_a_filas(tmp_path):
+    pytest.importorskip('pyarrow')
+    lineas=[f'{i%40},{"" if i%7==0 else "p"},{[" 5","-1","x","+3","7"][i%5]},{["1e3","-0.5","nan"," 2","abc","1.25"][i%6]}' for i in range(300)]
+    lineas[50]='999,a,1'; lineas[51]=''; lineas[120]='"5","a\nb",3,4,9'
+    p=_csv(tmp_path, lineas)
+    ref=collect_violations(p, limit=None)
+    for bloque in [64, 1<<20]:
+        assert list(iter_violations_columnar(p, block_size=bloque))==ref
+    assert collect_violations(p, limit=7, columnar=True)==ref[:7]
+
+def test_byte_ranges_alineados(tmp_path):
+    p=_csv(tmp_path, [f'{i},p{i},{i%90},{i}.5' for i in range(200)])
+    datos=p.read_bytes(); rangos=byte_ranges(p, 7)
+    assert rangos[0][0]==datos.index(b'\n')+1 and rangos[-1][1]==len(datos)
+    assert all(a==b for (_,a),(b,_) in zip(rangos, rangos[1:]))
+    assert all(datos[a-1:a]==b'\n' for a,_ in rangos)
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_paralelo_igual_a_secuencial(tmp_path, columnar):
+    if columnar: pytest.importorskip('pyarrow')
+    # repetidos dentro de cada rango y entre rangos, filas con campos de mas o de menos
+    lineas=[f'{i%150},{"" if i%11==0 else "p"},{[" 5","-1","x","7"][i%4]},{["1e3","-0.5","abc","2"][i%4]}' for i in range(400)]
+    lineas[10]='7,a,1'; lineas[300]='8,a,1,2,3'; lineas[200]=''
+    p=_csv(tmp_path, lineas)
+    ref=collect_violations(p, limit=None)
+    assert collect_violations(p, limit=None, columnar=columnar, processes=3)==ref
+    assert collect_violations(p, limit=25, columnar=columnar, processes=3)==ref[:25]
+    sin_columnas=tmp_path/'sin_columnas.csv'
+    sin_columnas.write_text('id,nombre\n1,a\n', encoding='utf-8')
+    with pytest.raises(AssertionError, match='faltan columnas'):
+        collect_violations(sin_columnas, processes=2)
+
+def _error(rows, ids):
+    try: return validate_rows(rows, ids=ids, batch_size=4)
+    except AssertionError as e: return str(e)
+
+def _rastreadores():
+    pytest.importorskip('numpy')
+    from csv_checks import BitmapIdTracker, SortedIdTracker
+    return ['bitmap', 'sorted', BitmapIdTracker(start=5, max_bits=20),
+            SortedIdTracker(memory_ids=3, spill_dir=None), SortedIdTracker(memory_ids=3, bloom_bits=64),
+            SortedIdTracker(memory_ids=1, max_runs=2)]
+
+@pytest.mark.parametrize('caso', range(4))
+def test_ids_compactos_mismo_primer_error(caso):
+    fila=lambda i, e='1': {'id': str(i), 'nombre': 'a', 'edad': e, 'ingreso': '1.5'}
+    rows=[fila(i) for i in [3, 40, 2**70, 7, 9, 12, 8, 11]]
+    rows+=[[fila(12), fila(2**70), fila(40, '-1'), fila(1, 'x')][caso], fila(3)]
+    esperado=_error(rows, 'set')
+    assert 'id repetido' in esperado or caso==3
+    for ids in _rastreadores():
+        assert _error(rows, ids)==esperado
+    assert validate_rows(load_rows(DATA), ids='sorted')
+
+def test_bitmap_id_atipico_no_reserva_memoria():
+    pytest.importorskip('numpy')
+    from csv_checks import BitmapIdTracker
+    t=BitmapIdTracker()
+    assert t.first_duplicate([1, 2, 10**10, 3]) is None
+    assert t.first_duplicate([2**34-1, 4, 10**10])==2
+    assert t.bits.nbytes<=1<<16 and t.fuera=={10**10, 2**34-1}
+    # si el mapa crece hasta cubrir un id del conjunto, el id pasa al mapa
+    t=BitmapIdTracker(bits_por_id=8)
+    t.first_duplicate([600_000]); t.first_duplicate(list(range(100_000)))
+    assert t.first_duplicate([550_000]) is None and not t.fuera
+    assert t.first_duplicate([100_001, 600_000])==1
@@ -17,3 +17,43 @@ def test_dividir_ok():
 def test_dividir_cero():
     with pytest.raises(ValueError):
         dividir(1,0)
+
+TEXTOS=['  Hola  ','PYTHON ','','   ','uno  dos\ttres','\x1c a \x85','  Ñandú ÁRBOL','İstanbul','ΟΔΟΣ ΑΣ','ẞ','日本 語']
+
+def test_batch_igual_a_escalar():
+    pytest.importorskip('pyarrow')
+    from mod_simple import normalize_text_batch, word_count_batch
+    assert normalize_text_batch(TEXTOS)==[normalize_text(s) for s in TEXTOS]
+    assert word_count_batch(TEXTOS)==[word_count(s) for s in TEXTOS]
+    assert normalize_text_batch([' A ',None])==['a',None] and word_count_batch(['   ',None])==[0,None]
+
+def test_batch_contenedores():
+    pa=pytest.importorskip('pyarrow'); pd=pytest.importorskip('pandas'); np=pytest.importorskip('numpy')
+    from mod_simple import normalize_text_batch, word_count_batch
+    s=pd.Series([' A b ',None,'  '],index=[7,8,9],name='txt')
+    r=word_count_batch(s)
+    assert r.index.tolist()==[7,8,9] and r.name=='txt' and r.tolist()==[2,pd.NA,0]
+    assert normalize_text_batch(s).tolist()[0]=='a b'
+    assert normalize_text_batch(np.array([' X','y '])).tolist()==['x','y']
+    assert word_count_batch(pa.array(['a b',None])).to_pylist()==[2,None]
+
+def test_batch_numpy_grande_con_caracter_raro():
+    # pa.array parte un <U grande en varios bloques; la correccion de 'İ' debe funcionar igual
+    np=pytest.importorskip('numpy'); pytest.importorskip('pyarrow')
+    from mod_simple import normalize_text_batch, word_count_batch
+    textos=np.array(['İx'.ljust(40,'a')]*500_000); textos[1]='Hola  Mundo '
+    r=normalize_text_batch(textos)
+    assert len(r)==len(textos) and r[0]==normalize_text(textos[0]) and r[1]=='hola  mundo'
+    c=word_count_batch(textos)
+    assert c[0]==1 and c[1]==2
+
+def test_dividir_batch():
+    np=pytest.importorskip('numpy')
+    from mod_simple import dividir_batch
+    assert dividir_batch([10,7],[2,2]).tolist()==[dividir(10,2),dividir(7,2)]
+    with pytest.raises(ValueError):
+        dividir_batch([1,2],[1,0])
+    r=dividir_batch([1,2],[0,4],on_zero='nan')
+    assert np.isnan(r[0]) and r[1]==0.5
+    m=dividir_batch([1,2],[0,4],on_zero='mask')
+    assert m.mask.tolist()==[True,False] and m[1]==0.5
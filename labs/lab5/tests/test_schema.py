@@ -0,0 +1,56 @@
+import json
+from pathlib import Path
+import pytest
+from schema import Column, Schema, iter_rows
+DATA=Path('data/people.csv')
+PEOPLE=Path('schemas/people.toml')
+
+def test_load_toml_y_json(tmp_path):
+    s=Schema.load(PEOPLE)
+    assert s.names==['id','nombre','edad','ingreso']
+    assert s.columns[0]==Column('id','int',unique=True) and s.columns[2].min==0
+    p=tmp_path/'people.json'
+    p.write_text(json.dumps({'columns':[c.__dict__ for c in s.columns]}), encoding='utf-8')
+    assert Schema.load(p)==s
+    with pytest.raises(ValueError, match='tipo desconocido'):
+        Schema.from_dict({'columns':[{'name':'x','type':'fecha'}]})
+
+def test_load_yaml(tmp_path):
+    pytest.importorskip('yaml')
+    p=tmp_path/'people.yaml'
+    p.write_text('columns:\n  - {name: id, type: int, unique: true}\n  - {name: edad, type: int, min: 0, max: 120}\n', encoding='utf-8')
+    assert Schema.load(p).columns[1]==Column('edad','int',min=0,max=120)
+
+def test_referencia_datos_validos():
+    s=Schema.load(PEOPLE)
+    assert list(s.iter_violations(iter_rows(DATA, s)))==[]
+    with pytest.raises(AssertionError, match='faltan columnas'):
+        Schema((Column('pais'),)).check_header(['id'])
+
+def test_compilado_igual_a_referencia_csv(tmp_path):
+    pytest.importorskip('pyarrow')
+    s=Schema.load(PEOPLE)
+    lineas=[f'{i%40},{"" if i%7==0 else "p"},{[" 5","-1","x","+3","7",""][i%6]},{["1e3","-0.5","nan"," 2","abc","-0.0"][i%5]}' for i in range(300)]
+    lineas[50]='999,a,1'; lineas[51]=''; lineas[120]='"5","a\nb",3,4,9'
+    p=tmp_path/'people.csv'
+    p.write_text('id,nombre,edad,ingreso\n'+'\n'.join(lineas)+'\n', encoding='utf-8')
+    ref=list(s.iter_violations(iter_rows(p, s)))
+    assert {v.rule for v in ref}=={'campos','tipo','no_vacio','unico','minimo'}
+    for bloque in [64, 1<<20]:
+        assert list(s.compile().iter_file(p, block_size=bloque))==ref
+
+def test_compilado_lotes_tipados():
+    pa=pytest.importorskip('pyarrow')
+    s=Schema((Column('id','int',unique=True), Column('x','float',nullable=True,unique=True,min=-1,max=5),
+              Column('k','int',min=0,max=3), Column('t','str',nullable=True,unique=True)))
+    tabla=pa.table({
+        'id':pa.array([1,2,None,2,3,1],pa.int64()),
+        'x':pa.array([0.0,-0.0,None,float('nan'),float('nan'),7.0]),
+        'k':pa.array([1.0,2.5,None,5.0,-1.0,3.0]),
+        't':pa.array(['a','',None,'b','a','c'])})
+    ref=list(s.iter_violations(tabla.to_pylist()))
+    c=s.compile()
+    assert c.check_batch(tabla.slice(0,3))+c.check_batch(tabla.slice(3),first_row=4)==ref
+    assert [(v.row,v.column,v.rule) for v in ref]==[
+        (2,'x','unico'),(2,'k','tipo'),(3,'id','tipo'),(3,'k','tipo'),(4,'id','unico'),(4,'k','maximo'),
+        (5,'k','minimo'),(5,'t','unico'),(6,'id','unico'),(6,'x','maximo')]